@@ -0,0 +1,8 @@
+"""
+Benchmarks for Apache Treasury statement distributors.
+
+This package provides synthetic bill-db and ramp-db fixtures built from the
+real Prisma migrations, and scripts that measure the distributors on them.
+Benchmarks are run as scripts from this directory; nothing here is imported
+by the distributors themselves.
+"""
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-row GL account classification cost.
+
+Compares the legacy shared.account_groups.is_account_in_group() (which
+re-reads AccountGroups.json on every call) against a load-once
+AccountGroupIndex, classifying the same synthetic rows against every
+Departmental account group with an email address.
+
+Usage:
+    python bench_account_group_index.py
+    python bench_account_group_index.py --rows 50000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from shared.account_group_manager import load_account_groups
+from shared.account_groups import AccountGroupIndex, is_account_in_group
+
+
+DEFAULT_ACCOUNT_GROUPS_PATH = Path(__file__).parent / '../../packages/shared-utils/src/AccountGroups.json'
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark GL account classification per row')
+    parser.add_argument('--rows', type=int, default=5000, help='Number of synthetic rows (default: 5000)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument(
+        '--account-groups-path',
+        default=str(DEFAULT_ACCOUNT_GROUPS_PATH),
+        help='Path to AccountGroups.json'
+    )
+    args = parser.parse_args()
+
+    account_groups_path = Path(args.account_groups_path)
+    group_names = [ag['account_group'] for ag in load_account_groups(account_groups_path)]
+    rng = random.Random(args.seed)
+    gl_accounts = [str(rng.randint(4000, 8999)) for _ in range(args.rows)]
+    classifications = args.rows * len(group_names)
+
+    print(f"Rows: {args.rows}, account groups: {len(group_names)}, classifications: {classifications}")
+
+    start = time.perf_counter()
+    legacy = [
+        [is_account_in_group(gl, name, account_groups_path) for name in group_names]
+        for gl in gl_accounts
+    ]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = AccountGroupIndex.from_file(account_groups_path)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [
+        [index.is_account_in_group(gl, name) for name in group_names]
+        for gl in gl_accounts
+    ]
+    indexed_seconds = time.perf_counter() - start
+
+    if legacy != indexed:
+        print("Error: AccountGroupIndex results differ from is_account_in_group()", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"is_account_in_group:  {legacy_seconds:8.3f}s  {legacy_seconds / classifications * 1e6:10.3f} us/classification")
+    print(f"AccountGroupIndex:    {indexed_seconds:8.3f}s  {indexed_seconds / classifications * 1e6:10.3f} us/classification"
+          f"  (one-time build {build_seconds * 1e3:.3f} ms)")
+    print(f"Speedup: {legacy_seconds / indexed_seconds:,.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Bill.com approver aggregation.
+
+Compares the previous query_bills SQL, which computed approver names with a
+correlated GROUP_CONCAT subquery per result row, against the current query,
+which aggregates approvers for the selected bills in one grouped pass and
+joins them by billId. Both run on a synthetic bill-db with several
+approvers per bill, and their outputs are checked to be identical.
+
+Usage:
+    python bench_approver_query.py
+    python bench_approver_query.py --bills 200000 --approvers-per-bill 5
+    python bench_approver_query.py --bills 5000 --without-indexes
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from benchmarks.fixtures import create_bill_db, load_distributor, write_config
+from shared.database import ensure_indexes
+
+
+def correlated_query(distributor, account_groups: list, from_date: str, to_date: str) -> tuple:
+    """Build the previous bills query, with one correlated approver subquery per row."""
+    ranges_cte, ranges_params = distributor.account_group_index.ranges_cte(account_groups)
+    query = f"""
+        WITH {ranges_cte}
+        SELECT 
+            r.account_group,
+            b.invoiceDate,
+            COALESCE(v.name, b.vendorName) as vendor_name,
+            b.invoiceNumber,
+            b.dueDate,
+            b.amount,
+            b.paidAmount,
+            b.approvalStatus,
+            (SELECT GROUP_CONCAT(fullname, ', ')
+             FROM (
+               SELECT TRIM(COALESCE(u.firstName, '') || ' ' || COALESCE(u.lastName, '')) as fullname
+               FROM bills_approvers ba
+               JOIN users u ON ba.userId = u.id
+               WHERE ba.billId = b.id
+               ORDER BY COALESCE(ba.sortOrder, 0)
+             )) as approver,
+            b.paymentStatus,
+            a.accountNumber as gl_account,
+            a.name as gl_account_name
+        FROM bills b
+        LEFT JOIN vendors v ON b.vendorId = v.id
+        JOIN bills_classifications bc ON b.id = bc.billId
+        JOIN accounts a ON bc.chartOfAccountId = a.id
+        JOIN account_group_ranges r ON a.accountNumber BETWEEN r.range_start AND r.range_end
+        WHERE b.invoiceDate >= ? AND b.invoiceDate <= ?
+        ORDER BY a.accountNumber, b.invoiceDate
+        """
+    return query, [*ranges_params, from_date, to_date]
+
+
+def timed_fetch(conn, query: str, params: list) -> tuple:
+    """Execute a query, fetch every row and return (seconds, rows)."""
+    start = time.perf_counter()
+    rows = conn.execute(query, params).fetchall()
+    return time.perf_counter() - start, [tuple(row) for row in rows]
+
+
+def best_of(repeat: int, conn, query: str, params: list) -> tuple:
+    """Run timed_fetch repeat times and return the fastest (seconds, rows)."""
+    results = [timed_fetch(conn, query, params) for _ in range(repeat)]
+    return min(results, key=lambda result: result[0])
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark Bill.com approver aggregation')
+    parser.add_argument('--bills', type=int, default=50000, help='Number of synthetic bills (default: 50000)')
+    parser.add_argument('--approvers-per-bill', type=int, default=4, help='Approvers per bill (default: 4)')
+    parser.add_argument('--from-date', default='2024-01-01', help='Start date (default: 2024-01-01)')
+    parser.add_argument('--to-date', default='2024-12-31', help='End date (default: 2024-12-31)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per query; the fastest is reported (default: 3)')
+    parser.add_argument(
+        '--without-indexes',
+        action='store_true',
+        help='Skip creating the --ensure-indexes indexes (the correlated subquery becomes quadratic)'
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        database_path = tmp / 'bill-db.db'
+        print(f"Creating synthetic bill-db: {args.bills} bills, {args.approvers_per_bill} approvers per bill")
+        create_bill_db(database_path, bills=args.bills, approvers_per_bill=args.approvers_per_bill)
+
+        config_path = write_config(tmp / 'config.json', database_path, tmp / 'statements')
+        _, distributor = load_distributor('bill_statement_distributor', config_path)
+        if not args.without_indexes:
+            ensure_indexes(database_path, distributor.REQUIRED_INDEXES)
+        account_groups = [ag['account_group'] for ag in distributor.account_groups]
+
+        query, params = distributor.build_query(account_groups, args.from_date, args.to_date)
+        old_query, old_params = correlated_query(distributor, account_groups, args.from_date, args.to_date)
+        conn = distributor.connections.get()
+
+        old_seconds, old_rows = best_of(args.repeat, conn, old_query, old_params)
+        new_seconds, new_rows = best_of(args.repeat, conn, query, params)
+        distributor.connections.close_all()
+
+    if old_rows != new_rows:
+        print("Error: grouped approver query output differs from correlated subquery", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Rows: {len(new_rows)} (outputs identical)")
+    print(f"Correlated subquery:     {old_seconds:8.3f}s  {len(old_rows) / old_seconds:12,.0f} rows/s")
+    print(f"Grouped approvers join:  {new_seconds:8.3f}s  {len(new_rows) / new_seconds:12,.0f} rows/s")
+    print(f"Speedup: {old_seconds / new_seconds:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
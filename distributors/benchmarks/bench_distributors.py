@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Benchmark: both distributors end to end on synthetic databases.
+
+Generates a bill-db and a ramp-db of the requested size and GL account
+distribution, then for each distributor:
+
+  - times the statement stages one at a time: query (execute and fetch),
+    classify (partition rows by account group), CSV (write every statement,
+    also reported as rows formatted and written per second) and email build
+    (MIME message with attachment, serialized);
+  - times a complete dry-run distributor.run(), as the CLI would execute it.
+
+Each measurement runs in a fresh process so peak RSS is reported per
+distributor and per measurement. Results are written to a JSON file, and a
+previous results file can be given with --compare to print the change.
+
+Usage:
+    python bench_distributors.py
+    python bench_distributors.py --rows 1000000 --gl-distribution skewed --output after.json
+    python bench_distributors.py --rows 1000000 --compare before.json
+    python bench_distributors.py --sources ramp --rows 5000000 --unmatched-ratio 0.2 --stream
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from benchmarks.fixtures import (
+    DISTRIBUTORS_DIR,
+    GL_DISTRIBUTIONS,
+    create_bill_db,
+    create_ramp_db,
+    load_distributor,
+    write_config,
+)
+from shared.account_groups import partition_tagged_rows
+from shared.email_sender import build_message
+
+
+# Per-source fixture generator and distributor script
+SOURCES = {
+    'bill': {
+        'module': 'bill_statement_distributor',
+        'create_db': create_bill_db,
+    },
+    'ramp': {
+        'module': 'ramp_statement_distributor',
+        'create_db': create_ramp_db,
+    },
+}
+
+STAGES = ('query', 'classify', 'csv', 'email_build')
+
+RESULTS_VERSION = 1
+
+
+def peak_rss_mb() -> float:
+    """Return this process's peak resident set size in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_stages(source: str, config_path: str, from_date: str, to_date: str) -> dict:
+    """
+    Time each statement stage of one distributor separately.
+
+    Runs in a child process.
+
+    Returns:
+        Dictionary with per-stage seconds, row counts and peak RSS
+    """
+    spec = SOURCES[source]
+    _, distributor = load_distributor(spec['module'], Path(config_path))
+    account_groups = [ag for ag in distributor.account_groups if ag.get('account_group')]
+    names = [ag['account_group'] for ag in account_groups]
+    stages = {}
+
+    start = time.perf_counter()
+    query, params = distributor.build_query(names, from_date, to_date)
+    rows = distributor.connections.get().execute(query, params).fetchall()
+    stages['query'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rows_by_account_group = partition_tagged_rows(rows, names)
+    stages['classify'] = time.perf_counter() - start
+    del rows
+
+    start = time.perf_counter()
+    statements = {}
+    for name in names:
+        if rows_by_account_group[name]:
+            path = distributor.output_dir / f"{source}-{name}-{from_date}-{to_date}.csv"
+            distributor.generate_csv(rows_by_account_group[name], path)
+            statements[name] = path
+    stages['csv'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    message_bytes = 0
+    for ag in account_groups:
+        path = statements.get(ag['account_group'])
+        if not path:
+            continue
+        template_values = {'account_group': ag.get('name', ag['account_group']), 'from_date': from_date, 'to_date': to_date}
+        msg = build_message(
+            distributor.smtp_config,
+            ag['email'],
+            distributor.email_template.get('subject', '').format(**template_values),
+            distributor.email_template.get('body', '').format(**template_values),
+            attachment_path=path,
+            bcc='treasurer@apache.org'
+        )
+        message_bytes += len(msg.as_bytes())
+    stages['email_build'] = time.perf_counter() - start
+    distributor.connections.close_all()
+
+    rows_selected = sum(len(group_rows) for group_rows in rows_by_account_group.values())
+    return {
+        'rows_selected': rows_selected,
+        'csv_rows_per_second': round(rows_selected / stages['csv']) if stages['csv'] else 0,
+        'statements': len(statements),
+        'message_bytes': message_bytes,
+        'stages': {stage: round(stages[stage], 4) for stage in STAGES},
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_end_to_end(source: str, config_path: str, from_date: str, to_date: str, stream: bool) -> dict:
+    """
+    Time a complete dry-run distributor.run().
+
+    Runs in a child process.
+
+    Returns:
+        Dictionary with total seconds, exit code and peak RSS
+    """
+    _, distributor = load_distributor(SOURCES[source]['module'], Path(config_path))
+    start = time.perf_counter()
+    if stream:
+        exit_code = distributor.run(from_date, to_date, send_emails=False, stream=True)
+    else:
+        exit_code = distributor.run(from_date, to_date, send_emails=False)
+    return {
+        'seconds': round(time.perf_counter() - start, 4),
+        'exit_code': exit_code,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def in_child(function, *args) -> dict:
+    """Call a function in a freshly spawned process and return its result."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(function, args)
+
+
+def git_commit() -> str:
+    """Return the current git commit of the distributors tree, or an empty string."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=DISTRIBUTORS_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def print_results(results: dict, baseline: dict = None) -> None:
+    """Print a results table, with the change against a baseline results file if given."""
+    for source, result in results['results'].items():
+        print(f"\n{source}: {result['rows_generated']:,} rows generated, "
+              f"{result['rows_selected']:,} selected, {result['statements']} statements")
+        timings = [(stage, result['stages'][stage]) for stage in STAGES]
+        timings.append(('end_to_end', result['end_to_end']['seconds']))
+        previous = (baseline or {}).get('results', {}).get(source)
+        for stage, seconds in timings:
+            line = f"  {stage:<12} {seconds:9.3f}s"
+            if stage == 'csv' and result.get('csv_rows_per_second'):
+                line += f"  {result['csv_rows_per_second']:>11,} rows/s"
+            if previous:
+                before = previous['end_to_end']['seconds'] if stage == 'end_to_end' else previous['stages'].get(stage)
+                if before:
+                    line += f"   was {before:9.3f}s  ({before / seconds if seconds else float('inf'):.2f}x)"
+            print(line)
+        print(f"  peak RSS     stages {result['peak_rss_mb']} MB, end to end {result['end_to_end']['peak_rss_mb']} MB")
+        if previous:
+            print(f"  was          stages {previous['peak_rss_mb']} MB, "
+                  f"end to end {previous['end_to_end']['peak_rss_mb']} MB")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark both distributors end to end on synthetic data')
+    parser.add_argument('--rows', type=int, default=10000, help='Bills / transactions to generate (default: 10000)')
+    parser.add_argument(
+        '--sources',
+        default='bill,ramp',
+        help='Comma-separated distributors to benchmark: bill, ramp (default: bill,ramp)'
+    )
+    parser.add_argument(
+        '--gl-distribution',
+        choices=GL_DISTRIBUTIONS,
+        default='uniform',
+        help='How GL accounts are spread over the Departmental ranges (default: uniform)'
+    )
+    parser.add_argument(
+        '--unmatched-ratio',
+        type=float,
+        default=0.0,
+        help='Fraction of rows coded outside every Departmental range (default: 0.0)'
+    )
+    parser.add_argument('--from-date', default='2024-01-01', help='Start date (default: 2024-01-01)')
+    parser.add_argument('--to-date', default='2024-12-31', help='End date (default: 2024-12-31)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--without-indexes', action='store_true', help='Skip creating the --ensure-indexes indexes')
+    parser.add_argument('--stream', action='store_true', help='Run the end-to-end pass with --stream')
+    parser.add_argument(
+        '--output',
+        default='benchmark-results.json',
+        help='Results file to write (default: benchmark-results.json)'
+    )
+    parser.add_argument('--compare', help='Previous results file to compare against')
+    args = parser.parse_args()
+
+    sources = [source.strip() for source in args.sources.split(',') if source.strip()]
+    unknown = [source for source in sources if source not in SOURCES]
+    if unknown:
+        parser.error(f"Unknown source(s): {', '.join(unknown)}")
+    if args.rows < 1:
+        parser.error("--rows must be at least 1")
+    if not 0.0 <= args.unmatched_ratio <= 1.0:
+        parser.error("--unmatched-ratio must be between 0 and 1")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+
+    results = {
+        'version': RESULTS_VERSION,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'parameters': {
+            'rows': args.rows,
+            'gl_distribution': args.gl_distribution,
+            'unmatched_ratio': args.unmatched_ratio,
+            'from_date': args.from_date,
+            'to_date': args.to_date,
+            'seed': args.seed,
+            'indexes': not args.without_indexes,
+            'stream': args.stream,
+        },
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for source in sources:
+            spec = SOURCES[source]
+            database_path = tmp / f"{source}-db.db"
+            print(f"Creating synthetic {source} database: {args.rows:,} rows, "
+                  f"{args.gl_distribution} GL distribution, {args.unmatched_ratio:.0%} unmatched")
+            start = time.perf_counter()
+            spec['create_db'](
+                database_path,
+                args.rows,
+                seed=args.seed,
+                gl_distribution=args.gl_distribution,
+                unmatched_ratio=args.unmatched_ratio
+            )
+            generate_seconds = time.perf_counter() - start
+
+            output_dir = tmp / f"{source}-statements"
+            config_path = write_config(tmp / f"{source}-config.json", database_path, output_dir)
+            if not args.without_indexes:
+                _, distributor = load_distributor(spec['module'], config_path)
+                distributor.ensure_indexes()
+
+            print(f"Benchmarking {spec['module']}")
+            result = in_child(run_stages, source, str(config_path), args.from_date, args.to_date)
+            result['rows_generated'] = args.rows
+            result['generate_seconds'] = round(generate_seconds, 4)
+            result['end_to_end'] = in_child(
+                run_end_to_end, source, str(config_path), args.from_date, args.to_date, args.stream
+            )
+            results['results'][source] = result
+            database_path.unlink()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print_results(results, baseline)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
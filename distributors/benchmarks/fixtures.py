@@ -0,0 +1,403 @@
+"""
+Synthetic database fixtures for distributor benchmarks.
+
+Builds bill-db and ramp-db SQLite files with the real table layouts by
+applying the Prisma migrations from packages/bill-db and packages/ramp-db,
+then fills them with deterministic pseudo-random data. Rows are inserted in
+chunks, so databases of several million rows can be generated without
+holding them in memory.
+"""
+
+import importlib.util
+import json
+import random
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+
+PACKAGES_DIR = Path(__file__).resolve().parent.parent.parent / 'packages'
+DISTRIBUTORS_DIR = Path(__file__).resolve().parent.parent
+ACCOUNT_GROUPS_PATH = PACKAGES_DIR / 'shared-utils' / 'src' / 'AccountGroups.json'
+
+# Supported GL account distributions across the Departmental ranges
+GL_DISTRIBUTIONS = ('uniform', 'skewed')
+
+# Balance-sheet GL accounts, outside every Departmental account group range
+UNMATCHED_GL_ACCOUNTS = ['1500', '2500', '3500']
+
+# Rows generated per executemany() call
+CHUNK_SIZE = 50000
+
+# Currency and exchange rate (per settled USD) of foreign ramp-db transactions
+FOREIGN_CURRENCY = 'EUR'
+FOREIGN_RATE = 0.92
+
+
+def create_schema(database_path: Path, package: str) -> sqlite3.Connection:
+    """
+    Create an empty database by applying a package's Prisma migrations in order.
+
+    Args:
+        database_path: Path of the database file to create (replaced if it exists)
+        package: Package directory name under packages/ (e.g., "bill-db")
+
+    Returns:
+        Open read-write connection to the new database
+    """
+    database_path = Path(database_path)
+    if database_path.exists():
+        database_path.unlink()
+    conn = sqlite3.connect(database_path)
+    # Fixture databases are disposable; skip journaling while loading them
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    for migration in sorted((PACKAGES_DIR / package / 'prisma' / 'migrations').glob('*/migration.sql')):
+        conn.executescript(migration.read_text())
+    return conn
+
+
+def departmental_gl_accounts() -> List[str]:
+    """Return one GL account number inside every Departmental account group range."""
+    with open(ACCOUNT_GROUPS_PATH, 'r') as f:
+        account_groups = json.load(f)
+    gl_accounts = []
+    for group in account_groups:
+        if group.get('groupType') != 'Departmental':
+            continue
+        for group_range in group.get('groupRanges', []):
+            start = int(group_range['start'])
+            end = int(group_range['end'])
+            gl_accounts.append(str((start + end) // 2).zfill(4))
+    return gl_accounts
+
+
+def gl_account_picker(
+    rng: random.Random,
+    distribution: str = 'uniform',
+    unmatched_ratio: float = 0.0
+) -> Callable[[], str]:
+    """
+    Build a function that draws GL account numbers for synthetic rows.
+
+    Args:
+        rng: Random number generator to draw from
+        distribution: "uniform" spreads rows evenly over the Departmental ranges;
+            "skewed" gives range k a weight of 1/k, so a few groups get most rows
+        unmatched_ratio: Fraction of rows given a GL account outside every
+            Departmental range (never distributed)
+
+    Returns:
+        Callable returning one GL account number per call
+
+    Raises:
+        ValueError: If the distribution is unknown or unmatched_ratio is outside [0, 1]
+    """
+    if distribution not in GL_DISTRIBUTIONS:
+        raise ValueError(f"Unknown GL distribution: {distribution} (expected one of {', '.join(GL_DISTRIBUTIONS)})")
+    if not 0.0 <= unmatched_ratio <= 1.0:
+        raise ValueError(f"unmatched_ratio must be between 0 and 1: {unmatched_ratio}")
+
+    gl_accounts = departmental_gl_accounts()
+    if distribution == 'skewed':
+        weights = [1.0 / rank for rank in range(1, len(gl_accounts) + 1)]
+    else:
+        weights = [1.0] * len(gl_accounts)
+
+    def pick() -> str:
+        if unmatched_ratio and rng.random() < unmatched_ratio:
+            return rng.choice(UNMATCHED_GL_ACCOUNTS)
+        return rng.choices(gl_accounts, weights)[0]
+
+    return pick
+
+
+def _random_day(rng: random.Random, year: int) -> date:
+    """Return a random date within a calendar year."""
+    first_day = date(year, 1, 1)
+    return first_day + timedelta(days=rng.randrange((date(year + 1, 1, 1) - first_day).days))
+
+
+def create_bill_db(
+    database_path: Path,
+    bills: int = 10000,
+    approvers_per_bill: int = 3,
+    year: int = 2024,
+    seed: int = 42,
+    gl_distribution: str = 'uniform',
+    unmatched_ratio: float = 0.0,
+    line_items_per_bill: int = 0
+) -> None:
+    """
+    Create a synthetic bill-db with the given number of bills.
+
+    With line_items_per_bill, every bill is also split into that many line
+    items (amounts summing to the bill amount), each classified to its own GL
+    account; the bill-level classification is kept.
+
+    Args:
+        database_path: Path of the database file to create
+        bills: Number of bills (invoice dates spread across the year)
+        approvers_per_bill: Number of bills_approvers rows per bill
+        year: Calendar year of the invoice dates
+        seed: Random seed
+        gl_distribution: GL account distribution (see gl_account_picker)
+        unmatched_ratio: Fraction of bills classified outside every Departmental range
+        line_items_per_bill: Number of bills_line_items rows per bill (default: none)
+    """
+    rng = random.Random(seed)
+    pick_gl_account = gl_account_picker(rng, gl_distribution, unmatched_ratio)
+    conn = create_schema(database_path, 'bill-db')
+
+    gl_accounts = departmental_gl_accounts() + UNMATCHED_GL_ACCOUNTS
+    account_ids = {gl: f"0ca{i:06d}" for i, gl in enumerate(gl_accounts)}
+    conn.executemany(
+        "INSERT INTO accounts (id, accountNumber, name) VALUES (?, ?, ?)",
+        [(account_id, gl, f"GL Account {gl}") for gl, account_id in account_ids.items()]
+    )
+    users = max(approvers_per_bill * 4, 20)
+    conn.executemany(
+        "INSERT INTO users (id, firstName, lastName) VALUES (?, ?, ?)",
+        [(f"006{i:06d}", f"First{i}", f"Last{i}") for i in range(users)]
+    )
+    vendors = max(bills // 50, 10)
+    conn.executemany(
+        "INSERT INTO vendors (id, name) VALUES (?, ?)",
+        [(f"009{i:06d}", f"Vendor {i}") for i in range(vendors)]
+    )
+
+    for chunk_start in range(0, bills, CHUNK_SIZE):
+        bill_rows = []
+        classification_rows = []
+        approver_rows = []
+        line_item_rows = []
+        line_item_classification_rows = []
+        for i in range(chunk_start, min(chunk_start + CHUNK_SIZE, bills)):
+            bill_id = f"00n{i:08d}"
+            invoice_date = _random_day(rng, year)
+            amount = rng.randint(100, 5_000_000) / 100
+            bill_rows.append((
+                bill_id,
+                amount,
+                rng.choice(['APPROVED', 'ASSIGNED', 'UNASSIGNED']),
+                (invoice_date + timedelta(days=30)).isoformat(),
+                invoice_date.isoformat(),
+                f"INV-{i}",
+                rng.choice([0.0, amount]),
+                rng.choice(['PAID', 'UNPAID', 'SCHEDULED']),
+                f"Vendor {i % vendors}",
+                f"009{i % vendors:06d}"
+            ))
+            classification_rows.append((bill_id, account_ids[pick_gl_account()]))
+            remaining_cents = round(amount * 100)
+            for line in range(line_items_per_bill):
+                line_item_id = f"0li{i:08d}{line:02d}"
+                line_cents = (
+                    remaining_cents if line == line_items_per_bill - 1
+                    else rng.randint(0, remaining_cents)
+                )
+                remaining_cents -= line_cents
+                line_item_rows.append((line_item_id, line_cents / 100, bill_id))
+                line_item_classification_rows.append((line_item_id, account_ids[pick_gl_account()]))
+            for sort_order in rng.sample(range(approvers_per_bill), approvers_per_bill):
+                approver_rows.append((
+                    f"0ba{i:08d}{sort_order:02d}",
+                    bill_id,
+                    f"006{rng.randrange(users):06d}",
+                    sort_order
+                ))
+
+        conn.executemany(
+            "INSERT INTO bills (id, amount, approvalStatus, dueDate, invoiceDate, invoiceNumber, "
+            "paidAmount, paymentStatus, vendorName, vendorId) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            bill_rows
+        )
+        conn.executemany(
+            "INSERT INTO bills_classifications (billId, chartOfAccountId) VALUES (?, ?)",
+            classification_rows
+        )
+        conn.executemany(
+            "INSERT INTO bills_approvers (id, billId, userId, sortOrder) VALUES (?, ?, ?, ?)",
+            approver_rows
+        )
+        conn.executemany(
+            "INSERT INTO bills_line_items (id, amount, billId) VALUES (?, ?, ?)",
+            line_item_rows
+        )
+        conn.executemany(
+            "INSERT INTO bills_line_items_classifications (billLineItemId, chartOfAccountId) VALUES (?, ?)",
+            line_item_classification_rows
+        )
+    conn.commit()
+    conn.close()
+
+
+def create_ramp_db(
+    database_path: Path,
+    transactions: int = 10000,
+    max_line_items: int = 3,
+    year: int = 2024,
+    seed: int = 42,
+    gl_distribution: str = 'uniform',
+    unmatched_ratio: float = 0.0,
+    foreign_ratio: float = 0.0
+) -> None:
+    """
+    Create a synthetic ramp-db with the given number of transactions.
+
+    Every transaction gets between 1 and max_line_items line items, each with a
+    GL_ACCOUNT and a MERCHANT accounting field selection; about a third of the
+    transactions also carry a transaction-level GL_ACCOUNT selection.
+
+    With foreign_ratio, that fraction of the transactions is a purchase in
+    FOREIGN_CURRENCY settled in USD, split into at least two line items
+    itemized in FOREIGN_CURRENCY with their converted USD amounts, which add
+    up to the settled amount.
+
+    Args:
+        database_path: Path of the database file to create
+        transactions: Number of transactions (accounting dates spread across the year)
+        max_line_items: Maximum number of line items per transaction
+        year: Calendar year of the accounting dates
+        seed: Random seed
+        gl_distribution: GL account distribution (see gl_account_picker)
+        unmatched_ratio: Fraction of line items coded outside every Departmental range
+        foreign_ratio: Fraction of transactions in FOREIGN_CURRENCY (default: none)
+    """
+    rng = random.Random(seed)
+    pick_gl_account = gl_account_picker(rng, gl_distribution, unmatched_ratio)
+    conn = create_schema(database_path, 'ramp-db')
+
+    users = max(transactions // 200, 10)
+    conn.executemany(
+        "INSERT INTO users (id, first_name, last_name, email, status) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"u{i:06d}", f"First{i}", f"Last{i}", f"user{i}@example.org", 'USER_ACTIVE')
+            for i in range(users)
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO cards (id, display_name, expiration, has_program_overridden, last_four) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [(f"c{i:06d}", f"Card {i}", '0129', 0, f"{i % 10000:04d}") for i in range(users)]
+    )
+
+    for chunk_start in range(0, transactions, CHUNK_SIZE):
+        transaction_rows = []
+        line_item_rows = []
+        selection_rows = []
+        transaction_selection_rows = []
+        for i in range(chunk_start, min(chunk_start + CHUNK_SIZE, transactions)):
+            transaction_id = f"t{i:08d}"
+            accounting_date = (
+                f"{_random_day(rng, year).isoformat()}"
+                f"T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00.000Z"
+            )
+            amount = rng.randint(100, 2_000_000)
+            holder = rng.randrange(users)
+            foreign = foreign_ratio > 0 and rng.random() < foreign_ratio
+            transaction_rows.append((
+                transaction_id,
+                accounting_date,
+                amount,
+                'USD',
+                round(amount * FOREIGN_RATE) if foreign else amount,
+                FOREIGN_CURRENCY if foreign else 'USD',
+                f"Merchant {i % 500}",
+                rng.choice(['CLEARED', 'PENDING']),
+                'SYNCED',
+                f"c{holder:06d}",
+                f"u{holder:06d}"
+            ))
+            min_line_items = 2 if foreign else 1
+            line_items = rng.randint(min_line_items, max(max_line_items, min_line_items))
+            for index in range(line_items):
+                if foreign:
+                    # The last line item takes the rounding remainder of the settled amount
+                    converted = amount // line_items
+                    if index == line_items - 1:
+                        converted = amount - converted * (line_items - 1)
+                    line_item_rows.append((
+                        transaction_id, index, round(converted * FOREIGN_RATE), FOREIGN_CURRENCY, converted, 'USD'
+                    ))
+                else:
+                    line_item_rows.append((transaction_id, index, amount // line_items, 'USD', None, None))
+                selection_rows.append((transaction_id, index, f"gl{index}", 'GL_ACCOUNT', pick_gl_account()))
+                selection_rows.append((transaction_id, index, f"m{index}", 'MERCHANT', f"M{i % 500}"))
+            if rng.random() < 0.33:
+                transaction_selection_rows.append((transaction_id, 'gl', 'GL_ACCOUNT', pick_gl_account()))
+
+        conn.executemany(
+            "INSERT INTO transactions (id, accounting_date, amount_amt, amount_cc, "
+            "original_transaction_amount_amt, original_transaction_amount_cc, merchant_name, state, "
+            "sync_status, card_id, card_holder_user_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            transaction_rows
+        )
+        conn.executemany(
+            "INSERT INTO transactions_line_items (transaction_id, index_line_item, amount_amt, amount_cc, "
+            "converted_amount_amt, converted_amount_cc) VALUES (?, ?, ?, ?, ?, ?)",
+            line_item_rows
+        )
+        conn.executemany(
+            "INSERT INTO transactions_line_items_accounting_field_selections "
+            "(transaction_id, index_line_item, ramp_id, category_info_type, external_code) "
+            "VALUES (?, ?, ?, ?, ?)",
+            selection_rows
+        )
+        conn.executemany(
+            "INSERT INTO transactions_accounting_field_selections "
+            "(transaction_id, ramp_id, category_info_type, external_code) VALUES (?, ?, ?, ?)",
+            transaction_selection_rows
+        )
+    conn.commit()
+    conn.close()
+
+
+def load_distributor(module_name: str, config_path: Path):
+    """
+    Import a distributor script by file name and instantiate its distributor.
+
+    Args:
+        module_name: Script name without extension (e.g., "bill_statement_distributor")
+        config_path: Path to the configuration JSON file
+
+    Returns:
+        Tuple of (imported module, distributor instance)
+    """
+    script = DISTRIBUTORS_DIR / module_name.replace('_', '-') / f"{module_name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    distributor_class = next(
+        value for name, value in vars(module).items()
+        if isinstance(value, type) and name.endswith('Distributor') and value.__module__ == module_name
+    )
+    return module, distributor_class(str(config_path))
+
+
+def write_config(config_path: Path, database_path: Path, output_dir: Path) -> Path:
+    """
+    Write a minimal distributor configuration for benchmark runs.
+
+    Args:
+        config_path: Path of the configuration JSON file to write
+        database_path: Path of the synthetic database
+        output_dir: Directory for generated statements
+
+    Returns:
+        The configuration path
+    """
+    config = {
+        'database_path': str(database_path),
+        'output_dir': str(output_dir),
+        'summary_report': {'enabled': False},
+        'smtp': {'host': 'localhost', 'port': 25, 'use_tls': False, 'from_address': 'treasurer@apache.org'},
+        'email_template': {
+            'subject': 'Statement - {account_group} - {from_date} to {to_date}',
+            'body': 'Dear {account_group} Team,\n\nStatement for {from_date} to {to_date}.'
+        }
+    }
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    return Path(config_path)
@@ -11,107 +11,103 @@ Usage:
     python bill_statement_distributor.py --config config.json --from-date 2024-01-01 --to-date 2024-12-31
     python bill_statement_distributor.py --config config.json --account-groups Infrastructure,Marketing
     python bill_statement_distributor.py --config config.json --list-account-groups
+    python bill_statement_distributor.py --config config.json --workers 4
+    python bill_statement_distributor.py --config config.json --months 2024-01..2024-12
+    python bill_statement_distributor.py --config config.json --quarters 2024Q1..2024Q4
+    python bill_statement_distributor.py --config config.json --from-date 2024-01-01 --to-date 2024-12-31 --stream
+    python bill_statement_distributor.py --config config.json --send-emails --resume
+    python bill_statement_distributor.py --config config.json --send-emails --skip-unchanged
     python bill_statement_distributor.py --config config.json --dry-run
 """
 
-import argparse
-import csv
-import json
-import os
-import sqlite3
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 # Import shared utilities
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from shared.logging_config import setup_logging
-from shared.email_sender import send_email
-from shared.account_group_manager import load_account_groups, filter_account_groups, list_account_groups
-from shared.account_groups import is_account_in_group
-from shared.date_utils import get_date_range
-from shared.formatters import format_amount
-from shared.statistics import StatisticsTracker, generate_summary_report
+from shared.formatters import CsvColumn, format_dollars
+from shared.statement_engine import StatementEngine, run_cli
+from shared.statement_writers import Column, as_text, dollars_to_cents, parse_date
 
 
-# Global logger (will be initialized in main())
-logger = None
-
-
-class BillStatementDistributor:
+class BillStatementDistributor(StatementEngine):
     """Handles generation and distribution of monthly Bill.com statements."""
 
-    def __init__(self, config_path: str):
-        """
-        Initialize the distributor with configuration.
-
-        Args:
-            config_path: Path to the JSON configuration file
-        """
-        self.config = self._load_config(config_path)
-        self.smtp_config = self.config.get('smtp', {})
-        self.email_template = self.config.get('email_template', {})
-        self.output_dir = Path(self.config.get('output_dir', './bill_statements'))
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Set database path from config
-        database_path = self.config.get('database_path')
-        if database_path:
-            self.database_path = Path(database_path)
-        else:
-            # Default to standard location
-            script_dir = Path(__file__).parent
-            self.database_path = script_dir / '../../packages/bill-db/bill-db.db'
-        
-        # Verify database exists
-        if not self.database_path.exists():
-            logger.error(f"Database file not found: {self.database_path}")
-            sys.exit(1)
-        
-        # Set account groups path to standard location
-        script_dir = Path(__file__).parent
-        self.account_groups_path = script_dir / '../../packages/shared-utils/src/AccountGroups.json'
-        
-        # Load account groups from AccountGroups.json using shared utility
-        self.account_groups = load_account_groups(self.account_groups_path)
-        logger.info(f"Loaded {len(self.account_groups)} account groups from AccountGroups.json")
-        
-        # Summary report configuration
-        self.summary_config = self.config.get('summary_report', {
-            'enabled': True,
-            'recipient': 'treasurer@apache.org'
-        })
-        
-        # Initialize statistics tracking using shared utility
-        self.stats_tracker = StatisticsTracker()
+    SOURCE = 'bill'
+    PREFIX = 'Bill'
+    TITLE = 'Bill.com'
+    ROW_NOUN = 'bills'
+    AMOUNT_KEY = 'amount'
+    DATE_KEY = 'invoiceDate'
+    DEFAULT_DATABASE_PATH = 'packages/bill-db/bill-db.db'
+    DEFAULT_OUTPUT_DIR = './bill_statements'
+    NO_ACTIVITY_BODY = (
+        "Dear {account_group} Team,\n\nNo Bill.com activity occurred for your account group during "
+        "{from_date} to {to_date}.\n\nIf you have questions, contact treasurer@apache.org.\n\n"
+        "Best regards,\nApache Software Foundation Treasury"
+    )
 
-    def _load_config(self, config_path: str) -> Dict:
-        """Load configuration from JSON file."""
-        try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logger.error(f"Configuration file not found: {config_path}")
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in configuration file: {e}")
+    # Secondary indexes backing the query access paths (created by --ensure-indexes)
+    REQUIRED_INDEXES = [
+        ('bills_invoiceDate_idx', 'bills', ['invoiceDate']),
+        ('bills_classifications_billId_chartOfAccountId_idx', 'bills_classifications', ['billId', 'chartOfAccountId']),
+        ('bills_approvers_billId_sortOrder_userId_idx', 'bills_approvers', ['billId', 'sortOrder', 'userId']),
+        ('bills_line_items_billId_idx', 'bills_line_items', ['billId']),
+    ]
+
+    # Query aliases of tables that must never be full-scanned
+    GUARDED_TABLES = {
+        'b': 'bills',
+        'bc': 'bills_classifications',
+        'ba': 'bills_approvers',
+        'li': 'bills_line_items',
+        'lic': 'bills_line_items_classifications',
+    }
+
+    # CSV statement columns (SQLite dates are YYYY-MM-DD, which is already readable)
+    CSV_COLUMNS = [
+        CsvColumn("Invoice Date", 'invoiceDate'),
+        CsvColumn("Vendor Name", 'vendor_name'),
+        CsvColumn("Invoice Number", 'invoiceNumber'),
+        CsvColumn("Due Date", 'dueDate'),
+        CsvColumn("Amount (USD)", 'amount', 'dollars'),
+        CsvColumn("Paid Amount (USD)", 'paidAmount', 'dollars'),
+        CsvColumn("Approval Status", 'approvalStatus'),
+        CsvColumn("Approver", 'approver'),
+        CsvColumn("Payment Status", 'paymentStatus'),
+        CsvColumn("GL Account", 'gl_account'),
+        CsvColumn("GL Account Name", 'gl_account_name'),
+    ]
+    CSV_HEADER = [column.header for column in CSV_COLUMNS]
+
+    # Typed columnar statement columns (Parquet / Arrow IPC output)
+    COLUMNS = [
+        Column('invoice_date', 'date', lambda b: parse_date(b['invoiceDate'])),
+        Column('vendor_name', 'string', lambda b: b['vendor_name']),
+        Column('invoice_number', 'string', lambda b: as_text(b['invoiceNumber'])),
+        Column('due_date', 'date', lambda b: parse_date(b['dueDate'])),
+        Column('amount_cents', 'cents', lambda b: dollars_to_cents(b['amount'])),
+        Column('paid_amount_cents', 'cents', lambda b: dollars_to_cents(b['paidAmount'])),
+        Column('approval_status', 'string', lambda b: b['approvalStatus']),
+        Column('approver', 'string', lambda b: b['approver']),
+        Column('payment_status', 'string', lambda b: b['paymentStatus']),
+        Column('gl_account', 'string', lambda b: as_text(b['gl_account'])),
+        Column('gl_account_name', 'string', lambda b: b['gl_account_name']),
+    ]
+
+    # Ways of assigning bills to GL accounts (config: gl_allocation)
+    GL_ALLOCATIONS = ('bill', 'line_items')
+
+    def _init_source(self) -> None:
+        """Set up the source, and how bills are assigned to GL accounts."""
+        super()._init_source()
+        # "bill": whole bill on its bill-level GL account; "line_items": split across its line items' GL accounts
+        self.gl_allocation = self.config.get('gl_allocation', 'bill')
+        if self.gl_allocation not in self.GL_ALLOCATIONS:
+            self.logger.error(f"Invalid gl_allocation: {self.gl_allocation} (expected one of {', '.join(self.GL_ALLOCATIONS)})")
             sys.exit(1)
 
-    def _format_date(self, date_str: Optional[str]) -> str:
-        """
-        Format date for display.
-        
-        Args:
-            date_str: Date string (YYYY-MM-DD format expected from SQLite)
-            
-        Returns:
-            Formatted date string or empty string if None
-        """
-        if not date_str:
-            return ''
-        # SQLite dates are typically YYYY-MM-DD format, which is already readable
-        return date_str
-
     def query_bills(
         self,
         account_group: str,
@@ -119,7 +115,7 @@ class BillStatementDistributor:
         to_date: str
     ) -> List[Dict]:
         """
-        Query bills directly from the database.
+        Query bills for a single account group directly from the database.
         
         Args:
             account_group: The account group name
@@ -129,452 +125,171 @@ class BillStatementDistributor:
         Returns:
             List of bill dictionaries
         """
-        conn = sqlite3.connect(self.database_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        cursor = conn.cursor()
-        
-        # Query with joins to get related data
-        # Note: GL accounts are stored in bills_classifications, linked via chartOfAccountId
-        # Bills have vendorName stored directly, so vendor join is optional
-        # Approver subquery: concatenate approver names from bills_approvers + users, ordered by sortOrder
-        query = """
-        SELECT 
-            b.invoiceDate,
-            COALESCE(v.name, b.vendorName) as vendor_name,
-            b.invoiceNumber,
-            b.dueDate,
-            b.amount,
-            b.paidAmount,
-            b.approvalStatus,
-            (SELECT GROUP_CONCAT(fullname, ', ')
-             FROM (
-               SELECT TRIM(COALESCE(u.firstName, '') || ' ' || COALESCE(u.lastName, '')) as fullname
-               FROM bills_approvers ba
-               JOIN users u ON ba.userId = u.id
-               WHERE ba.billId = b.id
-               ORDER BY COALESCE(ba.sortOrder, 0)
-             )) as approver,
-            b.paymentStatus,
-            a.accountNumber as gl_account,
-            a.name as gl_account_name
-        FROM bills b
-        LEFT JOIN vendors v ON b.vendorId = v.id
-        LEFT JOIN bills_classifications bc ON b.id = bc.billId
-        LEFT JOIN accounts a ON bc.chartOfAccountId = a.id
-        WHERE b.invoiceDate >= ? AND b.invoiceDate <= ?
-        ORDER BY a.accountNumber, b.invoiceDate
-        """
-        
-        cursor.execute(query, (from_date, to_date))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # Filter by account group using shared utility
-        # Note: Some bills may not have classifications, so we skip those without GL accounts
-        filtered_rows = [
-            dict(row) for row in rows 
-            if row['gl_account'] and is_account_in_group(
-                row['gl_account'],
-                account_group,
-                self.account_groups_path
-            )
-        ]
-        
-        return filtered_rows
+        return self.query_by_account_group([account_group], from_date, to_date)[account_group]
 
-    def _format_currency_amount(self, amount: Optional[float]) -> str:
-        """
-        Format currency amount to dollar string.
-        
-        Args:
-            amount: Amount as float (e.g., 123.45 for $123.45)
-            
-        Returns:
-            Formatted amount string like "$1,234.56"
-        """
-        if amount is None:
-            return '$0.00'
-        return f"${amount:,.2f}"
-
-    def generate_csv_from_bills(
-        self,
-        bills: List[Dict],
-        output_path: Path
-    ) -> None:
-        """
-        Generate CSV file from bill data.
-        
-        Args:
-            bills: List of bill dictionaries from database query
-            output_path: Path where CSV should be written
-        """
-        with open(output_path, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write header
-            writer.writerow([
-                "Invoice Date",
-                "Vendor Name",
-                "Invoice Number",
-                "Due Date",
-                "Amount (USD)",
-                "Paid Amount (USD)",
-                "Approval Status",
-                "Approver",
-                "Payment Status",
-                "GL Account",
-                "GL Account Name"
-            ])
-            
-            # Write data rows
-            for bill in bills:
-                writer.writerow([
-                    self._format_date(bill['invoiceDate']),
-                    bill['vendor_name'] or '',
-                    bill['invoiceNumber'] or '',
-                    self._format_date(bill['dueDate']),
-                    self._format_currency_amount(bill['amount']),
-                    self._format_currency_amount(bill['paidAmount']),
-                    bill['approvalStatus'] or '',
-                    bill.get('approver') or '',
-                    bill['paymentStatus'] or '',
-                    bill['gl_account'] or '',
-                    bill['gl_account_name'] or ''
-                ])
-
-    def generate_statement(
+    def build_query(
         self,
-        account_group: str,
+        account_groups: List[str],
         from_date: str,
-        to_date: str
-    ) -> Optional[Path]:
+        to_date: str,
+        schema: Optional[str] = None
+    ) -> Tuple[str, List]:
         """
-        Generate a Bill.com statement from the database.
+        Build the bills query for a date range and set of account groups.
 
         Args:
-            account_group: The account group name
+            account_groups: Names of the account groups to return rows for
             from_date: Start date in YYYY-MM-DD format
             to_date: End date in YYYY-MM-DD format
+            schema: Schema bill-db is attached as (None for the main database)
 
         Returns:
-            Path to the generated CSV file, or None if generation failed
+            Tuple of (SQL query, bound parameters)
         """
-        logger.info(
-            f"Generating statement for {account_group} "
-            f"from {from_date} to {to_date}"
+        # Query with joins to get related data
+        # Note: GL accounts are stored in bills_classifications, linked via chartOfAccountId
+        # (or per line item in bills_line_items_classifications, with gl_allocation "line_items")
+        # Bills have vendorName stored directly, so vendor join is optional
+        # Account group ranges are joined as a generated CTE, so bills without a GL account
+        # (or outside every requested group) never leave SQLite
+        # Approvers: concatenate approver names from bills_approvers + users, ordered by sortOrder,
+        # aggregated in one grouped pass over the selected bills only and joined back by billId
+        ranges_cte, ranges_params = self.account_group_index.ranges_cte(account_groups)
+        db = self.schema_prefix(schema)
+        if self.gl_allocation == 'line_items':
+            allocation_ctes, allocation_params = self._line_item_allocation_ctes(db, from_date, to_date)
+            bill_source = f"""bill_allocations al
+            JOIN {db}bills b ON b.id = al.bill_id"""
+            account_join = f"JOIN {db}accounts a ON al.account_id = a.id"
+            amount = "al.amount"
+            # Paid amount is prorated to the allocated share of the bill
+            paid_amount = "CASE WHEN b.amount THEN ROUND(b.paidAmount * al.amount / b.amount, 2) ELSE b.paidAmount END"
+        else:
+            allocation_ctes, allocation_params = '', []
+            bill_source = f"{db}bills b"
+            account_join = f"""JOIN {db}bills_classifications bc ON b.id = bc.billId
+            JOIN {db}accounts a ON bc.chartOfAccountId = a.id"""
+            amount = "b.amount"
+            paid_amount = "b.paidAmount"
+        query = f"""
+        WITH {ranges_cte},{allocation_ctes}
+        selected_bills AS (
+            SELECT 
+                r.account_group,
+                b.id as bill_id,
+                b.invoiceDate,
+                COALESCE(v.name, b.vendorName) as vendor_name,
+                b.invoiceNumber,
+                b.dueDate,
+                {amount} as amount,
+                {paid_amount} as paidAmount,
+                b.approvalStatus,
+                b.paymentStatus,
+                a.accountNumber as gl_account,
+                a.name as gl_account_name
+            FROM {bill_source}
+            LEFT JOIN {db}vendors v ON b.vendorId = v.id
+            {account_join}
+            JOIN account_group_ranges r ON a.accountNumber BETWEEN r.range_start AND r.range_end
+            WHERE b.invoiceDate >= ? AND b.invoiceDate <= ?
+        ),
+        bill_approvers AS (
+            SELECT billId, GROUP_CONCAT(fullname, ', ') as approver
+            FROM (
+                SELECT ba.billId,
+                       TRIM(COALESCE(u.firstName, '') || ' ' || COALESCE(u.lastName, '')) as fullname
+                FROM {db}bills_approvers ba
+                JOIN {db}users u ON ba.userId = u.id
+                WHERE ba.billId IN (SELECT bill_id FROM selected_bills)
+                ORDER BY ba.billId, COALESCE(ba.sortOrder, 0)
+            )
+            GROUP BY billId
         )
-
-        try:
-            # Query bills from database
-            bills = self.query_bills(account_group, from_date, to_date)
-
-            # Generate CSV file
-            filename = f"Bill-{account_group}-{from_date}-{to_date}.csv"
-            file_path = self.output_dir / filename
-
-            self.generate_csv_from_bills(bills, file_path)
-
-            logger.info(f"Generated statement with {len(bills)} bills: {file_path}")
-            return file_path
-
-        except Exception as e:
-            logger.error(f"Failed to generate statement for {account_group}: {e}")
-            return None
-
-    def send_summary_report(self) -> bool:
-        """
-        Send summary report email to configured recipient.
-        
-        Returns:
-            bool: True if email sent successfully, False otherwise
+        SELECT 
+            s.account_group,
+            s.invoiceDate,
+            s.vendor_name,
+            s.invoiceNumber,
+            s.dueDate,
+            s.amount,
+            s.paidAmount,
+            s.approvalStatus,
+            ap.approver,
+            s.paymentStatus,
+            s.gl_account,
+            s.gl_account_name
+        FROM selected_bills s
+        LEFT JOIN bill_approvers ap ON ap.billId = s.bill_id
+        ORDER BY s.gl_account, s.invoiceDate
         """
-        if not self.summary_config.get('enabled', True):
-            logger.info("Summary report is disabled in configuration")
-            return True
-        
-        recipient = self.summary_config.get('recipient', 'treasurer@apache.org')
-        
-        if not recipient:
-            logger.warning("No recipient configured for summary report")
-            return False
-        
-        stats = self.stats_tracker.get_stats()
-        subject = f"Bill.com Statement Distribution Summary - {stats['from_date']} to {stats['to_date']}"
-        body = generate_summary_report(stats, "Bill.com Statement Distributor")
         
-        logger.info(f"Sending summary report to {recipient}")
-        
-        try:
-            success = send_email(
-                self.smtp_config,
-                recipient,
-                subject,
-                body,
-                logger=logger
-            )
-            if success:
-                logger.info(f"Summary report sent successfully to {recipient}")
-            else:
-                logger.error(f"Failed to send summary report to {recipient}")
-            return success
-        except Exception as e:
-            logger.error(f"Error sending summary report: {e}")
-            return False
+        return query, [*ranges_params, *allocation_params, from_date, to_date]
 
-    def process_account_group(
-        self,
-        ag: Dict,
-        from_date: str,
-        to_date: str,
-        send_emails: bool = False
-    ) -> bool:
-        """
-        Process a single account group: generate statement and send email.
-
-        Args:
-            ag: Account group configuration dictionary
-            from_date: Start date for the statement
-            to_date: End date for the statement
-            send_emails: If True, actually send emails; if False (default), dry-run mode
-
-        Returns:
-            True if processing was successful, False otherwise
+    def _line_item_allocation_ctes(self, db: str, from_date: str, to_date: str) -> Tuple[str, List]:
         """
-        account_group = ag.get('account_group')
-        email = ag.get('email')
-        name = ag.get('name', account_group or 'Unknown')
-
-        if not account_group or not email:
-            logger.error(f"Invalid account group configuration: {ag}")
-            self.stats_tracker.record_failure(
-                name,
-                "Invalid account group configuration (missing account_group or email)"
-            )
-            return False
+        Build the CTEs splitting each bill in the date range across its line items' GL accounts.
 
-        logger.info(f"Processing account group: {name}")
-
-        bcc_address = self.summary_config.get('recipient', 'treasurer@apache.org')
-
-        # Query bills first to check if any exist
-        bills = self.query_bills(account_group, from_date, to_date)
-        
-        # Send no-activity email when account group has no bills
-        if len(bills) == 0:
-            logger.info(f"Sending no-activity email to {name}: no bills found for date range")
-            no_activity_subject = self.email_template.get(
-                'no_activity_subject',
-                self.email_template.get('subject', '') + ' (No Activity)'
-            ).format(account_group=name, from_date=from_date, to_date=to_date)
-            no_activity_body = self.email_template.get(
-                'no_activity_body',
-                "Dear {account_group} Team,\n\nNo Bill.com activity occurred for your account group during {from_date} to {to_date}.\n\nIf you have questions, contact treasurer@apache.org.\n\nBest regards,\nApache Software Foundation Treasury"
-            ).format(account_group=name, from_date=from_date, to_date=to_date)
-            success = send_email(
-                self.smtp_config,
-                email,
-                no_activity_subject,
-                no_activity_body,
-                attachment_path=None,
-                dry_run=not send_emails,
-                logger=logger,
-                bcc=bcc_address
-            )
-            if success:
-                self.stats_tracker.record_sent_no_activity(name)
-            else:
-                self.stats_tracker.record_failure(
-                    name,
-                    "Failed to send no-activity email (see logs for details)"
-                )
-            return success
-
-        # Generate statement
-        statement_path = self.generate_statement(
-            account_group,
-            from_date,
-            to_date
-        )
-
-        if not statement_path:
-            self.stats_tracker.record_failure(
-                name,
-                "Failed to generate statement (see logs for details)"
-            )
-            return False
-
-        # Prepare email
-        subject = self.email_template.get('subject', '').format(
-            account_group=name,
-            from_date=from_date,
-            to_date=to_date
-        )
-
-        body = self.email_template.get('body', '').format(
-            account_group=name,
-            from_date=from_date,
-            to_date=to_date
-        )
-
-        # Send email using shared utility (dry_run is inverse of send_emails)
-        success = send_email(
-            self.smtp_config,
-            email,
-            subject,
-            body,
-            statement_path,
-            dry_run=not send_emails,
-            logger=logger,
-            bcc=bcc_address
-        )
-        
-        # Track results
-        if success:
-            self.stats_tracker.record_success(name)
-        else:
-            self.stats_tracker.record_failure(
-                name,
-                "Failed to send email (see logs for details)"
-            )
-
-        return success
-
-    def run(
-        self,
-        from_date: Optional[str] = None,
-        to_date: Optional[str] = None,
-        send_emails: bool = False,
-        account_group_filter: Optional[str] = None
-    ) -> int:
-        """
-        Run the statement generation and distribution process.
+        bill_allocations has one row per (bill, GL account): the sum of the
+        bill's line items classified to that account, aggregated in one grouped
+        pass over the date range's line items. The rest of the bill amount
+        (unclassified line items, or the whole bill if none is classified)
+        goes to the bill-level classification, so a bill's allocations add up
+        to its amount.
 
         Args:
-            from_date: Optional start date in YYYY-MM-DD format
-            to_date: Optional end date in YYYY-MM-DD format
-            send_emails: If True, actually send emails; if False (default), dry-run mode
-            account_group_filter: Optional comma-separated list of account groups to process
+            db: Schema prefix of the bill-db tables (see schema_prefix())
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
 
         Returns:
-            Exit code (0 for success, 1 for failure)
+            Tuple of (CTE definitions, each followed by a comma; bound parameters)
         """
-        logger.info("Starting Bill.com statement distribution process")
-
-        if not send_emails:
-            logger.info("Running in DRY RUN mode - emails will not be sent (use --send-emails to send)")
-
-        # Filter account groups if specified using shared utility
-        account_groups_to_process = filter_account_groups(self.account_groups, account_group_filter)
-        if account_group_filter:
-            logger.info(f"Filtering to {len(account_groups_to_process)} account group(s) out of {len(self.account_groups)} total")
-
-        # Get date range using shared utility
-        from_date_str, to_date_str = get_date_range(from_date, to_date)
-
-        logger.info(f"Processing statements for {from_date_str} to {to_date_str}")
-
-        # Initialize statistics
-        self.stats_tracker.set_total_account_groups(len(account_groups_to_process))
-        self.stats_tracker.set_date_range(from_date_str, to_date_str)
-
-        # Process each account group
-        for ag in account_groups_to_process:
-            self.process_account_group(
-                ag,
-                from_date_str,
-                to_date_str,
-                send_emails
+        ctes = f"""
+        period_bills AS (
+            SELECT b.id, b.amount
+            FROM {db}bills b
+            WHERE b.invoiceDate >= ? AND b.invoiceDate <= ?
+        ),
+        line_item_allocations AS (
+            SELECT li.billId as bill_id, lic.chartOfAccountId as account_id, ROUND(SUM(li.amount), 2) as amount
+            FROM period_bills pb
+            JOIN {db}bills_line_items li ON li.billId = pb.id
+            JOIN {db}bills_line_items_classifications lic ON lic.billLineItemId = li.id
+            WHERE lic.chartOfAccountId IS NOT NULL
+            GROUP BY li.billId, lic.chartOfAccountId
+        ),
+        classified_amounts AS (
+            SELECT bill_id, SUM(amount) as amount
+            FROM line_item_allocations
+            GROUP BY bill_id
+        ),
+        bill_allocations AS (
+            SELECT bill_id, account_id, ROUND(SUM(amount), 2) as amount
+            FROM (
+                SELECT bill_id, account_id, amount FROM line_item_allocations
+                UNION ALL
+                SELECT bc.billId, bc.chartOfAccountId, pb.amount - COALESCE(ca.amount, 0)
+                FROM period_bills pb
+                JOIN {db}bills_classifications bc ON bc.billId = pb.id
+                LEFT JOIN classified_amounts ca ON ca.bill_id = pb.id
+                WHERE ca.bill_id IS NULL OR ROUND(pb.amount - ca.amount, 2) != 0
             )
+            GROUP BY bill_id, account_id
+        ),"""
+        return ctes, [from_date, to_date]
 
-        # Log summary
-        stats = self.stats_tracker.get_stats()
-        logger.info(
-            f"Processing complete. "
-            f"Successful: {stats['successful']}, "
-            f"Sent (no activity): {stats.get('no_activity', 0)}, "
-            f"Failed: {stats['failed']}"
-        )
-
-        # Send summary report (skip in dry-run mode)
-        if send_emails:
-            self.send_summary_report()
-        else:
-            logger.info("Skipping summary report in dry-run mode")
-
-        return 0 if stats['failed'] == 0 else 1
+    def format_total(self, total: Any) -> str:
+        """Format a statement's amount total in dollars."""
+        return format_dollars(total)
 
 
 def main():
     """Main entry point."""
-    parser = argparse.ArgumentParser(
-        description='Generate and distribute Bill.com statements for specified date ranges'
-    )
-    parser.add_argument(
-        '--config',
-        default='config.json',
-        help='Path to configuration JSON file (default: config.json)'
-    )
-    parser.add_argument(
-        '--account-groups',
-        dest='account_groups',
-        help='Comma-separated list of account groups to process (case-insensitive). If not specified, all account groups are processed.'
-    )
-    parser.add_argument(
-        '--list-account-groups',
-        action='store_true',
-        dest='list_account_groups',
-        help='List all available account groups and exit'
-    )
-
-    # Date specification options
-    parser.add_argument(
-        '--from-date',
-        dest='from_date',
-        help='Start date in YYYY-MM-DD format (default: first day of previous month)'
-    )
-    parser.add_argument(
-        '--to-date',
-        dest='to_date',
-        help='End date in YYYY-MM-DD format (default: last day of previous month)'
-    )
-    parser.add_argument(
-        '--send-emails',
-        action='store_true',
-        dest='send_emails',
-        help='Actually send emails (default: dry-run mode, emails are not sent)'
+    run_cli(
+        BillStatementDistributor,
+        'Generate and distribute Bill.com statements for specified date ranges'
     )
 
-    # Print help if no arguments provided
-    if len(sys.argv) == 1:
-        parser.print_help()
-        sys.exit(0)
-
-    args = parser.parse_args()
-
-    # Verify config file exists before proceeding
-    if not os.path.exists(args.config):
-        print(f"Error: Configuration file not found: {args.config}", file=sys.stderr)
-        sys.exit(1)
-
-    # Set up logging FIRST (before any log messages) using shared utility
-    global logger
-    logger = setup_logging(args.config, __name__)
-
-    # Create distributor to load account groups
-    distributor = BillStatementDistributor(args.config)
-
-    # Handle --list-account-groups (takes precedence, exits immediately)
-    if args.list_account_groups:
-        list_account_groups(distributor.account_groups)
-
-    # Validate date arguments
-    if args.to_date and not args.from_date:
-        parser.error("--to-date requires --from-date")
-        sys.exit(1)
-
-    exit_code = distributor.run(args.from_date, args.to_date, args.send_emails, args.account_groups)
-    sys.exit(exit_code)
-
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Apache Treasury - Combined Statement Distributor
+
+This script generates Ramp credit card and Bill.com accounts payable statements
+for each account group in one run, querying ramp-db and bill-db concurrently,
+and sends each account group a single email with both statements attached
+(or one no-activity notice covering both sources).
+
+Usage:
+    python combined_statement_distributor.py --config config.json
+    python combined_statement_distributor.py --config config.json --from-date 2024-11-01 --to-date 2024-11-30
+    python combined_statement_distributor.py --config config.json --account-groups Infrastructure,Marketing
+    python combined_statement_distributor.py --config config.json --list-account-groups
+    python combined_statement_distributor.py --config config.json --workers 4
+    python combined_statement_distributor.py --config config.json --months 2024-01..2024-12
+    python combined_statement_distributor.py --config config.json --send-emails --resume
+"""
+
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Import shared utilities and the per-source adapters
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'bill-statement-distributor'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'ramp-statement-distributor'))
+from bill_statement_distributor import BillStatementDistributor
+from ramp_statement_distributor import StatementDistributor
+from shared.database import connect_attached
+from shared.delivery_ledger import files_sha256
+from shared.pipeline import StatementDelivery
+from shared.statement_engine import StatementEngine, StatementRunner, run_cli
+from shared.statistics import StatisticsTracker
+
+
+class CombinedStatementDistributor(StatementRunner):
+    """Handles generation and distribution of combined Ramp and Bill.com statements."""
+
+    SOURCE = 'combined'
+    PREFIX = 'Combined'
+    TITLE = 'Combined'
+    ROW_NOUN = 'rows'
+    DEFAULT_OUTPUT_DIR = './combined_statements'
+    NO_ACTIVITY_BODY = (
+        "Dear {account_group} Team,\n\nNo Ramp credit card or Bill.com activity occurred for your account group "
+        "during {from_date} to {to_date}.\n\nIf you have questions, contact treasurer@apache.org.\n\n"
+        "Best regards,\nApache Software Foundation Treasury"
+    )
+
+    # Sources combined into each email, in attachment order
+    SOURCES = (StatementDistributor, BillStatementDistributor)
+
+    def _init_source(self) -> None:
+        """
+        Set up one engine per source, sharing this run's account groups and statistics.
+
+        Each source reads the top-level configuration overlaid with its own
+        block (e.g., "ramp": {"database_path": ...}).
+        """
+        self.sources: List[StatementEngine] = []
+        for source_class in self.SOURCES:
+            source = source_class(
+                None,
+                self.logger,
+                config={**self.config, **self.config.get(source_class.SOURCE, {})},
+                account_groups=self.account_groups,
+                account_group_index=self.account_group_index
+            )
+            source.stats_tracker = self.stats_tracker
+            self.sources.append(source)
+
+        # Read every source through one connection with all databases attached (sqlite.attach)
+        self.attach_databases = self.config.get('sqlite', {}).get('attach', False)
+
+    def load_statements(
+        self,
+        account_groups: List[str],
+        periods: List[Tuple[str, str]],
+        stream: bool = False
+    ) -> None:
+        """
+        Query every source concurrently, each with its single query.
+
+        With sqlite.attach, a single query over all attached databases
+        (see unified_query()) is used instead.
+        """
+        if self.attach_databases:
+            self._load_attached(account_groups, periods, stream)
+            return
+        with ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix='source') as executor:
+            futures = [
+                executor.submit(source.load_statements, account_groups, periods, stream)
+                for source in self.sources
+            ]
+            for future in futures:
+                future.result()
+
+    def unified_query(
+        self,
+        conn: sqlite3.Connection,
+        account_groups: List[str],
+        from_date: str,
+        to_date: str
+    ) -> Tuple[str, List]:
+        """
+        Build one query returning every source's statement rows, tagged by source.
+
+        Each source's own statement query is used unchanged, against its
+        database attached under the source name, as a subquery (SQLite views
+        cannot take the bound date range). Their rows are padded with NULLs to
+        the union of all sources' columns and combined with UNION ALL, then
+        sorted once: by source, then in each source's statement order.
+
+        Args:
+            conn: Connection with every source database attached (see connect_attached)
+            account_groups: Names of the account groups to return rows for
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+
+        Returns:
+            Tuple of (SQL query, bound parameters)
+        """
+        source_queries = []
+        columns: Dict[str, None] = {}
+        for source in self.sources:
+            query, params = source.build_query(account_groups, from_date, to_date, schema=source.SOURCE)
+            source_columns = [
+                column[0] for column in conn.execute(f"SELECT * FROM ({query}) LIMIT 0", params).description
+            ]
+            columns.update(dict.fromkeys(source_columns))
+            source_queries.append((source, query, params, source_columns))
+
+        selects = []
+        all_params = []
+        for source, query, params, source_columns in source_queries:
+            padded = ', '.join(
+                f'"{column}"' if column in source_columns else f'NULL AS "{column}"' for column in columns
+            )
+            selects.append(
+                f"SELECT '{source.SOURCE}' AS source, {source.DATE_KEY} AS statement_date, {padded} "
+                f"FROM ({query})"
+            )
+            all_params.extend(params)
+        unified = "\nUNION ALL\n".join(selects) + "\nORDER BY source, gl_account, statement_date"
+        return unified, all_params
+
+    def _load_attached(
+        self,
+        account_groups: List[str],
+        periods: List[Tuple[str, str]],
+        stream: bool = False
+    ) -> None:
+        """Read every source with one query over the attached databases, routing each source's rows in one pass."""
+        sqlite_config = self.config.get('sqlite', {})
+        conn = connect_attached(
+            {source.SOURCE: source.database_path for source in self.sources},
+            immutable=sqlite_config.get('immutable', False),
+            pragmas=sqlite_config.get('pragmas')
+        )
+        try:
+            query, params = self.unified_query(conn, account_groups, periods[0][0], periods[-1][1])
+            cursor = conn.cursor()
+            with self.stats_tracker.time_stage('query'):
+                cursor.execute(query, params)
+            rows = (row for batch in self.stats_tracker.timed_batches(cursor) for row in batch)
+
+            # Rows arrive sorted by source: hand each source its run of rows
+            loaded = set()
+            for source_name, source_rows in groupby(rows, key=lambda row: row['source']):
+                source = next(source for source in self.sources if source.SOURCE == source_name)
+                source.load_rows(account_groups, periods, source_rows, stream)
+                loaded.add(source_name)
+            for source in self.sources:
+                if source.SOURCE not in loaded:
+                    source.load_rows(account_groups, periods, iter(()), stream)
+        finally:
+            conn.close()
+
+    def loaded_row_count(self) -> int:
+        """Get the number of rows load_statements() read, across every source."""
+        return sum(source.loaded_row_count() for source in self.sources)
+
+    def close_connections(self) -> None:
+        """Close every source's database connections."""
+        for source in self.sources:
+            source.close_connections()
+
+    def ensure_indexes(self) -> int:
+        """
+        Create missing secondary indexes and verify the query plans of every source.
+
+        Returns:
+            Exit code (0 for success, 1 if a full scan remains in any source)
+        """
+        return max(source.ensure_indexes() for source in self.sources)
+
+    def render_account_group(
+        self,
+        ag: Dict,
+        from_date: str,
+        to_date: str,
+        send_emails: bool = False,
+        skip_unchanged: bool = False,
+        stats_tracker: Optional[StatisticsTracker] = None
+    ) -> Optional[StatementDelivery]:
+        """
+        Render stage for a single account group: generate every source's statement and prepare one email.
+
+        Sources without activity are left out of the email; if no source had
+        activity, a single no-activity email is prepared.
+
+        Args:
+            ag: Account group configuration dictionary
+            from_date: Start date for the statements
+            to_date: End date for the statements
+            send_emails: If True, emails will actually be sent (failures are recorded
+                in the delivery ledger); if False (default), dry-run mode
+            skip_unchanged: If True, do not re-send an email identical to one the
+                delivery ledger records as already delivered
+            stats_tracker: Tracker to record results on (default: the run's tracker;
+                a period tracker in multi-period runs)
+
+        Returns:
+            The email to send, or None if there is nothing to send (the outcome,
+            a failure or an unchanged email, has already been recorded)
+        """
+        if stats_tracker is None:
+            stats_tracker = self.stats_tracker
+        account_group = ag.get('account_group')
+        email = ag.get('email')
+        name = ag.get('name', account_group or 'Unknown')
+
+        if not account_group or not email:
+            self.logger.error(f"Invalid account group configuration: {ag}")
+            stats_tracker.record_failure(
+                name,
+                "Invalid account group configuration (missing account_group or email)"
+            )
+            return None
+
+        self.logger.info(f"Processing account group: {name}")
+
+        # Render each source's statement, freeing its rows once written
+        row_count = 0
+        statement_paths = []
+        totals = []
+        summary = []
+        failed_sources = []
+        for source in self.sources:
+            dataset = source.statement_dataset
+            dataset.materialize([account_group], from_date, to_date, source.query_by_account_group)
+            source_rows = dataset.row_count(account_group, from_date, to_date)
+            row_count += source_rows
+            if not dataset.has_activity(account_group, from_date, to_date):
+                dataset.release(account_group, from_date, to_date)
+                summary.append(f"{source.TITLE}: no activity")
+                continue
+
+            with stats_tracker.time_stage('csv', name, excluding=('query', 'classify')):
+                statement_path = source.generate_statement(account_group, from_date, to_date)
+            total = source.format_total(dataset.total(account_group, from_date, to_date))
+            dataset.release(account_group, from_date, to_date)
+
+            if not statement_path:
+                failed_sources.append(source.TITLE)
+                continue
+            statement_paths.append(statement_path)
+            totals.append(f"{source.TITLE} {total}")
+            summary.append(f"{source.TITLE}: {source_rows} {source.ROW_NOUN}, {total}")
+        stats_tracker.record_row_count(name, row_count)
+
+        if failed_sources:
+            stats_tracker.record_failure(
+                name,
+                f"Failed to generate {', '.join(failed_sources)} statement (see logs for details)"
+            )
+            if send_emails:
+                self.delivery_ledger.record(
+                    account_group, from_date, to_date, 'failed', reason="Failed to generate statement"
+                )
+            return None
+
+        # Send one no-activity email when no source has activity
+        if not statement_paths:
+            if skip_unchanged and self.delivery_ledger.is_unchanged(
+                account_group, from_date, to_date, 'no_activity', None
+            ):
+                self.logger.info(f"Not re-sending no-activity email to {name}: already delivered")
+                stats_tracker.record_unchanged(name)
+                return None
+            self.logger.info(f"Sending no-activity email to {name}: no activity in any source for date range")
+            no_activity_subject = self.email_template.get(
+                'no_activity_subject',
+                self.email_template.get('subject', '') + ' (No Activity)'
+            ).format(account_group=name, from_date=from_date, to_date=to_date, summary='')
+            no_activity_body = self.email_template.get(
+                'no_activity_body',
+                self.NO_ACTIVITY_BODY
+            ).format(account_group=name, from_date=from_date, to_date=to_date, summary='')
+            return StatementDelivery(
+                name, account_group, email, no_activity_subject, no_activity_body, None,
+                from_date, to_date, 'no_activity', None, 0, stats_tracker
+            )
+
+        stats_tracker.record_attachment_bytes(name, sum(path.stat().st_size for path in statement_paths))
+        stats_tracker.record_statement_totals(name, row_count, '; '.join(totals))
+        content_hash = files_sha256(statement_paths)
+
+        if skip_unchanged and self.delivery_ledger.is_unchanged(
+            account_group, from_date, to_date, 'sent', content_hash
+        ):
+            self.logger.info(f"Not re-sending statements to {name}: identical statements already delivered")
+            stats_tracker.record_unchanged(name)
+            return None
+
+        # Prepare email ({summary} lists each source's rows and total)
+        fields = dict(account_group=name, from_date=from_date, to_date=to_date, summary='\n'.join(summary))
+        subject = self.email_template.get('subject', '').format(**fields)
+        body = self.email_template.get('body', '').format(**fields)
+
+        return StatementDelivery(
+            name, account_group, email, subject, body, statement_paths,
+            from_date, to_date, 'sent', content_hash, row_count, stats_tracker
+        )
+
+
+def main():
+    """Main entry point."""
+    run_cli(
+        CombinedStatementDistributor,
+        'Generate Ramp and Bill.com statements and send each account group one email with both'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -11,91 +11,89 @@ Usage:
     python ramp_statement_distributor.py --config config.json --from-date 2024-01-01 --to-date 2024-12-31
     python ramp_statement_distributor.py --config config.json --account-groups Infrastructure,Marketing
     python ramp_statement_distributor.py --config config.json --list-account-groups
+    python ramp_statement_distributor.py --config config.json --workers 4
+    python ramp_statement_distributor.py --config config.json --months 2024-01..2024-12
+    python ramp_statement_distributor.py --config config.json --quarters 2024Q1..2024Q4
+    python ramp_statement_distributor.py --config config.json --from-date 2024-01-01 --to-date 2024-12-31 --stream
+    python ramp_statement_distributor.py --config config.json --send-emails --resume
+    python ramp_statement_distributor.py --config config.json --send-emails --skip-unchanged
     python ramp_statement_distributor.py --config config.json --dry-run
 """
 
-import argparse
-import csv
-import json
-import os
-import sqlite3
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 # Import shared utilities
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from shared.logging_config import setup_logging
-from shared.email_sender import send_email
-from shared.account_group_manager import load_account_groups, filter_account_groups, list_account_groups
-from shared.account_groups import is_account_in_group
-from shared.date_utils import get_date_range
-from shared.formatters import format_accounting_date, format_amount
-from shared.statistics import StatisticsTracker, generate_summary_report
+from shared.formatters import CsvColumn, format_amount
+from shared.statement_engine import StatementEngine, run_cli
+from shared.statement_writers import Column, as_text, parse_timestamp
 
 
-# Global logger (will be initialized in main())
-logger = None
-
-
-class StatementDistributor:
+class StatementDistributor(StatementEngine):
     """Handles generation and distribution of monthly credit card statements."""
 
-    def __init__(self, config_path: str):
-        """
-        Initialize the distributor with configuration.
-
-        Args:
-            config_path: Path to the JSON configuration file
-        """
-        self.config = self._load_config(config_path)
-        self.smtp_config = self.config.get('smtp', {})
-        self.email_template = self.config.get('email_template', {})
-        self.output_dir = Path(self.config.get('output_dir', './statements'))
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Set database path from config
-        database_path = self.config.get('database_path')
-        if database_path:
-            self.database_path = Path(database_path)
-        else:
-            # Default to standard location
-            script_dir = Path(__file__).parent
-            self.database_path = script_dir / '../../packages/ramp-db/ramp-db.db'
-        
-        # Verify database exists
-        if not self.database_path.exists():
-            logger.error(f"Database file not found: {self.database_path}")
-            sys.exit(1)
-        
-        # Set account groups path to standard location
-        script_dir = Path(__file__).parent
-        self.account_groups_path = script_dir / '../../packages/shared-utils/src/AccountGroups.json'
-        
-        # Load account groups from AccountGroups.json using shared utility
-        self.account_groups = load_account_groups(self.account_groups_path)
-        logger.info(f"Loaded {len(self.account_groups)} account groups from AccountGroups.json")
-        
-        # Summary report configuration
-        self.summary_config = self.config.get('summary_report', {
-            'enabled': True,
-            'recipient': 'treasurer@apache.org'
-        })
-        
-        # Initialize statistics tracking using shared utility
-        self.stats_tracker = StatisticsTracker()
+    SOURCE = 'ramp'
+    PREFIX = 'Ramp'
+    TITLE = 'Ramp'
+    ROW_NOUN = 'transactions'
+    AMOUNT_KEY = 'amount_amt'
+    DATE_KEY = 'accounting_date'
+    DEFAULT_DATABASE_PATH = 'packages/ramp-db/ramp-db.db'
+    DEFAULT_OUTPUT_DIR = './statements'
+    NO_ACTIVITY_BODY = (
+        "Dear {account_group} Team,\n\nNo Ramp credit card activity occurred for your account group during "
+        "{from_date} to {to_date}.\n\nIf you have questions, contact treasurer@apache.org.\n\n"
+        "Best regards,\nApache Software Foundation Treasury"
+    )
 
-    def _load_config(self, config_path: str) -> Dict:
-        """Load configuration from JSON file."""
-        try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logger.error(f"Configuration file not found: {config_path}")
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in configuration file: {e}")
-            sys.exit(1)
+    # Secondary indexes backing the query access paths (created by --ensure-indexes)
+    REQUIRED_INDEXES = [
+        ('transactions_accounting_date_idx', 'transactions', ['accounting_date']),
+        (
+            'transactions_line_items_accounting_field_selections_gl_idx',
+            'transactions_line_items_accounting_field_selections',
+            ['transaction_id', 'index_line_item', 'category_info_type', 'external_code']
+        ),
+    ]
+
+    # Query aliases of tables that must never be full-scanned
+    GUARDED_TABLES = {
+        't': 'transactions',
+        'tli': 'transactions_line_items',
+        'tliafs': 'transactions_line_items_accounting_field_selections',
+        'tafs': 'transactions_accounting_field_selections',
+    }
+
+    # CSV statement columns
+    CSV_COLUMNS = [
+        CsvColumn("Accounting Date-Time", 'accounting_date', 'timestamp'),
+        CsvColumn("User Name", 'user_name'),
+        CsvColumn("Card Name", 'card_name'),
+        CsvColumn("Last 4", 'last_four'),
+        CsvColumn("Original Amount", 'original_transaction_amount_amt', 'cents'),
+        CsvColumn("Settled Amount", 'amount_amt', 'cents'),
+        CsvColumn("Merchant", 'merchant_name'),
+        CsvColumn("GL Account", 'gl_account'),
+        CsvColumn("State", 'state'),
+    ]
+    CSV_HEADER = [column.header for column in CSV_COLUMNS]
+
+    # Typed columnar statement columns (Parquet / Arrow IPC output)
+    COLUMNS = [
+        Column('accounting_date', 'timestamp', lambda t: parse_timestamp(t['accounting_date'])),
+        Column('user_name', 'string', lambda t: t['user_name']),
+        Column('card_name', 'string', lambda t: t['card_name']),
+        Column('last_four', 'string', lambda t: as_text(t['last_four'])),
+        Column('original_amount_cents', 'cents', lambda t: t['original_transaction_amount_amt']),
+        Column('original_currency', 'string', lambda t: t['original_transaction_amount_cc']),
+        Column('settled_amount_cents', 'cents', lambda t: t['amount_amt']),
+        Column('settled_currency', 'string', lambda t: t['amount_cc']),
+        Column('merchant_name', 'string', lambda t: t['merchant_name']),
+        Column('gl_account', 'string', lambda t: as_text(t['gl_account'])),
+        Column('state', 'string', lambda t: t['state']),
+    ]
 
     def query_transactions(
         self,
@@ -104,7 +102,7 @@ class StatementDistributor:
         to_date: str
     ) -> List[Dict]:
         """
-        Query transactions directly from the database.
+        Query transactions for a single account group directly from the database.
         
         Args:
             account_group: The account group name
@@ -114,413 +112,133 @@ class StatementDistributor:
         Returns:
             List of transaction dictionaries
         """
-        conn = sqlite3.connect(self.database_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        cursor = conn.cursor()
-        
-        # Query with joins to get related data
-        # Note: GL accounts are stored in line item accounting field selections, not transaction-level selections
-        query = """
-        SELECT 
-            t.accounting_date,
-            u.first_name || ' ' || u.last_name as user_name,
-            c.display_name as card_name,
-            c.last_four,
-            t.original_transaction_amount_amt,
-            t.original_transaction_amount_cc,
-            t.amount_amt,
-            t.amount_cc,
-            t.merchant_name,
-            t.state,
-            tliafs.external_code as gl_account
-        FROM transactions t
-        LEFT JOIN cards c ON t.card_id = c.id
-        LEFT JOIN users u ON t.card_holder_user_id = u.id
-        LEFT JOIN transactions_line_items tli ON t.id = tli.transaction_id
-        LEFT JOIN transactions_line_items_accounting_field_selections tliafs 
-            ON t.id = tliafs.transaction_id 
-            AND tli.index_line_item = tliafs.index_line_item
-            AND tliafs.category_info_type = 'GL_ACCOUNT'
-        WHERE t.accounting_date >= ? AND t.accounting_date <= ?
-        ORDER BY tliafs.external_code, t.accounting_date
-        """
-        
-        from_datetime = from_date + "T00:00:00.000Z"
-        to_datetime = to_date + "T23:59:59.999Z"
-        
-        cursor.execute(query, (from_datetime, to_datetime))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # Filter by account group using shared utility
-        filtered_rows = [
-            dict(row) for row in rows 
-            if is_account_in_group(row['gl_account'] or '', account_group, self.account_groups_path)
-        ]
-        
-        return filtered_rows
-
-    def generate_csv_from_transactions(
-        self,
-        transactions: List[Dict],
-        output_path: Path
-    ) -> None:
-        """Generate CSV file from transaction data."""
-        with open(output_path, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write header
-            writer.writerow([
-                "Accounting Date-Time", "User Name", "Card Name", "Last 4",
-                "Original Amount", "Settled Amount", "Merchant", "GL Account", "State"
-            ])
-            
-            # Write data rows using shared formatters
-            for t in transactions:
-                writer.writerow([
-                    format_accounting_date(t['accounting_date']),
-                    t['user_name'] or '',
-                    t['card_name'] or '',
-                    t['last_four'] or '',
-                    format_amount(t['original_transaction_amount_amt'], t['original_transaction_amount_cc']),
-                    format_amount(t['amount_amt'], t['amount_cc']),
-                    t['merchant_name'] or '',
-                    t['gl_account'] or '',
-                    t['state'] or ''
-                ])
+        return self.query_by_account_group([account_group], from_date, to_date)[account_group]
 
-    def generate_statement(
+    def build_query(
         self,
-        account_group: str,
+        account_groups: List[str],
         from_date: str,
-        to_date: str
-    ) -> Optional[Path]:
+        to_date: str,
+        schema: Optional[str] = None
+    ) -> Tuple[str, List]:
         """
-        Generate a credit card statement from the database.
+        Build the transactions query for a date range and set of account groups.
 
         Args:
-            account_group: The account group name
+            account_groups: Names of the account groups to return rows for
             from_date: Start date in YYYY-MM-DD format
             to_date: End date in YYYY-MM-DD format
+            schema: Schema ramp-db is attached as (None for the main database)
 
         Returns:
-            Path to the generated CSV file, or None if generation failed
-        """
-        logger.info(
-            f"Generating statement for {account_group} "
-            f"from {from_date} to {to_date}"
-        )
-
-        try:
-            # Query transactions from database
-            transactions = self.query_transactions(account_group, from_date, to_date)
-
-            # Generate CSV file
-            filename = f"Ramp-{account_group}-{from_date}-{to_date}.csv"
-            file_path = self.output_dir / filename
-
-            self.generate_csv_from_transactions(transactions, file_path)
-
-            logger.info(f"Generated statement with {len(transactions)} transactions: {file_path}")
-            return file_path
-
-        except Exception as e:
-            logger.error(f"Failed to generate statement for {account_group}: {e}")
-            return None
-
-    def send_summary_report(self) -> bool:
+            Tuple of (SQL query, bound parameters)
         """
-        Send summary report email to configured recipient.
-        
-        Returns:
-            bool: True if email sent successfully, False otherwise
-        """
-        if not self.summary_config.get('enabled', True):
-            logger.info("Summary report is disabled in configuration")
-            return True
-        
-        recipient = self.summary_config.get('recipient', 'treasurer@apache.org')
-        
-        if not recipient:
-            logger.warning("No recipient configured for summary report")
-            return False
-        
-        stats = self.stats_tracker.get_stats()
-        subject = f"Ramp Statement Distribution Summary - {stats['from_date']} to {stats['to_date']}"
-        body = generate_summary_report(stats, "Ramp Statement Distributor")
-        
-        logger.info(f"Sending summary report to {recipient}")
-        
-        try:
-            success = send_email(
-                self.smtp_config,
-                recipient,
-                subject,
-                body,
-                logger=logger
+        # Query with joins to get related data
+        # Note: GL accounts are stored in line item accounting field selections, and a transaction
+        # may also carry a transaction-level GL selection
+        # Line items are pre-aggregated per (transaction, GL account), so each transaction is
+        # returned once per GL account, with the amount of its line items coded to that account;
+        # the rest of the transaction amount (uncoded line items, or all of it if no line item is
+        # coded) goes to the transaction-level GL account, so a transaction's rows add up to its amount
+        # Line items are summed in the transaction's settled currency (amount_cc): a line item in
+        # another currency counts with its converted amount, and one without a settled amount
+        # counts as uncoded
+        # Account group ranges are joined as a generated CTE, so transactions outside
+        # every requested group never leave SQLite
+        ranges_cte, ranges_params = self.account_group_index.ranges_cte(account_groups)
+        db = self.schema_prefix(schema)
+        query = f"""
+        WITH {ranges_cte},
+        line_item_settled_amounts AS (
+            SELECT
+                tli.transaction_id,
+                tliafs.external_code as gl_account,
+                CASE
+                    WHEN tli.amount_cc IS NULL OR t.amount_cc IS NULL OR tli.amount_cc = t.amount_cc
+                        THEN tli.amount_amt
+                    WHEN tli.converted_amount_cc IS NULL OR tli.converted_amount_cc = t.amount_cc
+                        THEN tli.converted_amount_amt
+                END as settled_amount_amt
+            FROM {db}transactions t
+            JOIN {db}transactions_line_items tli ON t.id = tli.transaction_id
+            JOIN {db}transactions_line_items_accounting_field_selections tliafs
+                ON t.id = tliafs.transaction_id
+                AND tli.index_line_item = tliafs.index_line_item
+                AND tliafs.category_info_type = 'GL_ACCOUNT'
+            WHERE t.accounting_date >= ? AND t.accounting_date <= ?
+                AND tliafs.external_code IS NOT NULL
+        ),
+        line_item_gl_accounts AS (
+            SELECT transaction_id, gl_account, SUM(settled_amount_amt) as amount_amt
+            FROM line_item_settled_amounts
+            WHERE settled_amount_amt IS NOT NULL
+            GROUP BY transaction_id, gl_account
+        ),
+        coded_amounts AS (
+            SELECT transaction_id, SUM(amount_amt) as amount_amt
+            FROM line_item_gl_accounts
+            GROUP BY transaction_id
+        ),
+        transaction_gl_accounts AS (
+            SELECT transaction_id, gl_account, SUM(amount_amt) as amount_amt
+            FROM (
+                SELECT transaction_id, gl_account, amount_amt FROM line_item_gl_accounts
+                UNION ALL
+                SELECT t.id, tafs.external_code, t.amount_amt - COALESCE(ca.amount_amt, 0)
+                FROM {db}transactions t
+                JOIN {db}transactions_accounting_field_selections tafs
+                    ON t.id = tafs.transaction_id
+                    AND tafs.category_info_type = 'GL_ACCOUNT'
+                LEFT JOIN coded_amounts ca ON ca.transaction_id = t.id
+                WHERE t.accounting_date >= ? AND t.accounting_date <= ?
+                    AND tafs.external_code IS NOT NULL
+                    AND (ca.transaction_id IS NULL OR t.amount_amt != ca.amount_amt)
             )
-            if success:
-                logger.info(f"Summary report sent successfully to {recipient}")
-            else:
-                logger.error(f"Failed to send summary report to {recipient}")
-            return success
-        except Exception as e:
-            logger.error(f"Error sending summary report: {e}")
-            return False
-
-    def process_account_group(
-        self,
-        ag: Dict,
-        from_date: str,
-        to_date: str,
-        send_emails: bool = False
-    ) -> bool:
-        """
-        Process a single account group: download statement and send email.
-
-        Args:
-            ag: Account group configuration dictionary
-            from_date: Start date for the statement
-            to_date: End date for the statement
-            send_emails: If True, actually send emails; if False (default), dry-run mode
-
-        Returns:
-            True if processing was successful, False otherwise
+            GROUP BY transaction_id, gl_account
+        )
+        SELECT 
+            r.account_group,
+            t.accounting_date,
+            u.first_name || ' ' || u.last_name as user_name,
+            c.display_name as card_name,
+            c.last_four,
+            CASE
+                WHEN g.amount_amt = t.amount_amt OR COALESCE(t.amount_amt, 0) = 0 THEN t.original_transaction_amount_amt
+                ELSE CAST(ROUND(t.original_transaction_amount_amt * g.amount_amt * 1.0 / t.amount_amt) AS INTEGER)
+            END as original_transaction_amount_amt,
+            t.original_transaction_amount_cc,
+            g.amount_amt,
+            t.amount_cc,
+            t.merchant_name,
+            t.state,
+            g.gl_account
+        FROM transaction_gl_accounts g
+        JOIN {db}transactions t ON t.id = g.transaction_id
+        LEFT JOIN {db}cards c ON t.card_id = c.id
+        LEFT JOIN {db}users u ON t.card_holder_user_id = u.id
+        JOIN account_group_ranges r ON g.gl_account BETWEEN r.range_start AND r.range_end
+        ORDER BY g.gl_account, t.accounting_date
         """
-        account_group = ag.get('account_group')
-        email = ag.get('email')
-        name = ag.get('name', account_group or 'Unknown')
-
-        if not account_group or not email:
-            logger.error(f"Invalid account group configuration: {ag}")
-            self.stats_tracker.record_failure(
-                name,
-                "Invalid account group configuration (missing account_group or email)"
-            )
-            return False
-
-        logger.info(f"Processing account group: {name}")
-
-        bcc_address = self.summary_config.get('recipient', 'treasurer@apache.org')
-
-        # Query transactions first to check if any exist
-        transactions = self.query_transactions(account_group, from_date, to_date)
         
-        # Send no-activity email when account group has no transactions
-        if len(transactions) == 0:
-            logger.info(f"Sending no-activity email to {name}: no transactions found for date range")
-            no_activity_subject = self.email_template.get(
-                'no_activity_subject',
-                self.email_template.get('subject', '') + ' (No Activity)'
-            ).format(account_group=name, from_date=from_date, to_date=to_date)
-            no_activity_body = self.email_template.get(
-                'no_activity_body',
-                "Dear {account_group} Team,\n\nNo Ramp credit card activity occurred for your account group during {from_date} to {to_date}.\n\nIf you have questions, contact treasurer@apache.org.\n\nBest regards,\nApache Software Foundation Treasury"
-            ).format(account_group=name, from_date=from_date, to_date=to_date)
-            success = send_email(
-                self.smtp_config,
-                email,
-                no_activity_subject,
-                no_activity_body,
-                attachment_path=None,
-                dry_run=not send_emails,
-                logger=logger,
-                bcc=bcc_address
-            )
-            if success:
-                self.stats_tracker.record_sent_no_activity(name)
-            else:
-                self.stats_tracker.record_failure(
-                    name,
-                    "Failed to send no-activity email (see logs for details)"
-                )
-            return success
-
-        # Generate statement
-        statement_path = self.generate_statement(
-            account_group,
-            from_date,
-            to_date
-        )
-
-        if not statement_path:
-            self.stats_tracker.record_failure(
-                name,
-                "Failed to generate statement (see logs for details)"
-            )
-            return False
-
-        # Prepare email
-        subject = self.email_template.get('subject', '').format(
-            account_group=name,
-            from_date=from_date,
-            to_date=to_date
-        )
-
-        body = self.email_template.get('body', '').format(
-            account_group=name,
-            from_date=from_date,
-            to_date=to_date
-        )
-
-        # Send email using shared utility (dry_run is inverse of send_emails)
-        success = send_email(
-            self.smtp_config,
-            email,
-            subject,
-            body,
-            statement_path,
-            dry_run=not send_emails,
-            logger=logger,
-            bcc=bcc_address
-        )
+        from_datetime, to_datetime = self.date_bounds(from_date, to_date)
         
-        # Track results
-        if success:
-            self.stats_tracker.record_success(name)
-        else:
-            self.stats_tracker.record_failure(
-                name,
-                "Failed to send email (see logs for details)"
-            )
+        return query, [*ranges_params, from_datetime, to_datetime, from_datetime, to_datetime]
 
-        return success
+    def date_bounds(self, from_date: str, to_date: str) -> Tuple[str, str]:
+        """Get the accounting_date timestamps bounding a YYYY-MM-DD date range (inclusive)."""
+        return from_date + "T00:00:00.000Z", to_date + "T23:59:59.999Z"
 
-    def run(
-        self,
-        from_date: Optional[str] = None,
-        to_date: Optional[str] = None,
-        send_emails: bool = False,
-        account_group_filter: Optional[str] = None
-    ) -> int:
-        """
-        Run the statement generation and distribution process.
-
-        Args:
-            from_date: Optional start date in YYYY-MM-DD format
-            to_date: Optional end date in YYYY-MM-DD format
-            send_emails: If True, actually send emails; if False (default), dry-run mode
-            account_group_filter: Optional comma-separated list of account groups to process
-
-        Returns:
-            Exit code (0 for success, 1 for failure)
-        """
-        logger.info("Starting statement distribution process")
-
-        if not send_emails:
-            logger.info("Running in DRY RUN mode - emails will not be sent (use --send-emails to send)")
-
-        # Filter account groups if specified using shared utility
-        account_groups_to_process = filter_account_groups(self.account_groups, account_group_filter)
-        if account_group_filter:
-            logger.info(f"Filtering to {len(account_groups_to_process)} account group(s) out of {len(self.account_groups)} total")
-
-        # Get date range using shared utility
-        from_date_str, to_date_str = get_date_range(from_date, to_date)
-
-        logger.info(f"Processing statements for {from_date_str} to {to_date_str}")
-
-        # Initialize statistics
-        self.stats_tracker.set_total_account_groups(len(account_groups_to_process))
-        self.stats_tracker.set_date_range(from_date_str, to_date_str)
-
-        # Process each account group
-        for ag in account_groups_to_process:
-            self.process_account_group(
-                ag,
-                from_date_str,
-                to_date_str,
-                send_emails
-            )
-
-        # Log summary
-        stats = self.stats_tracker.get_stats()
-        logger.info(
-            f"Processing complete. "
-            f"Successful: {stats['successful']}, "
-            f"Sent (no activity): {stats.get('no_activity', 0)}, "
-            f"Failed: {stats['failed']}"
-        )
-
-        # Send summary report (skip in dry-run mode)
-        if send_emails:
-            self.send_summary_report()
-        else:
-            logger.info("Skipping summary report in dry-run mode")
-
-        return 0 if stats['failed'] == 0 else 1
+    def format_total(self, total: Any) -> str:
+        """Format a statement's settled amount total (in cents) as dollars."""
+        return format_amount(total)
 
 
 def main():
     """Main entry point."""
-    parser = argparse.ArgumentParser(
-        description='Generate and distribute credit card statements for specified date ranges'
+    run_cli(
+        StatementDistributor,
+        'Generate and distribute credit card statements for specified date ranges'
     )
-    parser.add_argument(
-        '--config',
-        default='config.json',
-        help='Path to configuration JSON file (default: config.json)'
-    )
-    parser.add_argument(
-        '--account-groups',
-        dest='account_groups',
-        help='Comma-separated list of account groups to process (case-insensitive). If not specified, all account groups are processed.'
-    )
-    parser.add_argument(
-        '--list-account-groups',
-        action='store_true',
-        dest='list_account_groups',
-        help='List all available account groups and exit'
-    )
-
-    # Date specification options
-    parser.add_argument(
-        '--from-date',
-        dest='from_date',
-        help='Start date in YYYY-MM-DD format (default: first day of previous month)'
-    )
-    parser.add_argument(
-        '--to-date',
-        dest='to_date',
-        help='End date in YYYY-MM-DD format (default: last day of previous month)'
-    )
-    parser.add_argument(
-        '--send-emails',
-        action='store_true',
-        dest='send_emails',
-        help='Actually send emails (default: dry-run mode, emails are not sent)'
-    )
-
-    # Print help if no arguments provided
-    if len(sys.argv) == 1:
-        parser.print_help()
-        sys.exit(0)
-
-    args = parser.parse_args()
-
-    # Verify config file exists before proceeding
-    if not os.path.exists(args.config):
-        print(f"Error: Configuration file not found: {args.config}", file=sys.stderr)
-        sys.exit(1)
-
-    # Set up logging FIRST (before any log messages) using shared utility
-    global logger
-    logger = setup_logging(args.config, __name__)
-
-    # Create distributor to load account groups
-    distributor = StatementDistributor(args.config)
-
-    # Handle --list-account-groups (takes precedence, exits immediately)
-    if args.list_account_groups:
-        list_account_groups(distributor.account_groups)
-
-    # Validate date arguments
-    if args.to_date and not args.from_date:
-        parser.error("--to-date requires --from-date")
-        sys.exit(1)
-
-    exit_code = distributor.run(args.from_date, args.to_date, args.send_emails, args.account_groups)
-    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
@@ -2,35 +2,55 @@
 GL account group filtering utilities.
 
 Provides functionality to check if GL account numbers fall within
-configured account group ranges from AccountGroups.json.
+configured account group ranges from AccountGroups.json: a load-once
+index answering per-account lookups with a binary search, which statement
+queries also join as a CTE so that SQLite filters GL accounts, and the
+partitioning of query rows already tagged with their account group.
 """
 
 import json
 import sys
+from bisect import bisect_left
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 
-def load_account_group_ranges(account_groups_path: Path, account_group: str) -> List[Dict[str, str]]:
+def _load_account_groups_data(account_groups_path: Path) -> List[Dict]:
     """
-    Load account code ranges for a specific account group.
-    
+    Read and parse AccountGroups.json.
+
     Args:
         account_groups_path: Path to AccountGroups.json file
-        account_group: Name of the account group (account group name)
-        
+
     Returns:
-        List of range dictionaries with 'start' and 'end' keys
+        List of raw account group dictionaries
+
+    Raises:
+        SystemExit: If file not found or invalid JSON
     """
     try:
         with open(account_groups_path, 'r') as f:
-            account_groups = json.load(f)
+            return json.load(f)
     except FileNotFoundError:
         print(f"Error: AccountGroups.json not found: {account_groups_path}", file=sys.stderr)
         sys.exit(1)
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON in AccountGroups.json: {e}", file=sys.stderr)
         sys.exit(1)
+
+
+def load_account_group_ranges(account_groups_path: Path, account_group: str) -> List[Dict[str, str]]:
+    """
+    Load account code ranges for a specific account group.
+    
+    Args:
+        account_groups_path: Path to AccountGroups.json file
+        account_group: Name of the account group (account group name)
+        
+    Returns:
+        List of range dictionaries with 'start' and 'end' keys
+    """
+    account_groups = _load_account_groups_data(account_groups_path)
     
     for group in account_groups:
         if group.get('groupName') == account_group:
@@ -44,6 +64,9 @@ def is_account_in_group(gl_account: str, account_group: str, account_groups_path
     
     Uses string-based comparison to check if the GL account number
     falls within any of the configured ranges for the account group.
+
+    Note: this re-reads AccountGroups.json on every call. Code that classifies
+    many rows should build an AccountGroupIndex once and use it instead.
     
     Args:
         gl_account: GL account number as string (e.g., "6450")
@@ -63,3 +86,285 @@ def is_account_in_group(gl_account: str, account_group: str, account_groups_path
         if start <= gl_account <= end:
             return True
     return False
+
+
+class AccountGroupIndex:
+    """
+    Load-once index answering "which account group(s) own this GL account".
+
+    All ranges are normalized into a sorted list of boundary points plus the
+    open gaps between them, each annotated with the groups whose ranges cover
+    it. A lookup is then a single binary search, with the same string-based
+    comparison semantics as is_account_in_group().
+    """
+
+    def __init__(self, group_ranges: Dict[str, List[Tuple[str, str]]]):
+        """
+        Build the index from already-loaded ranges.
+
+        Args:
+            group_ranges: Mapping of account group name to a list of
+                (start, end) GL account ranges (inclusive), in file order
+        """
+        self._group_ranges: Dict[str, List[Tuple[str, str]]] = {}
+        for group_name, ranges in group_ranges.items():
+            normalized: List[Tuple[str, str]] = []
+            for start, end in sorted(
+                ((start or '').strip(), (end or '').strip()) for start, end in ranges
+            ):
+                # A range without an end (or with start > end) can never match
+                if not end or start > end:
+                    continue
+                # Merge overlapping ranges so each GL account matches a group at most once
+                if normalized and start <= normalized[-1][1]:
+                    normalized[-1] = (normalized[-1][0], max(normalized[-1][1], end))
+                else:
+                    normalized.append((start, end))
+            self._group_ranges[group_name] = normalized
+
+        intervals = [
+            (start, end, group_name)
+            for group_name, ranges in self._group_ranges.items()
+            for start, end in ranges
+        ]
+        points = sorted({p for start, end, _ in intervals for p in (start, end)})
+
+        # Groups covering exactly each boundary point
+        point_owners = [
+            self._owners(intervals, lambda s, e, p=p: s <= p <= e)
+            for p in points
+        ]
+        # Groups covering the open gap between consecutive boundary points
+        gap_owners = [
+            self._owners(intervals, lambda s, e, lo=lo, hi=hi: s <= lo and hi <= e)
+            for lo, hi in zip(points, points[1:])
+        ]
+
+        self._points = points
+        self._point_owners = point_owners
+        self._gap_owners = gap_owners
+
+    @staticmethod
+    def _owners(intervals: List[Tuple[str, str, str]], covers) -> Tuple[str, ...]:
+        """Return the distinct group names (in first-seen order) whose interval satisfies covers()."""
+        owners: Dict[str, None] = {}
+        for start, end, group_name in intervals:
+            if covers(start, end):
+                owners[group_name] = None
+        return tuple(owners)
+
+    @classmethod
+    def from_file(
+        cls,
+        account_groups_path: Path,
+        group_types: Iterable[str] = ('Departmental',)
+    ) -> 'AccountGroupIndex':
+        """
+        Build an index from AccountGroups.json.
+
+        Args:
+            account_groups_path: Path to AccountGroups.json file
+            group_types: Account group types to include (default: Departmental only)
+
+        Returns:
+            AccountGroupIndex covering every matching account group
+
+        Raises:
+            SystemExit: If file not found or invalid JSON
+        """
+        group_types = set(group_types)
+        group_ranges: Dict[str, List[Tuple[str, str]]] = {}
+        for group in _load_account_groups_data(account_groups_path):
+            group_name = group.get('groupName')
+            if not group_name or group.get('groupType') not in group_types:
+                continue
+            group_ranges.setdefault(group_name, []).extend(
+                (r.get('start', ''), r.get('end', ''))
+                for r in group.get('groupRanges', [])
+            )
+        return cls(group_ranges)
+
+    @property
+    def group_names(self) -> List[str]:
+        """Names of all indexed account groups."""
+        return list(self._group_ranges)
+
+    def ranges_for(self, account_group: str) -> List[Tuple[str, str]]:
+        """Return the normalized, sorted, non-overlapping (start, end) ranges for an account group."""
+        return list(self._group_ranges.get(account_group, []))
+
+    def ranges_cte(
+        self,
+        account_groups: Iterable[str],
+        cte_name: str = 'account_group_ranges'
+    ) -> Tuple[str, List[str]]:
+        """
+        Generate a SQL common table expression listing account group ranges.
+
+        Lets SQLite do the range filtering: join a GL account column against
+        the CTE with BETWEEN range_start AND range_end (text comparison, the
+        same semantics as groups_for()) and select its account_group column
+        to tag each row. Being a CTE, it works on read-only connections.
+
+        Args:
+            account_groups: Names of the account groups to include
+            cte_name: Name of the generated CTE
+
+        Returns:
+            Tuple of (CTE definition for a WITH clause, bound parameters)
+        """
+        values = []
+        params: List[str] = []
+        for account_group in account_groups:
+            for start, end in self.ranges_for(account_group):
+                values.append('(?, ?, ?)')
+                params.extend((account_group, start, end))
+        # VALUES needs at least one row; an empty CTE matches nothing
+        body = f"VALUES {', '.join(values)}" if values else 'SELECT NULL, NULL, NULL WHERE 0'
+        return f"{cte_name}(account_group, range_start, range_end) AS ({body})", params
+
+    def groups_for(self, gl_account: str) -> Tuple[str, ...]:
+        """
+        Find every indexed account group whose ranges contain a GL account.
+
+        Args:
+            gl_account: GL account number as string (e.g., "6450")
+
+        Returns:
+            Tuple of account group names (empty if none)
+        """
+        if not gl_account:
+            return ()
+        points = self._points
+        i = bisect_left(points, gl_account)
+        if i < len(points) and points[i] == gl_account:
+            return self._point_owners[i]
+        if 0 < i < len(points):
+            return self._gap_owners[i - 1]
+        return ()
+
+    def is_account_in_group(self, gl_account: str, account_group: str) -> bool:
+        """
+        Check if GL account code falls within an account group's ranges.
+
+        Args:
+            gl_account: GL account number as string (e.g., "6450")
+            account_group: Name of the account group
+
+        Returns:
+            True if account is in group's ranges, False otherwise
+        """
+        return account_group in self.groups_for(gl_account)
+
+    def partition(
+        self,
+        rows: Iterable,
+        account_groups: Iterable[str],
+        gl_key: str = 'gl_account'
+    ) -> Dict[str, List[Dict]]:
+        """
+        Route rows into per-account-group buckets in a single pass.
+
+        Rows whose GL account falls in several requested groups are added to
+        each of them; rows that match no requested group are dropped.
+
+        Args:
+            rows: Iterable of row mappings (e.g. sqlite3.Row or dict), consumed once
+            account_groups: Names of the account groups to build buckets for
+            gl_key: Key of the GL account number in each row
+
+        Returns:
+            Dictionary mapping every requested account group name to its list
+            of row dictionaries (empty list if no rows matched)
+        """
+        buckets: Dict[str, List[Dict]] = {name: [] for name in account_groups}
+        for row in rows:
+            owners = self.groups_for(row[gl_key] or '')
+            if not owners:
+                continue
+            row_dict = None
+            for group_name in owners:
+                bucket = buckets.get(group_name)
+                if bucket is not None:
+                    if row_dict is None:
+                        row_dict = dict(row)
+                    bucket.append(row_dict)
+        return buckets
+
+
+def partition_tagged_rows(
+    rows: Iterable,
+    account_groups: Iterable[str],
+    group_key: str = 'account_group',
+    buckets: Optional[Dict[str, List[Dict]]] = None
+) -> Dict[str, List[Dict]]:
+    """
+    Route rows already tagged with their account group into per-group buckets.
+
+    Used with queries that join against AccountGroupIndex.ranges_cte(), where
+    SQLite has already filtered and tagged every row.
+
+    Args:
+        rows: Iterable of row mappings (e.g. sqlite3.Row or dict), consumed once
+        account_groups: Names of the account groups to build buckets for
+        group_key: Key of the account group name in each row
+        buckets: Optional buckets from an earlier call to extend, so rows can
+            be partitioned one fetched batch at a time
+
+    Returns:
+        Dictionary mapping every requested account group name to its list
+        of row dictionaries (empty list if no rows matched)
+    """
+    if buckets is None:
+        buckets = {name: [] for name in account_groups}
+    for row in rows:
+        bucket = buckets.get(row[group_key])
+        if bucket is not None:
+            bucket.append(dict(row))
+    return buckets
+
+
+def partition_tagged_rows_by_period(
+    rows: Iterable,
+    account_groups: Iterable[str],
+    periods: Iterable[Tuple[str, str]],
+    find_period: Callable[[Optional[str]], Optional[Tuple[str, str]]],
+    date_key: str,
+    group_key: str = 'account_group',
+    buckets: Optional[Dict[Tuple[str, str], Dict[str, List[Dict]]]] = None
+) -> Dict[Tuple[str, str], Dict[str, List[Dict]]]:
+    """
+    Route tagged rows into per-(period, account group) buckets in one pass.
+
+    Used for multi-period runs, where one query covers every period and each
+    row is routed by its date as well as its account group tag.
+
+    Args:
+        rows: Iterable of row mappings (e.g. sqlite3.Row or dict), consumed once
+        account_groups: Names of the account groups to build buckets for
+        periods: (from_date, to_date) of every period to build buckets for
+        find_period: Callable mapping a row date to its (from_date, to_date), or None
+            if in no period (see date_utils.period_finder)
+        date_key: Key of the date that decides a row's period
+        group_key: Key of the account group name in each row
+        buckets: Optional buckets from an earlier call to extend, so rows can
+            be partitioned one fetched batch at a time
+
+    Returns:
+        Dictionary mapping every (from_date, to_date) to a dictionary of every
+        requested account group name to its list of row dictionaries
+    """
+    if buckets is None:
+        account_groups = list(account_groups)
+        buckets = {
+            (from_date, to_date): {name: [] for name in account_groups}
+            for from_date, to_date in periods
+        }
+    for row in rows:
+        period = find_period(row[date_key])
+        if period is None:
+            continue
+        bucket = buckets[period].get(row[group_key])
+        if bucket is not None:
+            bucket.append(dict(row))
+    return buckets
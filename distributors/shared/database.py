@@ -0,0 +1,236 @@
+"""
+SQLite connection utilities.
+
+Provides tuned read-only connections to the refreshed SQLite databases, one
+per thread, so that account groups can be processed on worker threads without
+sharing a connection, single connections with several databases attached
+for cross-database queries, plus index maintenance and query-plan checks for
+the distributor access paths.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+
+# Pragmas applied to every read-only connection (override per config "sqlite.pragmas")
+READ_ONLY_PRAGMAS: Dict[str, Union[int, str]] = {
+    'query_only': 'ON',            # Never write, even if the file were opened read-write
+    'cache_size': -65536,          # 64 MiB page cache (negative values are KiB)
+    'mmap_size': 268435456,        # Memory-map up to 256 MiB of the database file
+    'temp_store': 'MEMORY',        # Sorts and temporary b-trees stay off disk
+}
+
+
+def connect_read_only(
+    database_path: Path,
+    immutable: bool = False,
+    pragmas: Optional[Dict[str, Union[int, str]]] = None,
+    check_same_thread: bool = True
+) -> sqlite3.Connection:
+    """
+    Open a read-only connection with tuned pragmas.
+
+    The database is opened through a URI with mode=ro, so the connection can
+    never take a write lock on a database a refresh application is updating.
+
+    Args:
+        database_path: Path to the SQLite database file
+        immutable: If True, open with immutable=1 (no locking or change
+            detection at all); only safe for snapshot files nothing writes to
+        pragmas: Pragma overrides, merged over READ_ONLY_PRAGMAS
+        check_same_thread: If False, allow the connection to be used (e.g.,
+            closed) from threads other than the one opening it
+
+    Returns:
+        Connection returning sqlite3.Row rows
+    """
+    conn = sqlite3.connect(_read_only_uri(database_path, immutable), uri=True, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+    _apply_pragmas(conn, pragmas)
+    return conn
+
+
+def connect_attached(
+    databases: Dict[str, Path],
+    immutable: bool = False,
+    pragmas: Optional[Dict[str, Union[int, str]]] = None
+) -> sqlite3.Connection:
+    """
+    Open one read-only connection with several databases attached.
+
+    Each database is attached read-only (mode=ro) under its schema name, so a
+    single query can join or UNION ALL tables of different databases, as
+    "schema.table". The main database is an empty in-memory one.
+
+    Args:
+        databases: Schema name -> path of the SQLite database file to attach
+        immutable: If True, attach with immutable=1 (see connect_read_only)
+        pragmas: Pragma overrides, merged over READ_ONLY_PRAGMAS and applied
+            to every attached database
+
+    Returns:
+        Connection returning sqlite3.Row rows
+
+    Raises:
+        ValueError: If a schema name is not a plain identifier
+    """
+    conn = sqlite3.connect(':memory:', uri=True)
+    conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+    try:
+        for schema, database_path in databases.items():
+            if not re.fullmatch(r'[A-Za-z_]\w*', schema):
+                raise ValueError(f"Invalid schema name for attached database: {schema}")
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (_read_only_uri(database_path, immutable),))
+        _apply_pragmas(conn, pragmas, [None, *databases])
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def _read_only_uri(database_path: Path, immutable: bool = False) -> str:
+    """Get the URI opening a database file read-only."""
+    uri = f"{Path(database_path).resolve().as_uri()}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return uri
+
+
+def _apply_pragmas(
+    conn: sqlite3.Connection,
+    pragmas: Optional[Dict[str, Union[int, str]]] = None,
+    schemas: Sequence[Optional[str]] = (None,)
+) -> None:
+    """Apply READ_ONLY_PRAGMAS and overrides to each schema (None for the main database); closes conn if one is invalid."""
+    for name, value in {**READ_ONLY_PRAGMAS, **(pragmas or {})}.items():
+        if not re.fullmatch(r'\w+', name) or not re.fullmatch(r'-?\w+', str(value)):
+            conn.close()
+            raise ValueError(f"Invalid SQLite pragma: {name} = {value}")
+        for schema in schemas:
+            conn.execute(f"PRAGMA {schema + '.' if schema else ''}{name} = {value}")
+
+
+class ThreadLocalConnections:
+    """Lazily opened, per-thread, read-only connections to one SQLite database."""
+
+    def __init__(
+        self,
+        database_path: Path,
+        immutable: bool = False,
+        pragmas: Optional[Dict[str, Union[int, str]]] = None
+    ):
+        """
+        Initialize without opening any connection.
+
+        Args:
+            database_path: Path to the SQLite database file
+            immutable: Open connections with immutable=1 (see connect_read_only)
+            pragmas: Pragma overrides (see connect_read_only)
+        """
+        self.database_path = Path(database_path)
+        self.immutable = immutable
+        self.pragmas = pragmas
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def get(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Each connection is only ever used by the thread that opened it (and
+            # closed by close_all(), possibly from another thread, once that is done)
+            conn = connect_read_only(self.database_path, self.immutable, self.pragmas, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self) -> None:
+        """Close every connection opened by any thread."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+# (index name, table, columns)
+IndexSpec = Tuple[str, str, Sequence[str]]
+
+
+def ensure_indexes(
+    database_path: Path,
+    index_specs: Sequence[IndexSpec],
+    logger: Optional[logging.Logger] = None
+) -> List[str]:
+    """
+    Create any of the given secondary indexes that do not exist yet.
+
+    This is a maintenance operation: it opens a read-write connection and
+    must not run while a refresh application is writing to the database.
+
+    Args:
+        database_path: Path to the SQLite database file
+        index_specs: (index name, table, columns) for every required index
+        logger: Optional logger instance for logging
+
+    Returns:
+        Names of the indexes that were created
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    created = []
+    conn = sqlite3.connect(database_path)
+    try:
+        existing = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        for index_name, table, columns in index_specs:
+            if index_name in existing:
+                logger.info(f"Index already exists: {index_name}")
+                continue
+            column_list = ', '.join(f'"{column}"' for column in columns)
+            logger.info(f"Creating index {index_name} on {table}({', '.join(columns)})")
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{table}" ({column_list})')
+            created.append(index_name)
+        conn.commit()
+    finally:
+        conn.close()
+    return created
+
+
+def find_full_scans(
+    conn: sqlite3.Connection,
+    query: str,
+    params: Sequence,
+    guarded_tables: Dict[str, str]
+) -> List[str]:
+    """
+    Run EXPLAIN QUERY PLAN and report full scans of guarded tables.
+
+    Both plain table scans ("SCAN b") and full index scans
+    ("SCAN b USING COVERING INDEX ...") are reported; searches are not.
+
+    Args:
+        conn: Connection to run the plan on
+        query: SQL query to explain
+        params: Bound parameters for the query
+        guarded_tables: Mapping of query alias to table name for every table
+            that must be accessed through an index
+
+    Returns:
+        Plan detail lines (prefixed with the table name) of offending scans
+    """
+    scans = []
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params):
+        detail = row[3]
+        match = re.match(r'SCAN (\w+)\b', detail)
+        if match and match.group(1) in guarded_tables:
+            scans.append(f"{guarded_tables[match.group(1)]}: {detail}")
+    return scans
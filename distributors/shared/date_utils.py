@@ -4,9 +4,18 @@ Date parsing and range calculation utilities.
 Provides consistent date handling across all distributors.
 """
 
+import re
 import sys
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+
+class Period(NamedTuple):
+    """A statement period: display label and inclusive YYYY-MM-DD date range."""
+    label: str
+    from_date: str
+    to_date: str
 
 
 def parse_date(date_str: str) -> datetime:
@@ -74,3 +83,116 @@ def get_date_range(
         sys.exit(1)
     
     return (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+
+
+def _last_day_of_month(year: int, month: int) -> datetime:
+    """Get the last day of a calendar month."""
+    next_month = datetime(year, month, 28) + timedelta(days=4)
+    return next_month - timedelta(days=next_month.day)
+
+
+def _parse_period_bounds(spec: str, pattern: str, example: str) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Parse a "FIRST..LAST" period range specification.
+
+    Raises:
+        SystemExit: If the specification does not match the pattern or runs backwards
+    """
+    parts = spec.split('..')
+    if len(parts) == 1:
+        parts = parts * 2
+    matches = [re.fullmatch(pattern, part.strip()) for part in parts]
+    if len(parts) != 2 or not all(matches):
+        print(f"Error: Invalid period range: {spec}. Use {example}", file=sys.stderr)
+        sys.exit(1)
+    first, last = ((int(m.group(1)), int(m.group(2))) for m in matches)
+    if first > last:
+        print(f"Error: Invalid period range: {spec} runs backwards", file=sys.stderr)
+        sys.exit(1)
+    return first, last
+
+
+def get_month_periods(spec: str) -> List[Period]:
+    """
+    Get one period per calendar month for a month range.
+
+    Args:
+        spec: "YYYY-MM..YYYY-MM" (inclusive), or a single "YYYY-MM"
+
+    Returns:
+        Periods in date order, labelled YYYY-MM
+
+    Raises:
+        SystemExit: If the specification is invalid
+    """
+    (year, month), last = _parse_period_bounds(spec, r'(\d{4})-(0[1-9]|1[0-2])', 'YYYY-MM..YYYY-MM')
+    periods = []
+    while (year, month) <= last:
+        periods.append(Period(
+            f"{year:04d}-{month:02d}",
+            f"{year:04d}-{month:02d}-01",
+            _last_day_of_month(year, month).strftime('%Y-%m-%d')
+        ))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return periods
+
+
+def get_quarter_periods(spec: str) -> List[Period]:
+    """
+    Get one period per calendar quarter for a quarter range.
+
+    Args:
+        spec: "YYYYQn..YYYYQn" (inclusive), or a single "YYYYQn"
+
+    Returns:
+        Periods in date order, labelled YYYYQn
+
+    Raises:
+        SystemExit: If the specification is invalid
+    """
+    (year, quarter), last = _parse_period_bounds(spec, r'(\d{4})Q([1-4])', 'YYYYQn..YYYYQn')
+    periods = []
+    while (year, quarter) <= last:
+        first_month = 3 * (quarter - 1) + 1
+        periods.append(Period(
+            f"{year:04d}Q{quarter}",
+            f"{year:04d}-{first_month:02d}-01",
+            _last_day_of_month(year, first_month + 2).strftime('%Y-%m-%d')
+        ))
+        year, quarter = (year + 1, 1) if quarter == 4 else (year, quarter + 1)
+    return periods
+
+
+def period_finder(
+    periods: List[Tuple[str, str]],
+    bounds: Optional[Callable[[str, str], Tuple[str, str]]] = None
+) -> Callable[[Optional[str]], Optional[Tuple[str, str]]]:
+    """
+    Build a lookup from a row date to the period containing it.
+
+    Dates are compared as strings against the same bounds the SQL date-range
+    filter binds, so a row lands in a period if and only if a query for that
+    period alone would have returned it.
+
+    Args:
+        periods: Non-overlapping (from_date, to_date) pairs in date order
+        bounds: Optional callable turning (from_date, to_date) into the bound
+            values the query compares against (e.g., ISO timestamps); the
+            plain dates are used if omitted
+
+    Returns:
+        Callable mapping a date string to its (from_date, to_date) (None if in no period)
+    """
+    periods = list(periods)
+    bound_pairs = [bounds(*period) if bounds else period for period in periods]
+    starts = [start for start, _ in bound_pairs]
+
+    def find(date_str: Optional[str]) -> Optional[Tuple[str, str]]:
+        if date_str is None:
+            return None
+        i = bisect_right(starts, date_str) - 1
+        if i < 0 or date_str > bound_pairs[i][1]:
+            return None
+        return periods[i]
+
+    return find
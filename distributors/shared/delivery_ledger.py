@@ -0,0 +1,206 @@
+"""
+Persistent delivery ledger.
+
+Provides a small local SQLite database recording every statement delivery
+attempt per (source, account group, date range), with a content hash of
+the statement sent, so that reruns can resume only the failed or missing
+account groups and skip re-sending byte-identical statements.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+
+# Statuses meaning the account group received its email for the date range
+DELIVERED_STATUSES = ('sent', 'no_activity')
+
+# Bytes read per step when hashing a statement file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    source TEXT NOT NULL,
+    account_group TEXT NOT NULL,
+    from_date TEXT NOT NULL,
+    to_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    attempted_at TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0,
+    delivered_status TEXT,
+    content_hash TEXT,
+    delivered_at TEXT,
+    PRIMARY KEY (source, account_group, from_date, to_date)
+)
+"""
+
+
+def file_sha256(path: Path) -> str:
+    """Get the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def files_sha256(paths: List[Path]) -> str:
+    """Get one SHA-256 hex digest covering several files' names and contents (e.g., all attachments of an email)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{Path(path).name}\0{file_sha256(path)}\n".encode())
+    return digest.hexdigest()
+
+
+class DeliveryLedger:
+    """
+    Delivery attempts of one distributor source, kept across runs.
+
+    Each (account group, from_date, to_date) has one entry describing the
+    latest attempt (status, reason, attempt count) and, separately, the last
+    successful delivery (its status and statement content hash), so a failed
+    resend never forgets what the account group already received.
+
+    The database is opened on first use, so runs that neither resume nor
+    send emails never create it. All methods are thread-safe.
+    """
+
+    def __init__(self, ledger_path: Path, source: str):
+        """
+        Initialize without opening the database.
+
+        Args:
+            ledger_path: Path to the ledger SQLite file (created if missing)
+            source: Distributor source name (e.g., "bill", "ramp")
+        """
+        self.ledger_path = Path(ledger_path)
+        self.source = source
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the ledger connection, opening (and creating) it on first use; caller holds the lock."""
+        if self._conn is None:
+            self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+            # Shared by worker threads, always under self._lock; waits for another distributor's writes
+            conn = sqlite3.connect(self.ledger_path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def delivered_account_groups(self, from_date: str, to_date: str) -> Set[str]:
+        """Get the account groups whose latest attempt for the date range was delivered."""
+        placeholders = ', '.join('?' for _ in DELIVERED_STATUSES)
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT account_group FROM deliveries "
+                f"WHERE source = ? AND from_date = ? AND to_date = ? AND status IN ({placeholders})",
+                (self.source, from_date, to_date, *DELIVERED_STATUSES)
+            ).fetchall()
+        return {row['account_group'] for row in rows}
+
+    def get(self, account_group: str, from_date: str, to_date: str) -> Optional[Dict]:
+        """Get an account group's ledger entry for the date range, if any."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT * FROM deliveries "
+                "WHERE source = ? AND account_group = ? AND from_date = ? AND to_date = ?",
+                (self.source, account_group, from_date, to_date)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def is_unchanged(
+        self,
+        account_group: str,
+        from_date: str,
+        to_date: str,
+        status: str,
+        content_hash: Optional[str]
+    ) -> bool:
+        """
+        Check whether an identical email was already delivered for the date range.
+
+        Args:
+            account_group: The account group name
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+            status: Delivery about to be made ("sent" or "no_activity")
+            content_hash: SHA-256 of the statement to send (None without attachment)
+
+        Returns:
+            True if the last successful delivery had the same status and content hash
+        """
+        entry = self.get(account_group, from_date, to_date)
+        return (
+            entry is not None
+            and entry['delivered_status'] == status
+            and entry['content_hash'] == content_hash
+        )
+
+    def record(
+        self,
+        account_group: str,
+        from_date: str,
+        to_date: str,
+        status: str,
+        content_hash: Optional[str] = None,
+        reason: Optional[str] = None,
+        rows: int = 0
+    ) -> None:
+        """
+        Record a delivery attempt.
+
+        Args:
+            account_group: The account group name
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+            status: "sent", "no_activity" or "failed"
+            content_hash: SHA-256 of the statement attached (None without attachment)
+            reason: Failure reason, for failed attempts
+            rows: Number of statement rows
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        delivered = status in DELIVERED_STATUSES
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                """
+                INSERT INTO deliveries (
+                    source, account_group, from_date, to_date, status, reason,
+                    attempts, attempted_at, rows, delivered_status, content_hash, delivered_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, account_group, from_date, to_date) DO UPDATE SET
+                    status = excluded.status,
+                    reason = excluded.reason,
+                    attempts = deliveries.attempts + 1,
+                    attempted_at = excluded.attempted_at,
+                    rows = excluded.rows,
+                    delivered_status = CASE WHEN ? THEN excluded.delivered_status ELSE deliveries.delivered_status END,
+                    content_hash = CASE WHEN ? THEN excluded.content_hash ELSE deliveries.content_hash END,
+                    delivered_at = CASE WHEN ? THEN excluded.delivered_at ELSE deliveries.delivered_at END
+                """,
+                (
+                    self.source, account_group, from_date, to_date, status, reason,
+                    now, rows,
+                    status if delivered else None,
+                    content_hash if delivered else None,
+                    now if delivered else None,
+                    delivered, delivered, delivered
+                )
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the database, if it was opened."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
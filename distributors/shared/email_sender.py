@@ -2,18 +2,591 @@
 Email sending utilities with SMTP support.
 
 Provides SMTP email functionality with attachment support for sending
-statement CSVs to account group contacts.
+statement CSVs to account group contacts, plus a reusable session pool
+that keeps authenticated connections open for a whole run, can pace sends
+to what the relay accepts and retries transient failures. Attachments are
+encoded in chunks and, if configured, large ones are compressed first.
 """
 
+import base64
+import gzip
 import logging
 import os
+import queue
+import random
+import shutil
 import smtplib
-from email import encoders
+import tempfile
+import threading
+import time
+import zipfile
+from contextlib import contextmanager, nullcontext
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import BinaryIO, Callable, ContextManager, Dict, Iterator, List, Optional, Union
+
+
+# Default send rate ceiling (messages per second, across all sessions; 0 sends
+# without pacing unless messages_per_second is configured)
+DEFAULT_MESSAGES_PER_SECOND = 0
+
+# Default number of retries of a transiently failed message
+DEFAULT_MAX_RETRIES = 3
+
+# Default first retry delay and maximum retry delay (seconds)
+DEFAULT_RETRY_BACKOFF_SECONDS = 1.0
+DEFAULT_RETRY_BACKOFF_MAX_SECONDS = 60.0
+
+# Reply codes a relay uses to throttle senders (service unavailable, local error)
+THROTTLE_CODES = (421, 451)
+
+# Lowest send rate adaptive throttling slows down to (messages per second)
+MIN_MESSAGES_PER_SECOND = 0.2
+
+# Share of the configured rate regained per successful send after throttling
+RATE_RECOVERY_STEP = 0.05
+
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+
+# Attachments larger than this are compressed before sending (bytes; 0 disables,
+# so statements are attached as CSV files unless compression is configured)
+DEFAULT_COMPRESS_ATTACHMENTS_ABOVE = 0
+
+# Attachment compression formats: name -> (file suffix, MIME subtype)
+ATTACHMENT_COMPRESSION = {
+    'zip': ('.zip', 'zip'),
+    'gzip': ('.gz', 'gzip'),
+}
+
+# Attachment bytes base64-encoded per step (a multiple of 57, one 76-character line)
+ATTACHMENT_CHUNK_SIZE = 57 * 16384
+
+
+def _reply_codes(error: Exception) -> List[int]:
+    """Get the SMTP reply codes carried by an error (none for socket-level errors)."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return [code for code, _ in error.recipients.values()]
+    if isinstance(error, smtplib.SMTPResponseException):
+        return [error.smtp_code]
+    return []
+
+
+def classify_smtp_error(error: Exception) -> str:
+    """
+    Classify a sending error as transient (worth retrying) or permanent.
+
+    4xx replies and lost connections are transient; 5xx replies and any
+    other SMTP error (e.g., unsupported command) are permanent.
+
+    Args:
+        error: Exception raised while sending
+
+    Returns:
+        TRANSIENT or PERMANENT
+    """
+    codes = _reply_codes(error)
+    if codes:
+        return TRANSIENT if all(400 <= code < 500 for code in codes) else PERMANENT
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return TRANSIENT
+    if isinstance(error, smtplib.SMTPException):
+        return PERMANENT
+    # Socket-level failure (timeout, connection refused or reset, ...)
+    return TRANSIENT if isinstance(error, OSError) else PERMANENT
+
+
+def is_throttled(error: Exception) -> bool:
+    """Check whether an error is the relay asking us to slow down."""
+    return any(code in THROTTLE_CODES for code in _reply_codes(error))
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """
+    Get a jittered exponential backoff delay.
+
+    The delay doubles with each attempt up to maximum, and a random half of
+    it is dropped so concurrent senders do not retry in lockstep.
+
+    Args:
+        attempt: Retry number, starting at 0
+        base: Delay of the first retry (seconds)
+        maximum: Largest delay (seconds)
+
+    Returns:
+        Delay in seconds
+    """
+    delay = min(maximum, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class SmtpRateLimiter:
+    """
+    Thread-safe token bucket pacing messages, adapting to relay throttling.
+
+    Tokens refill at the current rate up to burst; every message takes one.
+    Each throttling reply halves the rate (at most once per token interval,
+    so a burst of rejections counts once), and every successful send after
+    that wins back a step of the configured rate until it is reached again.
+    """
+
+    def __init__(self, messages_per_second: float, burst: int = 1):
+        """
+        Initialize a full bucket.
+
+        Args:
+            messages_per_second: Configured (maximum) send rate
+            burst: Messages that may be sent back to back before pacing applies
+        """
+        self.max_rate = max(MIN_MESSAGES_PER_SECOND, float(messages_per_second))
+        self.rate = self.max_rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._last_slowdown: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update; caller holds the lock."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Block until a message may be sent, then take its token."""
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def slow_down(self) -> bool:
+        """
+        Halve the send rate after a throttling reply.
+
+        Returns:
+            True if the rate was lowered, False if it was lowered very recently
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._last_slowdown is not None and now - self._last_slowdown < 1 / self.rate:
+                return False
+            self._refill(now)
+            self.rate = max(MIN_MESSAGES_PER_SECOND, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_slowdown = now
+            return True
+
+    def speed_up(self) -> None:
+        """Regain a step of the configured rate after a successful send."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_STEP)
+
+
+class SmtpSession:
+    """
+    A single reusable SMTP connection.
+
+    Connects (STARTTLS + login) lazily on first use and keeps the connection
+    open across sends, starting a fresh one after messages_per_connection
+    messages if configured. If the server dropped the connection, the session
+    reconnects and retries the message once; a 421 (service closing) reply
+    drops the connection and is left to the caller to back off and retry.
+    """
+
+    def __init__(self, smtp_config: Dict, logger: Optional[logging.Logger] = None, pool: Optional['SmtpSessionPool'] = None):
+        """
+        Initialize an unconnected session.
+
+        Args:
+            smtp_config: SMTP configuration dictionary (see send_email)
+            logger: Optional logger instance for logging
+            pool: Owning pool whose counters should be updated (optional)
+        """
+        self.smtp_config = smtp_config
+        self.logger = logger or logging.getLogger(__name__)
+        self.pool = pool
+        self.server: Optional[smtplib.SMTP] = None
+        self.messages_per_connection = smtp_config.get('messages_per_connection')
+        self.messages_on_connection = 0
+
+    def _count(self, counter: str) -> None:
+        """Increment a pool counter, if this session belongs to a pool."""
+        if self.pool is not None:
+            self.pool._increment(counter)
+
+    def connect(self) -> None:
+        """Open the connection, run STARTTLS and log in as configured."""
+        smtp_host = self.smtp_config.get('host', 'localhost')
+        smtp_port = self.smtp_config.get('port', 587)
+        use_tls = self.smtp_config.get('use_tls', True)
+        username = self.smtp_config.get('username')
+        # Support SMTP_PASSWORD environment variable as fallback
+        password = self.smtp_config.get('password') or os.environ.get('SMTP_PASSWORD')
+
+        server = smtplib.SMTP(smtp_host, smtp_port)
+        try:
+            self._count('connections')
+            if use_tls:
+                server.starttls()
+                self._count('tls_handshakes')
+            if username and password:
+                server.login(username, password)
+                self._count('logins')
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.messages_on_connection = 0
+        self.logger.debug(f"Opened SMTP connection to {smtp_host}:{smtp_port}")
+
+    def close(self) -> None:
+        """Close the connection (politely if possible)."""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except smtplib.SMTPException:
+            self.server.close()
+        finally:
+            self.server = None
+
+    @staticmethod
+    def _is_connection_lost(error: Exception) -> bool:
+        """Check whether an error means the connection is gone and a reconnect may succeed."""
+        if not isinstance(error, smtplib.SMTPException):
+            # Socket-level failure (broken pipe, connection reset, ...)
+            return isinstance(error, OSError)
+        if isinstance(error, smtplib.SMTPServerDisconnected):
+            return True
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return any(code == 421 for code, _ in error.recipients.values())
+        if isinstance(error, smtplib.SMTPResponseException):
+            return error.smtp_code == 421
+        return False
+
+    def _send_on_connection(self, msg: MIMEMultipart) -> None:
+        """Send a message on the open connection, dropping the connection if it was lost."""
+        try:
+            self.server.send_message(msg)
+        except OSError as e:  # smtplib.SMTPException is an OSError subclass
+            if self._is_connection_lost(e):
+                self.server.close()
+                self.server = None
+            raise
+        self.messages_on_connection += 1
+
+    def send_message(self, msg: MIMEMultipart) -> None:
+        """
+        Send a message, reconnecting once if the connection was lost.
+
+        Raises:
+            smtplib.SMTPException: If sending fails (after one reconnect attempt,
+                or at once if the server throttled us)
+        """
+        if self.server is not None and self.messages_per_connection \
+                and self.messages_on_connection >= self.messages_per_connection:
+            self.close()
+        if self.server is None:
+            self.connect()
+        try:
+            self._send_on_connection(msg)
+        except OSError as e:
+            if self.server is not None or is_throttled(e):
+                raise
+            self.logger.warning(f"SMTP connection lost ({e}); reconnecting")
+            self._count('reconnects')
+            self.connect()
+            self._send_on_connection(msg)
+        self._count('messages')
+
+    def __enter__(self) -> 'SmtpSession':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class SmtpSessionPool:
+    """
+    Thread-safe pool of reusable SMTP sessions for a whole distributor run.
+
+    Sessions are created on demand up to max_sessions and only connect when
+    they first send, so a dry run opens no connections at all. With
+    messages_per_second configured, messages are paced by an adaptive
+    SmtpRateLimiter shared by all sessions. Messages failing transiently
+    are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, smtp_config: Dict, max_sessions: int = 1, logger: Optional[logging.Logger] = None):
+        """
+        Initialize an empty pool.
+
+        Args:
+            smtp_config: SMTP configuration dictionary (see send_email)
+            max_sessions: Maximum number of concurrently open connections
+            logger: Optional logger instance for logging
+        """
+        self.smtp_config = smtp_config
+        self.max_sessions = max(1, max_sessions)
+        self.logger = logger or logging.getLogger(__name__)
+        messages_per_second = smtp_config.get('messages_per_second', DEFAULT_MESSAGES_PER_SECOND)
+        self.rate_limiter = SmtpRateLimiter(
+            messages_per_second, smtp_config.get('burst', 1)
+        ) if messages_per_second else None
+        self.max_retries = smtp_config.get('max_retries', DEFAULT_MAX_RETRIES)
+        self.retry_backoff = smtp_config.get('retry_backoff_seconds', DEFAULT_RETRY_BACKOFF_SECONDS)
+        self.retry_backoff_max = smtp_config.get('retry_backoff_max_seconds', DEFAULT_RETRY_BACKOFF_MAX_SECONDS)
+        self._idle: 'queue.LifoQueue[SmtpSession]' = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'connections': 0,
+            'tls_handshakes': 0,
+            'logins': 0,
+            'reconnects': 0,
+            'messages': 0,
+            'retries': 0,
+            'throttled': 0
+        }
+
+    def _increment(self, counter: str) -> None:
+        """Increment a usage counter."""
+        with self._lock:
+            self._stats[counter] += 1
+
+    @contextmanager
+    def session(self) -> Iterator[SmtpSession]:
+        """Check out a session for the duration of a with-block."""
+        try:
+            smtp_session = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.max_sessions
+                if can_create:
+                    self._created += 1
+            smtp_session = SmtpSession(self.smtp_config, self.logger, pool=self) if can_create else self._idle.get()
+        try:
+            yield smtp_session
+        finally:
+            self._idle.put(smtp_session)
+
+    def send_message(self, msg: MIMEMultipart) -> None:
+        """
+        Send a message on any available session, retrying transient failures.
+
+        Raises:
+            smtplib.SMTPException: If sending fails permanently, or still fails
+                after max_retries retries
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                with self.session() as smtp_session:
+                    smtp_session.send_message(msg)
+            except OSError as e:
+                if classify_smtp_error(e) == PERMANENT or attempt >= self.max_retries:
+                    raise
+                if is_throttled(e):
+                    self._increment('throttled')
+                    if self.rate_limiter is not None and self.rate_limiter.slow_down():
+                        self.logger.warning(
+                            f"SMTP server is throttling; slowing to {self.rate_limiter.rate:.2f} messages/second"
+                        )
+                delay = backoff_delay(attempt, self.retry_backoff, self.retry_backoff_max)
+                self.logger.warning(
+                    f"Transient SMTP failure ({e}); retry {attempt + 1} of {self.max_retries} in {delay:.1f}s"
+                )
+                self._increment('retries')
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if self.rate_limiter is not None:
+                self.rate_limiter.speed_up()
+            return
+
+    def close(self) -> None:
+        """Close every idle session."""
+        while True:
+            try:
+                smtp_session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            smtp_session.close()
+        with self._lock:
+            self._created = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get connection, handshake, login, reconnect, message, retry and throttling counts."""
+        with self._lock:
+            return dict(self._stats)
+
+    def __enter__(self) -> 'SmtpSessionPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def _compress_attachment(attachment_path: Path, compression: str) -> BinaryIO:
+    """
+    Compress a file into an anonymous temporary file, streaming in chunks.
+
+    Args:
+        attachment_path: File to compress
+        compression: "zip" or "gzip"
+
+    Returns:
+        Temporary file holding the compressed data, positioned at its start
+    """
+    compressed = tempfile.TemporaryFile()
+    try:
+        with open(attachment_path, 'rb') as source:
+            if compression == 'gzip':
+                with gzip.GzipFile(filename=attachment_path.name, mode='wb', fileobj=compressed, mtime=0) as target:
+                    shutil.copyfileobj(source, target, ATTACHMENT_CHUNK_SIZE)
+            else:
+                with zipfile.ZipFile(compressed, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    with archive.open(attachment_path.name, 'w') as target:
+                        shutil.copyfileobj(source, target, ATTACHMENT_CHUNK_SIZE)
+    except BaseException:
+        compressed.close()
+        raise
+    compressed.seek(0)
+    return compressed
+
+
+def _encode_base64(f: BinaryIO) -> str:
+    """
+    Base64-encode a file in 76-character lines, one chunk at a time.
+
+    Only one raw chunk is read at a time, but the encoded text is returned
+    whole: smtplib sends a message flattened into memory, so the payload
+    cannot be streamed to the server.
+    """
+    return ''.join(
+        base64.encodebytes(chunk).decode('ascii')
+        for chunk in iter(lambda: f.read(ATTACHMENT_CHUNK_SIZE), b'')
+    )
+
+
+def attachment_part(smtp_config: Dict, attachment_path: Path, logger: Optional[logging.Logger] = None) -> MIMEBase:
+    """
+    Build a base64-encoded attachment part, compressing large files if configured.
+
+    The file is read and encoded in chunks, so the raw file is never held in
+    memory next to its encoded copy; the encoded payload itself is held in
+    full (see _encode_base64). With compress_attachments_above set, larger
+    files are compressed to a temporary file first and attached with a
+    .zip or .gz suffix.
+
+    Args:
+        smtp_config: SMTP configuration dictionary (uses compress_attachments_above
+            and attachment_compression, see send_email)
+        attachment_path: File to attach
+        logger: Optional logger instance for logging
+
+    Returns:
+        The attachment part
+
+    Raises:
+        ValueError: If attachment_compression is not a supported format
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    compress_above = smtp_config.get('compress_attachments_above', DEFAULT_COMPRESS_ATTACHMENTS_ABOVE)
+    compression = smtp_config.get('attachment_compression', 'zip')
+    if compression not in ATTACHMENT_COMPRESSION:
+        raise ValueError(f"Unsupported attachment_compression: {compression}")
+
+    size = attachment_path.stat().st_size
+    if compress_above and size > compress_above:
+        suffix, subtype = ATTACHMENT_COMPRESSION[compression]
+        filename = attachment_path.name + suffix
+        with _compress_attachment(attachment_path, compression) as f:
+            payload = _encode_base64(f)
+            compressed_size = f.tell()
+        logger.info(f"Compressed attachment {attachment_path.name} from {size:,} to {compressed_size:,} bytes")
+        part = MIMEBase('application', subtype)
+    else:
+        filename = attachment_path.name
+        with open(attachment_path, 'rb') as f:
+            payload = _encode_base64(f)
+        part = MIMEBase('application', 'octet-stream')
+
+    part.set_payload(payload)
+    part['Content-Transfer-Encoding'] = 'base64'
+    part.add_header(
+        'Content-Disposition',
+        f'attachment; filename={filename}'
+    )
+    return part
+
+
+def build_message(
+    smtp_config: Dict,
+    recipient: str,
+    subject: str,
+    body: str,
+    attachment_path: Optional[Union[Path, List[Path]]] = None,
+    bcc: Optional[Union[str, List[str]]] = None,
+    logger: Optional[logging.Logger] = None
+) -> MIMEMultipart:
+    """
+    Build a MIME message with optional attachments.
+
+    Args:
+        smtp_config: SMTP configuration dictionary (uses from_address and the
+            attachment settings, see attachment_part)
+        recipient: Email address of the recipient
+        subject: Email subject
+        body: Email body text (plain text)
+        attachment_path: Optional path, or list of paths, of files to attach
+        bcc: Optional email address or list of addresses to BCC
+        logger: Optional logger instance for logging
+
+    Returns:
+        The assembled message
+    """
+    msg = MIMEMultipart()
+    msg['From'] = smtp_config.get('from_address')
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    if bcc:
+        bcc_list = [bcc] if isinstance(bcc, str) else bcc
+        msg['Bcc'] = ', '.join(bcc_list)
+    
+    # Add body
+    msg.attach(MIMEText(body, 'plain'))
+    
+    # Add attachments if provided
+    for path in _attachment_paths(attachment_path):
+        msg.attach(attachment_part(smtp_config, path, logger))
+
+    return msg
+
+
+def _attachment_paths(attachment_path: Optional[Union[Path, List[Path]]]) -> List[Path]:
+    """Get the files to attach from a single path, a list of paths or None."""
+    if not attachment_path:
+        return []
+    if isinstance(attachment_path, (list, tuple)):
+        return list(attachment_path)
+    return [attachment_path]
+
+
+def _untimed(stage: str) -> ContextManager:
+    """Stage timer that records nothing."""
+    return nullcontext()
 
 
 def send_email(
@@ -21,10 +594,13 @@ def send_email(
     recipient: str,
     subject: str,
     body: str,
-    attachment_path: Optional[Path] = None,
+    attachment_path: Optional[Union[Path, List[Path]]] = None,
     dry_run: bool = False,
     logger: Optional[logging.Logger] = None,
-    bcc: Optional[Union[str, List[str]]] = None
+    bcc: Optional[Union[str, List[str]]] = None,
+    smtp_pool: Optional[SmtpSessionPool] = None,
+    stage_timer: Optional[Callable[[str], ContextManager]] = None,
+    record_bytes_sent: Optional[Callable[[int], None]] = None
 ) -> bool:
     """
     Send an email with optional attachment via SMTP.
@@ -37,13 +613,31 @@ def send_email(
             - from_address: Sender email address
             - username: SMTP username (optional)
             - password: SMTP password (optional, can use SMTP_PASSWORD env var)
+            - messages_per_second: Send rate ceiling (optional, default 0;
+              0 or null disables pacing)
+            - burst: Messages sent back to back before pacing (optional, default 1)
+            - messages_per_connection: Messages per connection before
+              reconnecting (optional, default unlimited)
+            - max_retries: Retries of a transiently failed message (optional, default 3)
+            - retry_backoff_seconds: First retry delay (optional, default 1)
+            - retry_backoff_max_seconds: Largest retry delay (optional, default 60)
+            - compress_attachments_above: Compress larger attachments (bytes,
+              optional, default 0; 0 or null disables compression)
+            - attachment_compression: "zip" (default) or "gzip"
         recipient: Email address of the recipient
         subject: Email subject
         body: Email body text (plain text)
-        attachment_path: Optional path to file to attach
+        attachment_path: Optional path, or list of paths, of files to attach
         dry_run: If True, don't actually send the email (default: False)
         logger: Optional logger instance for logging
         bcc: Optional email address or list of addresses to BCC
+        smtp_pool: Optional session pool to send through; if omitted, a new
+            connection is opened (and closed) for this message only
+        stage_timer: Optional callable (e.g., StatisticsTracker.stage_timer())
+            returning a context manager per stage; message building is timed
+            as "mime" and sending as "smtp"
+        record_bytes_sent: Optional callable given the encoded (and possibly
+            compressed) attachment size once the email has been sent
         
     Returns:
         True if email was sent successfully (or dry run), False otherwise
@@ -52,55 +646,32 @@ def send_email(
         logger = logging.getLogger(__name__)
     
     if dry_run:
-        attachment_msg = f"with attachment {attachment_path.name}" if attachment_path else "without attachment"
+        attachment_names = ', '.join(path.name for path in _attachment_paths(attachment_path))
+        attachment_msg = f"with attachment {attachment_names}" if attachment_names else "without attachment"
         bcc_msg = f" and BCC {', '.join(bcc if isinstance(bcc, list) else [bcc])}" if bcc else ""
         logger.info(
             f"[DRY RUN] Would send email to {recipient} {attachment_msg}{bcc_msg}"
         )
         return True
     
+    if stage_timer is None:
+        stage_timer = _untimed
+
     try:
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = smtp_config.get('from_address')
-        msg['To'] = recipient
-        msg['Subject'] = subject
-        if bcc:
-            bcc_list = [bcc] if isinstance(bcc, str) else bcc
-            msg['Bcc'] = ', '.join(bcc_list)
-        
-        # Add body
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Add attachment if provided
-        if attachment_path:
-            with open(attachment_path, 'rb') as f:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(f.read())
-            
-            encoders.encode_base64(part)
-            part.add_header(
-                'Content-Disposition',
-                f'attachment; filename={attachment_path.name}'
-            )
-            msg.attach(part)
-        
-        # Send email
-        smtp_host = smtp_config.get('host', 'localhost')
-        smtp_port = smtp_config.get('port', 587)
-        use_tls = smtp_config.get('use_tls', True)
-        username = smtp_config.get('username')
-        # Support SMTP_PASSWORD environment variable as fallback
-        password = smtp_config.get('password') or os.environ.get('SMTP_PASSWORD')
+        with stage_timer('mime'):
+            msg = build_message(smtp_config, recipient, subject, body, attachment_path, bcc, logger)
         
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            if use_tls:
-                server.starttls()
-            if username and password:
-                server.login(username, password)
-            server.send_message(msg)
+        # Send email over a pooled connection, or a one-off connection
+        with stage_timer('smtp'):
+            if smtp_pool is not None:
+                smtp_pool.send_message(msg)
+            else:
+                with SmtpSessionPool(smtp_config, logger=logger) as one_off_pool:
+                    one_off_pool.send_message(msg)
         
         logger.info(f"Email sent successfully to {recipient}")
+        if record_bytes_sent is not None:
+            record_bytes_sent(sum(len(part.get_payload()) for part in msg.get_payload() if part.get_filename()))
         return True
     
     except Exception as e:
@@ -1,47 +1,143 @@
 """
 Formatting utilities for statement data.
 
-Provides consistent formatting for amounts and dates across all distributors.
+Provides consistent formatting for amounts and dates across all distributors,
+and builds a source's CSV row formatter from its column spec.
 """
 
 from datetime import datetime
-from typing import Optional
+from operator import itemgetter
+from typing import Any, Callable, List, NamedTuple, Optional
 
 
 def format_accounting_date(date_str: Optional[str]) -> str:
     """
     Format accounting date for display.
-    
+
     Converts ISO format timestamps to readable YYYY-MM-DD HH:MM:SS format.
-    
+
     Args:
         date_str: Date string in ISO format (e.g., "2024-11-01T00:00:00.000Z")
-        
+
     Returns:
         Formatted date string in YYYY-MM-DD HH:MM:SS format, or empty string if None
     """
     if not date_str:
         return ''
-    # Convert ISO format to readable format
+    # Full ISO timestamps (the stored format) are reformatted by slicing
+    if len(date_str) >= 19 and date_str[10] == 'T' and date_str[13] == ':' and date_str[16] == ':':
+        return f"{date_str[:10]} {date_str[11:19]}"
+    # Convert other ISO formats to readable format
     try:
         dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
         return dt.strftime('%Y-%m-%d %H:%M:%S')
-    except:
+    except ValueError:
         return date_str
 
 
 def format_amount(amount_cents: Optional[int], currency: Optional[str] = None) -> str:
     """
     Format amount in cents to dollar string with thousand separators.
-    
+
     Args:
         amount_cents: Amount in cents (e.g., 12345 for $123.45)
         currency: Optional currency code (currently unused, for future extension)
-        
+
     Returns:
         Formatted amount string like "$1,234.56"
     """
     if amount_cents is None:
         return '$0.00'
+    # Integer cents are split into dollars and cents exactly, without float rounding
+    if isinstance(amount_cents, int) and not isinstance(amount_cents, bool):
+        if amount_cents < 0:
+            dollars, cents = divmod(-amount_cents, 100)
+            return f"$-{dollars:,}.{cents:02d}"
+        dollars, cents = divmod(amount_cents, 100)
+        return f"${dollars:,}.{cents:02d}"
     dollars = amount_cents / 100.0
     return f"${dollars:,.2f}"
+
+
+def format_dollars(amount: Optional[float]) -> str:
+    """
+    Format a dollar amount to dollar string with thousand separators.
+
+    Args:
+        amount: Amount in dollars (e.g., 123.45 for $123.45)
+
+    Returns:
+        Formatted amount string like "$1,234.56"
+    """
+    if amount is None:
+        return '$0.00'
+    return f"${amount:,.2f}"
+
+
+def format_text(value: Any) -> Any:
+    """Format a text cell: the value itself, or an empty string if missing."""
+    return value or ''
+
+
+# Cell formatters by CsvColumn.format
+CELL_FORMATTERS = {
+    'text': format_text,
+    'timestamp': format_accounting_date,
+    'cents': format_amount,
+    'dollars': format_dollars,
+}
+
+
+class CsvColumn(NamedTuple):
+    """A CSV statement column."""
+    header: str
+    key: str                      # Row key holding the cell value
+    format: str = 'text'          # One of CELL_FORMATTERS
+
+
+def build_row_formatter(columns: List[CsvColumn]) -> Callable[[Any], List]:
+    """
+    Build a row formatter from a CSV column spec.
+
+    Every cell value is fetched with one itemgetter call. Text cells are
+    filled in by a single list comprehension, and only the other cells call
+    their column's cell formatter.
+
+    Args:
+        columns: CSV columns, in file order
+
+    Returns:
+        Callable turning a row (dictionary or sqlite3.Row) into its CSV cell values
+
+    Raises:
+        ValueError: If a column has an unsupported format
+    """
+    for column in columns:
+        if column.format not in CELL_FORMATTERS:
+            raise ValueError(
+                f"Unsupported CSV column format for {column.header}: {column.format} "
+                f"(expected one of {', '.join(CELL_FORMATTERS)})"
+            )
+    # (cell index, cell formatter) of every column that is not plain text
+    formatted = tuple(
+        (index, CELL_FORMATTERS[column.format])
+        for index, column in enumerate(columns)
+        if column.format != 'text'
+    )
+    fetch = itemgetter(*[column.key for column in columns])
+    if len(columns) == 1:
+        # itemgetter returns the bare value, not a tuple, for a single key
+        def values(row: Any) -> tuple:
+            return (fetch(row),)
+    else:
+        values = fetch
+
+    def format_row(row: Any) -> List:
+        row_values = values(row)
+        # Every cell as text (format_text(), inlined), then the other cells formatted
+        cells = [value or '' for value in row_values]
+        for index, format_cell in formatted:
+            cells[index] = format_cell(row_values[index])
+        return cells
+
+    return format_row
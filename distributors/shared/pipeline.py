@@ -0,0 +1,114 @@
+"""
+Render/send pipeline.
+
+Provides a two-stage producer/consumer pipeline connecting statement
+rendering (query results to CSV) and email delivery through a bounded
+queue, so rendering the next account group's statement overlaps with
+sending the previous one while memory stays bounded.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Union
+
+
+# Default number of rendered statements waiting to be sent
+DEFAULT_PIPELINE_DEPTH = 4
+
+# Hand-off queue marker telling a sender thread to stop
+_DONE = object()
+
+
+class StatementDelivery(NamedTuple):
+    """A rendered email waiting to be sent, with what is needed to record its outcome."""
+    name: str                      # Account group display name
+    account_group: str             # Account group key (delivery ledger)
+    recipient: str
+    subject: str
+    body: str
+    attachment_path: Union[Path, List[Path], None]  # None for no-activity emails
+    from_date: str
+    to_date: str
+    status: str                    # Ledger status on success: "sent" or "no_activity"
+    content_hash: Optional[str]
+    row_count: int
+    stats_tracker: Any             # StatisticsTracker recording the outcome
+
+
+def run_pipeline(
+    items: Iterable,
+    render: Callable[[Any], Optional[Any]],
+    send: Callable[[Any], Any],
+    renderers: int = 1,
+    senders: int = 1,
+    depth: int = DEFAULT_PIPELINE_DEPTH
+) -> None:
+    """
+    Render items and send the results concurrently through a bounded queue.
+
+    Renderer threads call render() for every item, in order, and hand each
+    non-None result to the sender threads. When depth results are waiting,
+    renderers block (backpressure), so at most depth + renderers + senders
+    results exist at once however many items there are.
+
+    Both callables are expected to record their own outcomes. An exception
+    from either is kept and the pipeline carries on with the other items;
+    the first exception is re-raised once every item has been handled.
+
+    Args:
+        items: Work items, rendered in order
+        render: Callable turning an item into a result to send, or None if
+            there is nothing to send (outcome already recorded)
+        send: Callable delivering a rendered result
+        renderers: Number of rendering threads
+        senders: Number of sending threads
+        depth: Maximum number of rendered results waiting to be sent
+    """
+    handoff: 'queue.Queue' = queue.Queue(maxsize=max(1, depth))
+    errors: List[BaseException] = []
+    errors_lock = threading.Lock()
+
+    def keep(error: BaseException) -> None:
+        with errors_lock:
+            errors.append(error)
+
+    def send_loop() -> None:
+        while True:
+            result = handoff.get()
+            if result is _DONE:
+                return
+            try:
+                send(result)
+            except BaseException as e:
+                keep(e)
+
+    def render_and_hand_off(item: Any) -> None:
+        result = render(item)
+        if result is not None:
+            handoff.put(result)  # Blocks while senders are behind
+
+    sender_threads = [
+        threading.Thread(target=send_loop, name=f'pipeline-send-{i}', daemon=True)
+        for i in range(max(1, senders))
+    ]
+    for thread in sender_threads:
+        thread.start()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, renderers), thread_name_prefix='pipeline-render') as executor:
+            futures = [executor.submit(render_and_hand_off, item) for item in items]
+            for future in futures:
+                try:
+                    future.result()
+                except BaseException as e:
+                    keep(e)
+    finally:
+        for _ in sender_threads:
+            handoff.put(_DONE)
+        for thread in sender_threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
@@ -0,0 +1,282 @@
+"""
+Run manifest and Prometheus metrics export.
+
+Provides utilities to write a machine-readable JSON manifest of each
+distributor run next to its statements, and the same numbers in the
+Prometheus textfile-collector format for node_exporter to scrape.
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# Version of the manifest layout, bumped on incompatible changes
+MANIFEST_VERSION = 1
+
+# Prefix of every exported Prometheus metric
+METRIC_PREFIX = 'apache_treasury_statement'
+
+# Account group outcomes, keyed by the statistics list that records them
+OUTCOMES = {
+    'account_groups_processed': 'sent',
+    'account_groups_no_activity': 'no_activity',
+    'account_groups_skipped': 'skipped',
+    'account_groups_unchanged': 'unchanged',
+    'account_groups_failed': 'failed',
+}
+
+
+def manifest_path(output_dir: Path, prefix: str, from_date: str, to_date: str) -> Path:
+    """Get the run manifest path, next to the statements of the same date range."""
+    return Path(output_dir) / f"{prefix}-run-{from_date}-{to_date}.json"
+
+
+def metrics_path(textfile_dir: Path, source: str) -> Path:
+    """Get the Prometheus textfile path for a source (one file, replaced by every run)."""
+    return Path(textfile_dir) / f"{source}_statement_distributor.prom"
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Get this process's peak resident set size in bytes (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _account_group_outcomes(stats: Dict) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Map each account group name to its (outcome, failure reason)."""
+    outcomes: Dict[str, Tuple[str, Optional[str]]] = {}
+    for key, outcome in OUTCOMES.items():
+        for entry in stats.get(key, []):
+            if outcome == 'failed':
+                name, reason = entry
+                outcomes[name] = (outcome, reason)
+            else:
+                outcomes[entry] = (outcome, None)
+    return outcomes
+
+
+def build_run_manifest(
+    source: str,
+    stats: Dict,
+    smtp_stats: Dict[str, int],
+    dry_run: bool,
+    error: Optional[str] = None
+) -> Dict:
+    """
+    Build the run manifest from the run's statistics.
+
+    Args:
+        source: Distributor source name (e.g., "bill", "ramp")
+        stats: StatisticsTracker.get_stats() snapshot taken after finish_run()
+        smtp_stats: SmtpSessionPool.get_stats() counts
+        dry_run: True if emails were not actually sent
+        error: Reason the run was aborted before processing account groups, if it was
+
+    Returns:
+        Manifest dictionary (JSON serializable)
+    """
+    performance = stats.get('performance', {})
+    group_performance = performance.get('account_groups', {})
+    totals = stats.get('account_group_totals', {})
+
+    account_groups: List[Dict] = []
+    for name, (outcome, reason) in _account_group_outcomes(stats).items():
+        entry = group_performance.get(name, {})
+        account_groups.append({
+            'name': name,
+            'outcome': outcome,
+            'reason': reason,
+            'rows': entry.get('rows', 0),
+            'total': totals.get(name, {}).get('total'),
+            'duration_seconds': round(sum(entry.get('stages', {}).values()), 6),
+            'stages': {stage: round(seconds, 6) for stage, seconds in entry.get('stages', {}).items()},
+            'attachment_bytes': entry.get('attachment_bytes', 0),
+            'bytes_sent': entry.get('bytes_sent', 0)
+        })
+
+    if error is not None:
+        status = 'aborted'
+    elif stats.get('failed', 0) > 0:
+        status = 'completed_with_errors'
+    else:
+        status = 'completed'
+
+    elapsed = performance.get('elapsed_seconds')
+    return {
+        'manifest_version': MANIFEST_VERSION,
+        'source': source,
+        'status': status,
+        'error': error,
+        'dry_run': dry_run,
+        'from_date': stats.get('from_date'),
+        'to_date': stats.get('to_date'),
+        'started_at': stats.get('started_at'),
+        'finished_at': stats.get('finished_at'),
+        'duration_seconds': round(elapsed, 6) if elapsed is not None else None,
+        'counts': {
+            'total_account_groups': stats.get('total_account_groups', 0),
+            'successful': stats.get('successful', 0),
+            'no_activity': stats.get('no_activity', 0),
+            'skipped': stats.get('skipped', 0),
+            'unchanged': stats.get('unchanged', 0),
+            'failed': stats.get('failed', 0)
+        },
+        'rows': performance.get('rows', 0),
+        'attachment_bytes': performance.get('attachment_bytes', 0),
+        'bytes_sent': sum(entry['bytes_sent'] for entry in account_groups),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'stages': {stage: round(seconds, 6) for stage, seconds in performance.get('stages', {}).items()},
+        'smtp': dict(smtp_stats),
+        'account_groups': sorted(account_groups, key=lambda entry: entry['name'])
+    }
+
+
+def _escape_label_value(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample(name: str, labels: Dict[str, str], value: float) -> str:
+    """Format a single metric sample line."""
+    label_text = ','.join(f'{key}="{_escape_label_value(str(label))}"' for key, label in labels.items())
+    return f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}"
+
+
+def format_prometheus_metrics(manifest: Dict, timestamp: Optional[float] = None) -> str:
+    """
+    Format a run manifest as Prometheus textfile-collector metrics.
+
+    Every metric is a gauge describing the most recent run, labelled with
+    the source so both distributors can share a textfile directory.
+
+    Args:
+        manifest: Manifest from build_run_manifest()
+        timestamp: Unix time the run finished (default: now)
+
+    Returns:
+        Metrics text in the Prometheus exposition format
+    """
+    source = {'source': manifest['source']}
+    metrics: List[Tuple[str, str, List[Tuple[Dict[str, str], float]]]] = [
+        ('last_run_timestamp_seconds', 'Unix time the last run finished',
+         [(source, timestamp if timestamp is not None else time.time())]),
+        ('last_run_duration_seconds', 'Elapsed time of the last run',
+         [(source, manifest['duration_seconds'] or 0)]),
+        ('last_run_success', 'Whether the last run completed without failures (1) or not (0)',
+         [(source, 1 if manifest['status'] == 'completed' else 0)]),
+        ('last_run_dry_run', 'Whether the last run was a dry run (1) or sent emails (0)',
+         [(source, 1 if manifest['dry_run'] else 0)]),
+        ('last_run_account_groups', 'Account groups in the last run by outcome',
+         [({**source, 'outcome': outcome}, sum(1 for entry in manifest['account_groups'] if entry['outcome'] == outcome))
+          for outcome in OUTCOMES.values()]),
+        ('last_run_rows', 'Statement rows in the last run',
+         [(source, manifest['rows'])]),
+        ('last_run_attachment_bytes', 'Statement attachment bytes generated in the last run',
+         [(source, manifest['attachment_bytes'])]),
+        ('last_run_bytes_sent', 'Encoded statement attachment bytes emailed in the last run',
+         [(source, manifest['bytes_sent'])]),
+        ('last_run_peak_rss_bytes', 'Peak resident memory of the last run',
+         [(source, manifest['peak_rss_bytes'])] if manifest.get('peak_rss_bytes') is not None else []),
+        ('last_run_stage_seconds', 'Time spent in each processing stage in the last run',
+         [({**source, 'stage': stage}, seconds) for stage, seconds in manifest['stages'].items()]),
+        ('last_run_smtp', 'SMTP connection counts in the last run',
+         [({**source, 'counter': counter}, count) for counter, count in manifest['smtp'].items()]),
+        ('last_run_account_group_rows', 'Statement rows per account group in the last run',
+         [({**source, 'account_group': entry['name']}, entry['rows']) for entry in manifest['account_groups']]),
+        ('last_run_account_group_duration_seconds', 'Processing time per account group in the last run',
+         [({**source, 'account_group': entry['name']}, entry['duration_seconds']) for entry in manifest['account_groups']]),
+        ('last_run_account_group_bytes_sent', 'Encoded statement attachment bytes emailed per account group in the last run',
+         [({**source, 'account_group': entry['name']}, entry['bytes_sent']) for entry in manifest['account_groups']]),
+        ('last_run_account_group_success', 'Whether each account group succeeded (1) or failed (0) in the last run',
+         [({**source, 'account_group': entry['name']}, 0 if entry['outcome'] == 'failed' else 1)
+          for entry in manifest['account_groups']]),
+    ]
+
+    lines = []
+    for name, help_text, samples in metrics:
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+        for labels, value in samples:
+            lines.append(_sample(name, labels, value))
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomically(path: Path, text: str) -> None:
+    """Write a file via a temporary file and rename, so readers never see it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_run_outputs(
+    source: str,
+    prefix: str,
+    output_dir: Path,
+    stats: Dict,
+    smtp_stats: Dict[str, int],
+    dry_run: bool,
+    textfile_dir: Optional[Path] = None,
+    error: Optional[str] = None,
+    logger: Optional[logging.Logger] = None
+) -> Optional[Path]:
+    """
+    Write the run manifest to output_dir and the Prometheus metrics textfile.
+
+    Failures are logged rather than raised, so a full disk or a missing
+    metrics directory never changes the outcome of the run itself.
+
+    Args:
+        source: Distributor source name used as the metrics label (e.g., "bill")
+        prefix: Statement file prefix (e.g., "Bill", "Ramp")
+        output_dir: Directory holding the run's CSV statements
+        stats: StatisticsTracker.get_stats() snapshot taken after finish_run()
+        smtp_stats: SmtpSessionPool.get_stats() counts
+        dry_run: True if emails were not actually sent
+        textfile_dir: node_exporter textfile-collector directory (default: output_dir)
+        error: Reason the run was aborted, if it was
+        logger: Optional logger instance for logging
+
+    Returns:
+        Path of the manifest written, or None if it could not be written
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    manifest = build_run_manifest(source, stats, smtp_stats, dry_run, error)
+    path = manifest_path(output_dir, prefix, manifest['from_date'], manifest['to_date'])
+    try:
+        _write_atomically(path, json.dumps(manifest, indent=2) + "\n")
+        logger.info(f"Run manifest written to {path}")
+    except OSError as e:
+        logger.error(f"Failed to write run manifest to {path}: {e}")
+        path = None
+
+    prom_path = metrics_path(textfile_dir if textfile_dir is not None else output_dir, source)
+    try:
+        _write_atomically(prom_path, format_prometheus_metrics(manifest))
+        logger.info(f"Prometheus metrics written to {prom_path}")
+    except OSError as e:
+        logger.error(f"Failed to write Prometheus metrics to {prom_path}: {e}")
+
+    return path
@@ -0,0 +1,331 @@
+"""
+Per-run statement dataset.
+
+Materializes the statement rows for every account group once per run and
+shares them between the no-activity check, CSV generation, logging and the
+summary report, so that no account group is queried more than once.
+
+In streaming mode the rows are instead written straight from the database
+cursor into one CSV file per account group (and any additional writers, such
+as columnar archives); only row counts, totals and the statement paths are
+kept, so memory use does not grow with the date range.
+
+Multi-period runs key every period's rows by its own date range, so a single
+query covering all periods fills the dataset exactly as one query per period
+would have.
+"""
+
+import csv
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Loader signature: (account_groups, from_date, to_date) -> {account_group: rows}
+DatasetLoader = Callable[[List[str], str, str], Dict[str, List[Dict]]]
+
+# Multi-period loader signature: (account_groups, [(from_date, to_date)]) -> {(from_date, to_date): {account_group: rows}}
+PeriodDatasetLoader = Callable[[List[str], List[Tuple[str, str]]], Dict[Tuple[str, str], Dict[str, List[Dict]]]]
+
+# Row formatter signature: (row) -> list of CSV cell values
+RowFormatter = Callable[[Any], List]
+
+# Additional writers signature: (account_group, from_date, to_date) -> writers
+# with write_row(row), close() and abort() (e.g., statement_writers.StatementWriter)
+ExtraWriters = Callable[[str, str, str], List[Any]]
+
+
+class StatementDataset:
+    """
+    Statement rows keyed by (source, from_date, to_date, account_group).
+
+    Safe to share between worker threads: materialization is serialized and
+    each account group's rows are only read and released by its own worker.
+    """
+
+    def __init__(self, source: str, amount_key: str):
+        """
+        Initialize an empty dataset.
+
+        Args:
+            source: Statement source name (e.g., "Ramp", "Bill")
+            amount_key: Row key whose values are summed into per-group totals
+        """
+        self.source = source
+        self.amount_key = amount_key
+        self._rows: Dict[Tuple[str, str, str, str], Optional[List[Dict]]] = {}
+        self._row_counts: Dict[Tuple[str, str, str, str], int] = {}
+        self._totals: Dict[Tuple[str, str, str, str], float] = {}
+        self._paths: Dict[Tuple[str, str, str, str], Path] = {}
+        self._lock = threading.Lock()
+
+    def key(self, account_group: str, from_date: str, to_date: str) -> Tuple[str, str, str, str]:
+        """Return the dataset key for an account group and date range."""
+        return (self.source, from_date, to_date, account_group)
+
+    def materialize(
+        self,
+        account_groups: Iterable[str],
+        from_date: str,
+        to_date: str,
+        loader: DatasetLoader
+    ) -> None:
+        """
+        Load rows for any account groups not yet materialized for this date range.
+
+        The loader is called at most once, for all missing account groups together.
+
+        Args:
+            account_groups: Names of the account groups needed
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+            loader: Callable returning a mapping of account group name to rows
+        """
+        with self._lock:
+            missing = [
+                account_group for account_group in account_groups
+                if self.key(account_group, from_date, to_date) not in self._row_counts
+            ]
+            if not missing:
+                return
+
+            rows_by_account_group = loader(missing, from_date, to_date)
+            for account_group in missing:
+                rows = rows_by_account_group.get(account_group, [])
+                key = self.key(account_group, from_date, to_date)
+                self._rows[key] = rows
+                self._row_counts[key] = len(rows)
+                self._totals[key] = sum(row.get(self.amount_key) or 0 for row in rows)
+
+    def materialize_periods(
+        self,
+        account_groups: Iterable[str],
+        periods: Iterable[Tuple[str, str]],
+        loader: PeriodDatasetLoader
+    ) -> None:
+        """
+        Load rows for any account groups not yet materialized for several periods.
+
+        The loader is called at most once, for all missing account groups and
+        periods together, so one query can cover every period.
+
+        Args:
+            account_groups: Names of the account groups needed
+            periods: (from_date, to_date) of every period needed
+            loader: Callable returning a mapping of (from_date, to_date) to a
+                mapping of account group name to rows
+        """
+        account_groups = list(account_groups)
+        periods = [(from_date, to_date) for from_date, to_date in periods]
+        with self._lock:
+            missing = [
+                (from_date, to_date, account_group)
+                for from_date, to_date in periods
+                for account_group in account_groups
+                if self.key(account_group, from_date, to_date) not in self._row_counts
+            ]
+            if not missing:
+                return
+
+            missing_groups = list(dict.fromkeys(account_group for _, _, account_group in missing))
+            missing_periods = list(dict.fromkeys((from_date, to_date) for from_date, to_date, _ in missing))
+            rows_by_period = loader(missing_groups, missing_periods)
+            for from_date, to_date, account_group in missing:
+                rows = rows_by_period.get((from_date, to_date), {}).get(account_group, [])
+                key = self.key(account_group, from_date, to_date)
+                self._rows[key] = rows
+                self._row_counts[key] = len(rows)
+                self._totals[key] = sum(row.get(self.amount_key) or 0 for row in rows)
+
+    def stream_to_csv(
+        self,
+        account_groups: Iterable[str],
+        from_date: str,
+        to_date: str,
+        rows: Iterable,
+        path_for: Callable[[str], Path],
+        header: List[str],
+        format_row: RowFormatter,
+        group_key: str = 'account_group',
+        extra_writers: Optional[ExtraWriters] = None
+    ) -> None:
+        """
+        Write tagged rows straight into one CSV file per account group.
+
+        Rows are consumed one at a time (e.g., directly from a sqlite3 cursor)
+        and never held in memory. A CSV file is only created once its account
+        group receives a row, so groups without activity leave no file behind.
+        When the stream ends, the per-group row counts and totals are recorded
+        exactly as materialize() would, with the rows already released.
+
+        Args:
+            account_groups: Names of the account groups to stream
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+            rows: Iterable of rows supporting row[key] access, tagged with group_key
+            path_for: Callable returning the CSV path for an account group name
+            header: CSV header row
+            format_row: Callable turning a row into its CSV cell values
+            group_key: Row key holding the account group name
+            extra_writers: Optional callable returning more writers for an
+                account group, each also given every raw row
+
+        Raises:
+            Exception: Any error from the row source or file system; partially
+                written files are removed before it is re-raised
+        """
+        self.stream_periods_to_csv(
+            account_groups,
+            [(from_date, to_date)],
+            rows,
+            lambda account_group, _from_date, _to_date: path_for(account_group),
+            header,
+            format_row,
+            group_key=group_key,
+            extra_writers=extra_writers
+        )
+
+    def stream_periods_to_csv(
+        self,
+        account_groups: Iterable[str],
+        periods: Iterable[Tuple[str, str]],
+        rows: Iterable,
+        path_for: Callable[[str, str, str], Path],
+        header: List[str],
+        format_row: RowFormatter,
+        find_period: Optional[Callable[[Any], Optional[Tuple[str, str]]]] = None,
+        date_key: Optional[str] = None,
+        group_key: str = 'account_group',
+        extra_writers: Optional[ExtraWriters] = None
+    ) -> None:
+        """
+        Write tagged rows straight into one CSV file per period and account group.
+
+        Works like stream_to_csv(), with each row also routed by its date, so a
+        single cursor covering several periods fills every period's statements.
+
+        Args:
+            account_groups: Names of the account groups to stream
+            periods: (from_date, to_date) of every period to stream
+            rows: Iterable of rows supporting row[key] access, tagged with group_key
+            path_for: Callable returning the CSV path for (account group, from_date, to_date)
+            header: CSV header row
+            format_row: Callable turning a row into its CSV cell values
+            find_period: Callable mapping a row's date to its (from_date, to_date),
+                or None if in no period; not needed for a single period
+            date_key: Row key holding the date passed to find_period
+            group_key: Row key holding the account group name
+            extra_writers: Optional callable returning more writers for
+                (account group, from_date, to_date), each also given every raw row
+
+        Raises:
+            Exception: Any error from the row source or file system; partially
+                written files are removed before it is re-raised
+        """
+        account_groups = list(account_groups)
+        periods = [(from_date, to_date) for from_date, to_date in periods]
+        single_period = periods[0] if len(periods) == 1 else None
+        if single_period is None and (find_period is None or date_key is None):
+            raise ValueError("find_period and date_key are required to stream several periods")
+
+        row_counts = {(*period, account_group): 0 for period in periods for account_group in account_groups}
+        totals = dict.fromkeys(row_counts, 0)
+        paths: Dict[Tuple[str, str, str], Path] = {}
+        files = {}
+        writers = {}
+        additional: Dict[Tuple[str, str, str], List[Any]] = {}
+
+        with self._lock:
+            try:
+                for row in rows:
+                    if single_period is not None:
+                        from_date, to_date = single_period
+                    else:
+                        period = find_period(row[date_key])
+                        if period is None:
+                            continue
+                        from_date, to_date = period
+                    target = (from_date, to_date, row[group_key])
+                    if target not in row_counts:
+                        continue
+                    writer = writers.get(target)
+                    if writer is None:
+                        paths[target] = Path(path_for(target[2], from_date, to_date))
+                        files[target] = open(paths[target], 'w', newline='')
+                        writer = writers[target] = csv.writer(files[target])
+                        writer.writerow(header)
+                        if extra_writers is not None:
+                            additional[target] = extra_writers(target[2], from_date, to_date)
+                    writer.writerow(format_row(row))
+                    for extra in additional.get(target, ()):
+                        extra.write_row(row)
+                    row_counts[target] += 1
+                    totals[target] += row[self.amount_key] or 0
+                for f in files.values():
+                    f.close()
+                for extras in additional.values():
+                    for extra in extras:
+                        extra.close()
+            except BaseException:
+                for f in files.values():
+                    f.close()
+                for path in paths.values():
+                    path.unlink(missing_ok=True)
+                for extras in additional.values():
+                    for extra in extras:
+                        extra.abort()
+                raise
+
+            for target in row_counts:
+                from_date, to_date, account_group = target
+                key = self.key(account_group, from_date, to_date)
+                self._rows[key] = None
+                self._row_counts[key] = row_counts[target]
+                self._totals[key] = totals[target]
+                if target in paths:
+                    self._paths[key] = paths[target]
+
+    def is_materialized(self, account_group: str, from_date: str, to_date: str) -> bool:
+        """Check whether rows have been loaded for an account group and date range."""
+        return self.key(account_group, from_date, to_date) in self._row_counts
+
+    def rows(self, account_group: str, from_date: str, to_date: str) -> List[Dict]:
+        """
+        Get the materialized rows for an account group.
+
+        Raises:
+            KeyError: If the account group was never materialized or has been released
+        """
+        rows = self._rows.get(self.key(account_group, from_date, to_date))
+        if rows is None:
+            raise KeyError(
+                f"{self.source} rows for {account_group} ({from_date} to {to_date}) "
+                f"are not materialized or have been released"
+            )
+        return rows
+
+    def row_count(self, account_group: str, from_date: str, to_date: str) -> int:
+        """Get the number of rows for an account group (still available after release)."""
+        return self._row_counts.get(self.key(account_group, from_date, to_date), 0)
+
+    def total(self, account_group: str, from_date: str, to_date: str) -> float:
+        """Get the sum of amount_key over an account group's rows (still available after release)."""
+        return self._totals.get(self.key(account_group, from_date, to_date), 0)
+
+    def has_activity(self, account_group: str, from_date: str, to_date: str) -> bool:
+        """Check whether an account group has any rows in the date range."""
+        return self.row_count(account_group, from_date, to_date) > 0
+
+    def statement_path(self, account_group: str, from_date: str, to_date: str) -> Optional[Path]:
+        """Get the CSV file written by stream_to_csv() for an account group, if any."""
+        return self._paths.get(self.key(account_group, from_date, to_date))
+
+    def total_row_count(self) -> int:
+        """Get the number of rows across all materialized account groups."""
+        return sum(self._row_counts.values())
+
+    def release(self, account_group: str, from_date: str, to_date: str) -> None:
+        """Free an account group's rows once its statement has been delivered; counts and totals are kept."""
+        key = self.key(account_group, from_date, to_date)
+        if key in self._rows:
+            self._rows[key] = None
@@ -0,0 +1,1319 @@
+"""
+Statement engine shared by every statement distributor.
+
+Owns everything a distributor run does apart from reading its source:
+configuration, account group selection, single-query partitioning (or
+streaming) of the rows, rendering and emailing statements through the
+pipeline, the delivery ledger, statistics, the run manifest and the
+command line. Each source (Bill.com, Ramp, ...) is a thin adapter
+subclass declaring its SQL, row keys, CSV columns and typed columns.
+
+StatementRunner holds the run itself and StatementEngine adds the
+single-source machinery; a distributor combining several sources
+subclasses StatementRunner directly. Both are abstract: a subclass
+missing a required hook fails when it is instantiated, not mid-run.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from shared.account_group_manager import load_account_groups, filter_account_groups, list_account_groups
+from shared.account_groups import AccountGroupIndex, partition_tagged_rows, partition_tagged_rows_by_period
+from shared.database import ThreadLocalConnections, ensure_indexes, find_full_scans
+from shared.date_utils import Period, get_date_range, get_month_periods, get_quarter_periods, period_finder
+from shared.delivery_ledger import DeliveryLedger, file_sha256
+from shared.email_sender import SmtpSessionPool, send_email
+from shared.formatters import CsvColumn, build_row_formatter
+from shared.logging_config import setup_logging
+from shared.pipeline import DEFAULT_PIPELINE_DEPTH, StatementDelivery, run_pipeline
+from shared.run_manifest import write_run_outputs
+from shared.statement_dataset import StatementDataset
+from shared.statement_writers import DEFAULT_BATCH_SIZE, check_columnar_formats, columnar_writers, write_statement
+from shared.statistics import StatisticsTracker, generate_summary_report
+
+
+# Repository root, against which DEFAULT_DATABASE_PATH and the account groups file are resolved
+REPO_ROOT = Path(__file__).parent / '../..'
+
+# Account groups shared with the TypeScript packages
+ACCOUNT_GROUPS_PATH = REPO_ROOT / 'packages/shared-utils/src/AccountGroups.json'
+
+
+class StatementRunner(ABC):
+    """
+    Run statement distribution for every account group.
+
+    Owns configuration, account group selection, the render/send pipeline,
+    SMTP pooling, the delivery ledger, statistics, the run manifest and
+    metrics. Subclasses load the run's statements and render each account
+    group's email: StatementEngine for a single source, or a distributor
+    combining several sources.
+    """
+
+    # Source name used by the delivery ledger and metrics (e.g., "bill")
+    SOURCE = ''
+
+    # Statement file and dataset prefix (e.g., "Bill")
+    PREFIX = ''
+
+    # Source name in emails and reports (e.g., "Bill.com")
+    TITLE = ''
+
+    # What a row is, for log messages (e.g., "bills")
+    ROW_NOUN = 'rows'
+
+    # Statement directory used when config.json has no output_dir
+    DEFAULT_OUTPUT_DIR = './statements'
+
+    # No-activity email body used when email_template has no no_activity_body
+    NO_ACTIVITY_BODY = ''
+
+    def __init__(
+        self,
+        config_path: Optional[str],
+        logger: Optional[logging.Logger] = None,
+        config: Optional[Dict] = None,
+        account_groups: Optional[List[Dict]] = None,
+        account_group_index: Optional[AccountGroupIndex] = None
+    ):
+        """
+        Initialize the distributor with configuration.
+
+        Args:
+            config_path: Path to the JSON configuration file
+            logger: Logger to use (default: the logger named after the adapter's module)
+            config: Configuration already loaded (e.g., by a combined run);
+                config_path is not read if given
+            account_groups: Account groups already loaded, to share with another engine
+            account_group_index: GL range index already built, to share with another engine
+        """
+        self.logger = logger or logging.getLogger(type(self).__module__)
+        self.config = config if config is not None else self._load_config(config_path)
+        self.smtp_config = self.config.get('smtp', {})
+        self.email_template = self.config.get('email_template', {})
+        self.output_dir = Path(self.config.get('output_dir', self.DEFAULT_OUTPUT_DIR))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Load account groups from AccountGroups.json using shared utility
+        self.account_groups_path = ACCOUNT_GROUPS_PATH
+        if account_groups is None:
+            account_groups = load_account_groups(self.account_groups_path)
+            self.logger.info(f"Loaded {len(account_groups)} account groups from AccountGroups.json")
+        self.account_groups = account_groups
+
+        # Build the GL range index once per run; rows are classified against it
+        self.account_group_index = account_group_index or AccountGroupIndex.from_file(self.account_groups_path)
+
+        # Summary report configuration
+        self.summary_config = self.config.get('summary_report', {
+            'enabled': True,
+            'recipient': 'treasurer@apache.org'
+        })
+
+        # Initialize statistics tracking using shared utility
+        self.stats_tracker = StatisticsTracker()
+
+        # Run manifest and Prometheus metrics (textfile directory defaults to output_dir)
+        self.metrics_config = self.config.get('metrics', {})
+
+        # Delivery ledger for --resume and --skip-unchanged (opened on first use)
+        ledger_path = self.config.get('delivery_ledger_path')
+        self.delivery_ledger = DeliveryLedger(
+            Path(ledger_path) if ledger_path else self.output_dir.parent / 'delivery_ledger.db',
+            self.SOURCE
+        )
+
+        # SMTP session pool, built by run() with one session per worker
+        self.smtp_pool: Optional[SmtpSessionPool] = None
+
+        self._init_source()
+
+    @abstractmethod
+    def _init_source(self) -> None:
+        """Set up what the run reads its statements from (called at the end of __init__())."""
+
+    def _load_config(self, config_path: str) -> Dict:
+        """Load configuration from JSON file."""
+        try:
+            with open(config_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            self.logger.error(f"Configuration file not found: {config_path}")
+            sys.exit(1)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Invalid JSON in configuration file: {e}")
+            sys.exit(1)
+
+    @abstractmethod
+    def load_statements(
+        self,
+        account_groups: List[str],
+        periods: List[Tuple[str, str]],
+        stream: bool = False
+    ) -> None:
+        """
+        Read the rows of every statement of the run, before any is rendered.
+
+        Args:
+            account_groups: Names of the account groups to query
+            periods: (from_date, to_date) of every period, in date order
+            stream: If True, stream rows into CSV files instead of holding them
+        """
+
+    @abstractmethod
+    def loaded_row_count(self) -> int:
+        """Get the number of rows load_statements() read."""
+
+    @abstractmethod
+    def close_connections(self) -> None:
+        """Close every database connection opened during the run."""
+
+    @abstractmethod
+    def ensure_indexes(self) -> int:
+        """
+        Create missing secondary indexes and verify the query plans use them.
+
+        Returns:
+            Exit code (0 for success, 1 if a full scan remains)
+        """
+
+    @abstractmethod
+    def render_account_group(
+        self,
+        ag: Dict,
+        from_date: str,
+        to_date: str,
+        send_emails: bool = False,
+        skip_unchanged: bool = False,
+        stats_tracker: Optional[StatisticsTracker] = None
+    ) -> Optional[StatementDelivery]:
+        """
+        Render stage for a single account group: generate its statements and prepare its email.
+
+        Returns:
+            The email to send, or None if there is nothing to send (the outcome
+            has already been recorded on stats_tracker)
+        """
+
+    def send_summary_report(self) -> bool:
+        """
+        Send summary report email to configured recipient.
+
+        Returns:
+            bool: True if email sent successfully, False otherwise
+        """
+        if not self.summary_config.get('enabled', True):
+            self.logger.info("Summary report is disabled in configuration")
+            return True
+
+        recipient = self.summary_config.get('recipient', 'treasurer@apache.org')
+
+        if not recipient:
+            self.logger.warning("No recipient configured for summary report")
+            return False
+
+        stats = self.stats_tracker.get_stats()
+        subject = f"{self.TITLE} Statement Distribution Summary - {stats['from_date']} to {stats['to_date']}"
+        body = generate_summary_report(stats, f"{self.TITLE} Statement Distributor")
+
+        self.logger.info(f"Sending summary report to {recipient}")
+
+        try:
+            success = send_email(
+                self.smtp_config,
+                recipient,
+                subject,
+                body,
+                logger=self.logger,
+                smtp_pool=self.smtp_pool
+            )
+            if success:
+                self.logger.info(f"Summary report sent successfully to {recipient}")
+            else:
+                self.logger.error(f"Failed to send summary report to {recipient}")
+            return success
+        except Exception as e:
+            self.logger.error(f"Error sending summary report: {e}")
+            return False
+
+    def deliver_statement(self, delivery: StatementDelivery, send_emails: bool = False) -> bool:
+        """
+        Send stage for a single account group: send its email and record the outcome.
+
+        Args:
+            delivery: Email prepared by render_account_group()
+            send_emails: If True, actually send emails; if False (default), dry-run mode
+
+        Returns:
+            True if the email was sent (or dry run), False otherwise
+        """
+        stats_tracker = delivery.stats_tracker
+        no_activity = delivery.status == 'no_activity'
+
+        # Send email using shared utility (dry_run is inverse of send_emails)
+        success = send_email(
+            self.smtp_config,
+            delivery.recipient,
+            delivery.subject,
+            delivery.body,
+            delivery.attachment_path,
+            dry_run=not send_emails,
+            logger=self.logger,
+            bcc=self.summary_config.get('recipient', 'treasurer@apache.org'),
+            smtp_pool=self.smtp_pool,
+            stage_timer=stats_tracker.stage_timer(delivery.name),
+            record_bytes_sent=lambda bytes_sent: stats_tracker.record_bytes_sent(delivery.name, bytes_sent)
+        )
+
+        # Record the outcome in the ledger first, so a ledger error is tracked as a failure
+        if send_emails:
+            self.delivery_ledger.record(
+                delivery.account_group,
+                delivery.from_date,
+                delivery.to_date,
+                delivery.status if success else 'failed',
+                content_hash=delivery.content_hash,
+                reason=None if success else f"Failed to send {'no-activity ' if no_activity else ''}email",
+                rows=delivery.row_count
+            )
+
+        # Track results
+        if success and no_activity:
+            stats_tracker.record_sent_no_activity(delivery.name)
+        elif success:
+            stats_tracker.record_success(delivery.name)
+        else:
+            stats_tracker.record_failure(
+                delivery.name,
+                f"Failed to send {'no-activity ' if no_activity else ''}email (see logs for details)"
+            )
+
+        return success
+
+    def _render_item(
+        self,
+        item: Tuple[Dict, Period, StatisticsTracker],
+        send_emails: bool,
+        skip_unchanged: bool
+    ) -> Optional[StatementDelivery]:
+        """Render one (account group, period, tracker) work item, recording any error as a failure of the account group."""
+        ag, period, stats_tracker = item
+        try:
+            return self.render_account_group(
+                ag, period.from_date, period.to_date, send_emails, skip_unchanged, stats_tracker
+            )
+        except Exception as e:
+            name = ag.get('name', ag.get('account_group') or 'Unknown')
+            self.logger.error(f"Failed to render statement for {name}: {e}")
+            stats_tracker.record_failure(name, f"Failed to render statement: {e}")
+            return None
+
+    def _deliver_item(self, delivery: StatementDelivery, send_emails: bool) -> None:
+        """Deliver one rendered email, recording any error as a failure of the account group."""
+        try:
+            self.deliver_statement(delivery, send_emails)
+        except Exception as e:
+            self.logger.error(f"Failed to deliver statement to {delivery.name}: {e}")
+            delivery.stats_tracker.record_failure(delivery.name, f"Failed to deliver statement: {e}")
+
+    def _write_run_outputs(self, send_emails: bool, error: Optional[str] = None) -> None:
+        """
+        Write the run manifest and Prometheus metrics for a finished run.
+
+        Args:
+            send_emails: If True, emails were actually sent
+            error: Reason the run was aborted, if it was
+        """
+        textfile_dir = self.metrics_config.get('textfile_dir')
+        write_run_outputs(
+            self.SOURCE,
+            self.PREFIX,
+            self.output_dir,
+            self.stats_tracker.get_stats(),
+            self.smtp_pool.get_stats(),
+            dry_run=not send_emails,
+            textfile_dir=Path(textfile_dir) if textfile_dir else None,
+            error=error,
+            logger=self.logger
+        )
+
+    def run(
+        self,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        send_emails: bool = False,
+        account_group_filter: Optional[str] = None,
+        workers: int = 1,
+        stream: bool = False,
+        stats_json: Optional[str] = None,
+        resume: bool = False,
+        skip_unchanged: bool = False,
+        periods: Optional[List[Period]] = None,
+        pipeline_depth: int = DEFAULT_PIPELINE_DEPTH
+    ) -> int:
+        """
+        Run the statement generation and distribution process.
+
+        Args:
+            from_date: Optional start date in YYYY-MM-DD format
+            to_date: Optional end date in YYYY-MM-DD format
+            send_emails: If True, actually send emails; if False (default), dry-run mode
+            account_group_filter: Optional comma-separated list of account groups to process
+            workers: Number of account groups to process concurrently (default: 1)
+            stream: If True, stream rows from the database straight into the CSV files
+                instead of holding them in memory (default: False)
+            stats_json: Optional path to write the run statistics, including
+                per-stage and per-account-group timings, as JSON
+            resume: If True, process only the account groups the delivery ledger
+                does not record as delivered for this date range (default: False)
+            skip_unchanged: If True, do not re-send statements identical to ones
+                already delivered (default: False)
+            periods: Optional periods (e.g., from get_month_periods()) for a batch run
+                sending one statement per period per account group; replaces
+                from_date and to_date
+            pipeline_depth: Maximum number of rendered statements waiting to be
+                sent; rendering pauses while the queue is full
+
+        Returns:
+            Exit code (0 for success, 1 for failure)
+        """
+        self.logger.info(f"Starting {self.TITLE} statement distribution process")
+        self.stats_tracker.start_run()
+
+        if not send_emails:
+            self.logger.info("Running in DRY RUN mode - emails will not be sent (use --send-emails to send)")
+
+        # Filter account groups if specified using shared utility
+        account_groups_to_process = filter_account_groups(self.account_groups, account_group_filter)
+        if account_group_filter:
+            self.logger.info(
+                f"Filtering to {len(account_groups_to_process)} account group(s) out of {len(self.account_groups)} total"
+            )
+
+        # Get the date range: one period, or the range covering every period of a batch run
+        if periods:
+            from_date_str, to_date_str = periods[0].from_date, periods[-1].to_date
+            self.logger.info(
+                f"Processing {len(periods)} period(s) from {periods[0].label} to {periods[-1].label} "
+                f"({from_date_str} to {to_date_str})"
+            )
+        else:
+            from_date_str, to_date_str = get_date_range(from_date, to_date)
+            self.logger.info(f"Processing statements for {from_date_str} to {to_date_str}")
+            periods = [Period(f"{from_date_str} to {to_date_str}", from_date_str, to_date_str)]
+        batch = len(periods) > 1
+
+        # Account groups to process per period; resuming an earlier run keeps
+        # only the failed or missing account groups
+        account_groups_by_period: Dict[Period, List[Dict]] = {}
+        for period in periods:
+            pending = account_groups_to_process
+            if resume:
+                delivered = self.delivery_ledger.delivered_account_groups(period.from_date, period.to_date)
+                pending = [ag for ag in pending if ag.get('account_group') not in delivered]
+                self.logger.info(
+                    f"Resuming {period.label}: {len(delivered)} account group(s) already delivered, "
+                    f"{len(pending)} to process"
+                )
+            account_groups_by_period[period] = pending
+
+        # Initialize statistics (with one period tracker per period in batch runs)
+        self.stats_tracker.set_total_account_groups(sum(len(ags) for ags in account_groups_by_period.values()))
+        self.stats_tracker.set_date_range(from_date_str, to_date_str)
+        period_trackers: Dict[Period, StatisticsTracker] = {}
+        for period, ags in account_groups_by_period.items():
+            tracker = self.stats_tracker.period_tracker(period.label) if batch else self.stats_tracker
+            if batch:
+                tracker.set_total_account_groups(len(ags))
+                tracker.set_date_range(period.from_date, period.to_date)
+            tracker.set_account_group_order(
+                [ag.get('name', ag.get('account_group') or 'Unknown') for ag in ags]
+            )
+            period_trackers[period] = tracker
+
+        # One SMTP connection per worker at most, opened lazily and reused for the whole run
+        self.smtp_pool = SmtpSessionPool(self.smtp_config, max_sessions=workers, logger=self.logger)
+
+        # Query the covering date range once and partition rows by (period and)
+        # account group in a single pass
+        account_group_names = list(dict.fromkeys(
+            ag['account_group'] for ags in account_groups_by_period.values() for ag in ags if ag.get('account_group')
+        ))
+        date_ranges = [(period.from_date, period.to_date) for period in periods]
+        # A failed query (or stream) fails the whole run, before any email is sent
+        try:
+            if stream and account_group_names:
+                self.load_statements(account_group_names, date_ranges, stream=True)
+            else:
+                self.load_statements(account_group_names, date_ranges)
+        except Exception as e:
+            error = f"Failed to {'stream' if stream else 'query'} statements: {e}"
+            self.logger.error(error)
+            self.close_connections()
+            self.delivery_ledger.close()
+            self.stats_tracker.finish_run()
+            self._write_run_outputs(send_emails, error=error)
+            return 1
+        if stream and account_group_names:
+            self.logger.info(
+                f"Streamed {self.loaded_row_count()} {self.ROW_NOUN} "
+                f"into {len(account_group_names)} account group statement(s) "
+                f"for {len(periods)} period(s) with a single query"
+            )
+        else:
+            self.logger.info(
+                f"Partitioned {self.loaded_row_count()} {self.ROW_NOUN} "
+                f"into {len(account_group_names)} account group(s) "
+                f"for {len(periods)} period(s) with a single query"
+            )
+
+        # Render statements and send emails as a pipeline: rendering the next
+        # statement overlaps with sending the previous one, and the bounded
+        # hand-off queue holds rendering back whenever sending falls behind
+        work = [
+            (ag, period, period_trackers[period])
+            for period, ags in account_groups_by_period.items()
+            for ag in ags
+        ]
+        if workers > 1:
+            self.logger.info(f"Processing account groups with {workers} workers")
+        run_pipeline(
+            work,
+            lambda item: self._render_item(item, send_emails, skip_unchanged),
+            lambda delivery: self._deliver_item(delivery, send_emails),
+            renderers=workers,
+            senders=workers,
+            depth=pipeline_depth
+        )
+        self.close_connections()
+        self.delivery_ledger.close()
+        self.stats_tracker.finish_run()
+
+        # Log summary
+        stats = self.stats_tracker.get_stats()
+        self.logger.info(
+            f"Processing complete. "
+            f"Successful: {stats['successful']}, "
+            f"Sent (no activity): {stats.get('no_activity', 0)}, "
+            f"Unchanged: {stats.get('unchanged', 0)}, "
+            f"Failed: {stats['failed']}"
+        )
+
+        # Send summary report (skip in dry-run mode)
+        if send_emails:
+            self.send_summary_report()
+        else:
+            self.logger.info("Skipping summary report in dry-run mode")
+
+        # Close pooled SMTP connections and report how many the run needed
+        self.smtp_pool.close()
+        smtp_stats = self.smtp_pool.get_stats()
+        self.logger.info(
+            f"SMTP usage: {smtp_stats['messages']} message(s) over "
+            f"{smtp_stats['connections']} connection(s), "
+            f"{smtp_stats['tls_handshakes']} TLS handshake(s), "
+            f"{smtp_stats['logins']} login(s), "
+            f"{smtp_stats['reconnects']} reconnect(s), "
+            f"{smtp_stats['retries']} retry(ies), "
+            f"{smtp_stats['throttled']} throttling reply(ies)"
+        )
+
+        self._write_run_outputs(send_emails)
+
+        if stats_json:
+            try:
+                self.stats_tracker.export_json(Path(stats_json))
+                self.logger.info(f"Run statistics written to {stats_json}")
+            except OSError as e:
+                self.logger.error(f"Failed to write run statistics to {stats_json}: {e}")
+
+        return 0 if stats['failed'] == 0 else 1
+
+
+class StatementEngine(StatementRunner):
+    """
+    Generate statements of one source for each account group and distribute them via email.
+
+    Subclasses adapt a statement source by declaring the class attributes
+    below (CSV_COLUMNS is built into the CSV row formatter unless the
+    adapter overrides format_row()) and implementing build_query() and
+    format_total(); everything else (single-scan partitioning, streaming,
+    rendering, and from StatementRunner the render/send pipeline, SMTP
+    pooling, the delivery ledger and statistics) is shared.
+    """
+
+    # Row key summed into statement totals, and row key routing rows to periods
+    AMOUNT_KEY = ''
+    DATE_KEY = ''
+
+    # Database used when config.json has no database_path (relative to the repository root)
+    DEFAULT_DATABASE_PATH = ''
+
+    # Secondary indexes backing the query access paths (created by --ensure-indexes)
+    REQUIRED_INDEXES: List[Tuple[str, str, List[str]]] = []
+
+    # Query aliases of tables that must never be full-scanned
+    GUARDED_TABLES: Dict[str, str] = {}
+
+    # CSV statement columns, built once into the row formatter, and their header
+    CSV_COLUMNS: List[CsvColumn] = []
+    CSV_HEADER: List[str] = []
+
+    # Typed columnar statement columns (Parquet / Arrow IPC output)
+    COLUMNS: List = []
+
+    def _init_source(self) -> None:
+        """
+        Set up the source: row formatter, database connections, columnar output and the per-run dataset.
+
+        Raises:
+            TypeError: If the adapter neither declares CSV_COLUMNS nor overrides format_row()
+        """
+        # CSV rows are formatted by the CSV_COLUMNS formatter built once, unless the adapter overrides format_row()
+        if type(self).format_row is StatementEngine.format_row:
+            if not self.CSV_COLUMNS:
+                raise TypeError(f"{type(self).__name__} must declare CSV_COLUMNS or override format_row()")
+            self.row_formatter = build_row_formatter(self.CSV_COLUMNS)
+        else:
+            self.row_formatter = self.format_row
+
+        # Set database path from config
+        database_path = self.config.get('database_path')
+        if database_path:
+            self.database_path = Path(database_path)
+        else:
+            # Default to standard location
+            self.database_path = REPO_ROOT / self.DEFAULT_DATABASE_PATH
+
+        # Verify database exists
+        if not self.database_path.exists():
+            self.logger.error(f"Database file not found: {self.database_path}")
+            sys.exit(1)
+
+        # Tuned read-only connections, one per thread (opened on first query, reused all run)
+        sqlite_config = self.config.get('sqlite', {})
+        self.connections = ThreadLocalConnections(
+            self.database_path,
+            immutable=sqlite_config.get('immutable', False),
+            pragmas=sqlite_config.get('pragmas')
+        )
+
+        # Optional typed columnar copies of every statement (archival and analytics)
+        columnar_config = self.config.get('columnar', {})
+        self.columnar_formats = columnar_config.get('formats', [])
+        self.columnar_batch_size = columnar_config.get('batch_size', DEFAULT_BATCH_SIZE)
+        try:
+            check_columnar_formats(self.columnar_formats)
+        except (ValueError, RuntimeError) as e:
+            self.logger.error(f"Invalid columnar configuration: {e}")
+            sys.exit(1)
+
+        # Per-run rows, materialized once and shared by every processing step
+        self.statement_dataset = StatementDataset(self.PREFIX, amount_key=self.AMOUNT_KEY)
+
+    @abstractmethod
+    def build_query(
+        self,
+        account_groups: List[str],
+        from_date: str,
+        to_date: str,
+        schema: Optional[str] = None
+    ) -> Tuple[str, List]:
+        """
+        Build the statement query for a date range and set of account groups.
+
+        The query must return only rows whose GL account falls in one of the
+        account groups, each tagged with its account group name in an
+        account_group column, along with AMOUNT_KEY and DATE_KEY. It must also
+        work as a subquery of a larger query, with table names qualified by
+        schema_prefix(schema).
+
+        Args:
+            account_groups: Names of the account groups to return rows for
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+            schema: Schema the source database is attached as (None for the
+                connection's main database)
+
+        Returns:
+            Tuple of (SQL query, bound parameters)
+        """
+
+    def format_row(self, row) -> List[str]:
+        """
+        Format one row as CSV cell values.
+
+        By default with the CSV_COLUMNS formatter (see build_row_formatter()).
+
+        Args:
+            row: Row (dictionary or sqlite3.Row) from build_query()
+
+        Returns:
+            List of cell values in CSV_HEADER order
+        """
+        return self.row_formatter(row)
+
+    @abstractmethod
+    def format_total(self, total: Any) -> str:
+        """Format a statement's AMOUNT_KEY total for the summary report."""
+
+    @staticmethod
+    def schema_prefix(schema: Optional[str] = None) -> str:
+        """Get the prefix qualifying build_query() table names with the schema their database is attached as."""
+        return f"{schema}." if schema else ''
+
+    def date_bounds(self, from_date: str, to_date: str) -> Tuple[str, str]:
+        """Get the DATE_KEY values bounding a YYYY-MM-DD date range (inclusive); the dates themselves by default."""
+        return from_date, to_date
+
+    def query_by_account_group(
+        self,
+        account_groups: List[str],
+        from_date: str,
+        to_date: str
+    ) -> Dict[str, List[Dict]]:
+        """
+        Query rows once for the date range and partition them by account group.
+
+        The date-range query is executed a single time. SQLite only returns rows
+        whose GL account falls in one of the requested account groups, tagged
+        with the account group name, and the rows are streamed from the cursor
+        into per-account-group buckets in one pass.
+
+        Args:
+            account_groups: Names of the account groups to partition into
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+
+        Returns:
+            Dictionary mapping each account group name to its list of rows
+        """
+        query, params = self.build_query(account_groups, from_date, to_date)
+        cursor = self.connections.get().cursor()
+
+        try:
+            with self.stats_tracker.time_stage('query'):
+                cursor.execute(query, params)
+            # Rows arrive already tagged with their account group; fetching is
+            # timed as the query stage and routing into buckets as classify
+            rows_by_account_group = None
+            for batch in self.stats_tracker.timed_batches(cursor):
+                with self.stats_tracker.time_stage('classify'):
+                    rows_by_account_group = partition_tagged_rows(
+                        batch, account_groups, buckets=rows_by_account_group
+                    )
+            if rows_by_account_group is None:
+                rows_by_account_group = {name: [] for name in account_groups}
+            return rows_by_account_group
+        finally:
+            cursor.close()
+
+    def stream_by_account_group(
+        self,
+        account_groups: List[str],
+        from_date: str,
+        to_date: str
+    ) -> None:
+        """
+        Query rows once for the date range and stream them straight into CSV files.
+
+        Rows go from the live cursor through formatting into one CSV writer per
+        account group without being collected, so memory use stays flat however
+        long the date range is. Row counts and totals are recorded in the
+        per-run dataset, which then drives the no-activity decision.
+
+        Args:
+            account_groups: Names of the account groups to stream
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+        """
+        query, params = self.build_query(account_groups, from_date, to_date)
+        cursor = self.connections.get().cursor()
+
+        try:
+            with self.stats_tracker.time_stage('query'):
+                cursor.execute(query, params)
+            # Fetching is timed as the query stage; routing and writing rows as csv
+            rows = (row for batch in self.stats_tracker.timed_batches(cursor) for row in batch)
+            self.load_rows(account_groups, [(from_date, to_date)], rows, stream=True)
+        finally:
+            cursor.close()
+
+    def query_by_period(
+        self,
+        account_groups: List[str],
+        periods: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Dict[str, List[Dict]]]:
+        """
+        Query rows once for several periods and partition them by (period, account group).
+
+        A single query covers the date range spanning every period, and each
+        row is routed into its period's account group bucket in the same pass.
+
+        Args:
+            account_groups: Names of the account groups to partition into
+            periods: (from_date, to_date) of every period, in date order
+
+        Returns:
+            Dictionary mapping each (from_date, to_date) to a dictionary of each
+            account group name to its list of rows
+        """
+        query, params = self.build_query(account_groups, periods[0][0], periods[-1][1])
+        find_period = period_finder(periods, self.date_bounds)
+        cursor = self.connections.get().cursor()
+
+        try:
+            with self.stats_tracker.time_stage('query'):
+                cursor.execute(query, params)
+            rows_by_period = None
+            for batch in self.stats_tracker.timed_batches(cursor):
+                with self.stats_tracker.time_stage('classify'):
+                    rows_by_period = partition_tagged_rows_by_period(
+                        batch, account_groups, periods, find_period, self.DATE_KEY, buckets=rows_by_period
+                    )
+            if rows_by_period is None:
+                rows_by_period = {period: {name: [] for name in account_groups} for period in periods}
+            return rows_by_period
+        finally:
+            cursor.close()
+
+    def stream_by_period(
+        self,
+        account_groups: List[str],
+        periods: List[Tuple[str, str]]
+    ) -> None:
+        """
+        Query rows once for several periods and stream them straight into CSV files.
+
+        Like stream_by_account_group(), with one CSV file per period and account group.
+
+        Args:
+            account_groups: Names of the account groups to stream
+            periods: (from_date, to_date) of every period, in date order
+        """
+        query, params = self.build_query(account_groups, periods[0][0], periods[-1][1])
+        cursor = self.connections.get().cursor()
+
+        try:
+            with self.stats_tracker.time_stage('query'):
+                cursor.execute(query, params)
+            rows = (row for batch in self.stats_tracker.timed_batches(cursor) for row in batch)
+            self.load_rows(account_groups, periods, rows, stream=True)
+        finally:
+            cursor.close()
+
+    def load_statements(
+        self,
+        account_groups: List[str],
+        periods: List[Tuple[str, str]],
+        stream: bool = False
+    ) -> None:
+        """
+        Query the rows of every statement of the run with a single query.
+
+        Rows are partitioned into the per-run dataset, or with stream=True
+        written straight into the CSV files.
+
+        Args:
+            account_groups: Names of the account groups to query
+            periods: (from_date, to_date) of every period, in date order
+            stream: If True, stream rows into CSV files instead of holding them
+        """
+        if stream:
+            if len(periods) > 1:
+                self.stream_by_period(account_groups, periods)
+            else:
+                self.stream_by_account_group(account_groups, *periods[0])
+        elif len(periods) > 1:
+            self.statement_dataset.materialize_periods(account_groups, periods, self.query_by_period)
+        else:
+            self.statement_dataset.materialize(account_groups, *periods[0], self.query_by_account_group)
+
+    def load_rows(
+        self,
+        account_groups: List[str],
+        periods: List[Tuple[str, str]],
+        rows: Iterable,
+        stream: bool = False
+    ) -> None:
+        """
+        Partition rows of build_query() into the per-run dataset, or stream them into CSV files.
+
+        Used for rows read by a query run elsewhere (e.g., a combined query
+        over several attached databases) as well as by the stream methods.
+
+        Args:
+            account_groups: Names of the account groups the rows were queried for
+            periods: (from_date, to_date) of every period, in date order
+            rows: Rows of build_query() for the date range covering every period, consumed once
+            stream: If True, stream rows into CSV files instead of holding them
+        """
+        find_period = period_finder(periods, self.date_bounds) if len(periods) > 1 else None
+        if stream:
+            # Row fetches are timed as the query stage; routing and writing rows as csv
+            with self.stats_tracker.time_stage('csv', excluding=('query',)):
+                if find_period:
+                    self.statement_dataset.stream_periods_to_csv(
+                        account_groups,
+                        periods,
+                        rows,
+                        self._statement_path,
+                        self.CSV_HEADER,
+                        self.row_formatter,
+                        find_period=find_period,
+                        date_key=self.DATE_KEY,
+                        extra_writers=self._columnar_writers if self.columnar_formats else None
+                    )
+                else:
+                    from_date, to_date = periods[0]
+                    self.statement_dataset.stream_to_csv(
+                        account_groups,
+                        from_date,
+                        to_date,
+                        rows,
+                        lambda account_group: self._statement_path(account_group, from_date, to_date),
+                        self.CSV_HEADER,
+                        self.row_formatter,
+                        extra_writers=self._columnar_writers if self.columnar_formats else None
+                    )
+        elif find_period:
+            with self.stats_tracker.time_stage('classify', excluding=('query',)):
+                rows_by_period = partition_tagged_rows_by_period(
+                    rows, account_groups, periods, find_period, self.DATE_KEY
+                )
+            self.statement_dataset.materialize_periods(
+                account_groups, periods, lambda *_: rows_by_period
+            )
+        else:
+            with self.stats_tracker.time_stage('classify', excluding=('query',)):
+                rows_by_account_group = partition_tagged_rows(rows, account_groups)
+            self.statement_dataset.materialize(
+                account_groups, *periods[0], lambda *_: rows_by_account_group
+            )
+
+    def loaded_row_count(self) -> int:
+        """Get the number of rows load_statements() read."""
+        return self.statement_dataset.total_row_count()
+
+    def close_connections(self) -> None:
+        """Close every database connection opened during the run."""
+        self.connections.close_all()
+
+    def _columnar_writers(self, account_group: str, from_date: str, to_date: str) -> List:
+        """Create the configured columnar writers for a statement, next to its CSV file."""
+        return columnar_writers(
+            self.columnar_formats,
+            self._statement_path(account_group, from_date, to_date),
+            self.COLUMNS,
+            self.columnar_batch_size
+        )
+
+    def _statement_path(self, account_group: str, from_date: str, to_date: str) -> Path:
+        """Get the CSV statement path for an account group and date range."""
+        return self.output_dir / f"{self.PREFIX}-{account_group}-{from_date}-{to_date}.csv"
+
+    def generate_csv(
+        self,
+        rows: List[Dict],
+        output_path: Path
+    ) -> None:
+        """
+        Generate CSV file from statement rows.
+
+        Args:
+            rows: List of rows from build_query()
+            output_path: Path where CSV should be written
+        """
+        with open(output_path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+
+            # Write header
+            writer.writerow(self.CSV_HEADER)
+
+            # Write data rows
+            writer.writerows(map(self.row_formatter, rows))
+
+    def generate_statement(
+        self,
+        account_group: str,
+        from_date: str,
+        to_date: str
+    ) -> Optional[Path]:
+        """
+        Generate a statement from the database.
+
+        Args:
+            account_group: The account group name
+            from_date: Start date in YYYY-MM-DD format
+            to_date: End date in YYYY-MM-DD format
+
+        Returns:
+            Path to the generated CSV file, or None if generation failed
+        """
+        self.logger.info(
+            f"Generating statement for {account_group} "
+            f"from {from_date} to {to_date}"
+        )
+
+        # Streaming mode already wrote the CSV file while reading the cursor
+        streamed_path = self.statement_dataset.statement_path(account_group, from_date, to_date)
+        if streamed_path:
+            self.logger.info(
+                f"Generated statement with "
+                f"{self.statement_dataset.row_count(account_group, from_date, to_date)} {self.ROW_NOUN}: {streamed_path}"
+            )
+            return streamed_path
+
+        try:
+            # Get rows from the per-run dataset (queried only if not yet materialized)
+            self.statement_dataset.materialize(
+                [account_group], from_date, to_date, self.query_by_account_group
+            )
+            rows = self.statement_dataset.rows(account_group, from_date, to_date)
+
+            # Generate CSV file
+            file_path = self._statement_path(account_group, from_date, to_date)
+
+            self.generate_csv(rows, file_path)
+            if self.columnar_formats:
+                write_statement(rows, self._columnar_writers(account_group, from_date, to_date))
+
+            self.logger.info(f"Generated statement with {len(rows)} {self.ROW_NOUN}: {file_path}")
+            return file_path
+
+        except Exception as e:
+            self.logger.error(f"Failed to generate statement for {account_group}: {e}")
+            return None
+
+    def ensure_indexes(self) -> int:
+        """
+        Create missing secondary indexes and verify the query plan uses them.
+
+        Runs EXPLAIN QUERY PLAN on the statement query for all account groups and
+        fails if any guarded table is still accessed with a full scan.
+
+        Returns:
+            Exit code (0 for success, 1 if a full scan remains)
+        """
+        created = ensure_indexes(self.database_path, self.REQUIRED_INDEXES, self.logger)
+        self.logger.info(
+            f"Created {len(created)} index(es); {len(self.REQUIRED_INDEXES) - len(created)} already present"
+        )
+
+        from_date, to_date = get_date_range()
+        query, params = self.build_query(
+            [ag['account_group'] for ag in self.account_groups],
+            from_date,
+            to_date
+        )
+        full_scans = find_full_scans(self.connections.get(), query, params, self.GUARDED_TABLES)
+        self.connections.close_all()
+
+        if full_scans:
+            for scan in full_scans:
+                self.logger.error(f"Query plan uses a full scan: {scan}")
+            return 1
+
+        self.logger.info("Query plan check passed: no full scans of guarded tables")
+        return 0
+
+    def render_account_group(
+        self,
+        ag: Dict,
+        from_date: str,
+        to_date: str,
+        send_emails: bool = False,
+        skip_unchanged: bool = False,
+        stats_tracker: Optional[StatisticsTracker] = None
+    ) -> Optional[StatementDelivery]:
+        """
+        Render stage for a single account group: generate statement and prepare its email.
+
+        Args:
+            ag: Account group configuration dictionary
+            from_date: Start date for the statement
+            to_date: End date for the statement
+            send_emails: If True, emails will actually be sent (failures are recorded
+                in the delivery ledger); if False (default), dry-run mode
+            skip_unchanged: If True, do not re-send an email identical to one the
+                delivery ledger records as already delivered
+            stats_tracker: Tracker to record results on (default: the run's tracker;
+                a period tracker in multi-period runs)
+
+        Returns:
+            The email to send, or None if there is nothing to send (the outcome,
+            a failure or an unchanged statement, has already been recorded)
+        """
+        if stats_tracker is None:
+            stats_tracker = self.stats_tracker
+        account_group = ag.get('account_group')
+        email = ag.get('email')
+        name = ag.get('name', account_group or 'Unknown')
+
+        if not account_group or not email:
+            self.logger.error(f"Invalid account group configuration: {ag}")
+            stats_tracker.record_failure(
+                name,
+                "Invalid account group configuration (missing account_group or email)"
+            )
+            return None
+
+        self.logger.info(f"Processing account group: {name}")
+
+        # Materialize rows (a no-op when run() already did) to check if any exist
+        self.statement_dataset.materialize(
+            [account_group], from_date, to_date, self.query_by_account_group
+        )
+        row_count = self.statement_dataset.row_count(account_group, from_date, to_date)
+        stats_tracker.record_row_count(name, row_count)
+
+        # Send no-activity email when account group has no rows
+        if not self.statement_dataset.has_activity(account_group, from_date, to_date):
+            self.statement_dataset.release(account_group, from_date, to_date)
+            if skip_unchanged and self.delivery_ledger.is_unchanged(
+                account_group, from_date, to_date, 'no_activity', None
+            ):
+                self.logger.info(f"Not re-sending no-activity email to {name}: already delivered")
+                stats_tracker.record_unchanged(name)
+                return None
+            self.logger.info(f"Sending no-activity email to {name}: no {self.ROW_NOUN} found for date range")
+            no_activity_subject = self.email_template.get(
+                'no_activity_subject',
+                self.email_template.get('subject', '') + ' (No Activity)'
+            ).format(account_group=name, from_date=from_date, to_date=to_date)
+            no_activity_body = self.email_template.get(
+                'no_activity_body',
+                self.NO_ACTIVITY_BODY
+            ).format(account_group=name, from_date=from_date, to_date=to_date)
+            return StatementDelivery(
+                name, account_group, email, no_activity_subject, no_activity_body, None,
+                from_date, to_date, 'no_activity', None, 0, stats_tracker
+            )
+
+        # Generate statement (any query needed here is timed separately)
+        with stats_tracker.time_stage('csv', name, excluding=('query', 'classify')):
+            statement_path = self.generate_statement(
+                account_group,
+                from_date,
+                to_date
+            )
+
+        # Statement rendered (or failed): free its rows, keep counts and totals
+        self.statement_dataset.release(account_group, from_date, to_date)
+
+        if not statement_path:
+            stats_tracker.record_failure(
+                name,
+                "Failed to generate statement (see logs for details)"
+            )
+            if send_emails:
+                self.delivery_ledger.record(
+                    account_group, from_date, to_date, 'failed', reason="Failed to generate statement"
+                )
+            return None
+        stats_tracker.record_attachment_bytes(name, statement_path.stat().st_size)
+        stats_tracker.record_statement_totals(
+            name,
+            row_count,
+            self.format_total(self.statement_dataset.total(account_group, from_date, to_date))
+        )
+        content_hash = file_sha256(statement_path)
+
+        if skip_unchanged and self.delivery_ledger.is_unchanged(
+            account_group, from_date, to_date, 'sent', content_hash
+        ):
+            self.logger.info(f"Not re-sending statement to {name}: identical statement already delivered")
+            stats_tracker.record_unchanged(name)
+            return None
+
+        # Prepare email
+        subject = self.email_template.get('subject', '').format(
+            account_group=name,
+            from_date=from_date,
+            to_date=to_date
+        )
+
+        body = self.email_template.get('body', '').format(
+            account_group=name,
+            from_date=from_date,
+            to_date=to_date
+        )
+
+        return StatementDelivery(
+            name, account_group, email, subject, body, statement_path,
+            from_date, to_date, 'sent', content_hash, row_count, stats_tracker
+        )
+
+
+def build_parser(description: str) -> argparse.ArgumentParser:
+    """
+    Build the command line parser shared by every distributor.
+
+    Args:
+        description: Parser description (e.g., "Generate and distribute Bill.com statements ...")
+
+    Returns:
+        The argument parser
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--config',
+        default='config.json',
+        help='Path to configuration JSON file (default: config.json)'
+    )
+    parser.add_argument(
+        '--account-groups',
+        dest='account_groups',
+        help='Comma-separated list of account groups to process (case-insensitive). If not specified, all account groups are processed.'
+    )
+    parser.add_argument(
+        '--list-account-groups',
+        action='store_true',
+        dest='list_account_groups',
+        help='List all available account groups and exit'
+    )
+    parser.add_argument(
+        '--ensure-indexes',
+        action='store_true',
+        dest='ensure_indexes',
+        help='Create missing database indexes, check the query plan for full scans and exit'
+    )
+
+    # Date specification options
+    parser.add_argument(
+        '--from-date',
+        dest='from_date',
+        help='Start date in YYYY-MM-DD format (default: first day of previous month)'
+    )
+    parser.add_argument(
+        '--to-date',
+        dest='to_date',
+        help='End date in YYYY-MM-DD format (default: last day of previous month)'
+    )
+    parser.add_argument(
+        '--months',
+        help='Batch mode: one statement per month per account group, e.g. 2024-01..2024-12'
+    )
+    parser.add_argument(
+        '--quarters',
+        help='Batch mode: one statement per quarter per account group, e.g. 2024Q1..2024Q4'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of account groups to process concurrently (default: 1)'
+    )
+    parser.add_argument(
+        '--pipeline-depth',
+        type=int,
+        default=DEFAULT_PIPELINE_DEPTH,
+        dest='pipeline_depth',
+        help=f'Maximum rendered statements waiting to be emailed (default: {DEFAULT_PIPELINE_DEPTH})'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream rows from the database straight into the CSV files (bounded memory for long date ranges)'
+    )
+    parser.add_argument(
+        '--stats-json',
+        dest='stats_json',
+        help='Write run statistics, including per-stage timings, to this JSON file'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Process only the account groups not yet delivered for this date range (per the delivery ledger)'
+    )
+    parser.add_argument(
+        '--skip-unchanged',
+        action='store_true',
+        dest='skip_unchanged',
+        help='Do not re-send statements identical to ones already delivered (per the delivery ledger)'
+    )
+    parser.add_argument(
+        '--send-emails',
+        action='store_true',
+        dest='send_emails',
+        help='Actually send emails (default: dry-run mode, emails are not sent)'
+    )
+    return parser
+
+
+def run_cli(engine_class: Type[StatementRunner], description: str) -> None:
+    """
+    Command line entry point of a distributor script; exits with the run's exit code.
+
+    Args:
+        engine_class: The distributor's StatementRunner subclass (e.g., a StatementEngine adapter)
+        description: Command line description
+    """
+    parser = build_parser(description)
+
+    # Print help if no arguments provided
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(0)
+
+    args = parser.parse_args()
+
+    # Verify config file exists before proceeding
+    if not os.path.exists(args.config):
+        print(f"Error: Configuration file not found: {args.config}", file=sys.stderr)
+        sys.exit(1)
+
+    # Set up logging FIRST (before any log messages) using shared utility
+    logger = setup_logging(args.config, engine_class.__module__)
+
+    # Create distributor to load account groups
+    distributor = engine_class(args.config, logger)
+
+    # Handle --list-account-groups (takes precedence, exits immediately)
+    if args.list_account_groups:
+        list_account_groups(distributor.account_groups)
+
+    # Handle --ensure-indexes (maintenance, exits immediately)
+    if args.ensure_indexes:
+        sys.exit(distributor.ensure_indexes())
+
+    # Validate date arguments
+    if args.to_date and not args.from_date:
+        parser.error("--to-date requires --from-date")
+        sys.exit(1)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.pipeline_depth < 1:
+        parser.error("--pipeline-depth must be at least 1")
+    if args.months and args.quarters:
+        parser.error("--months and --quarters cannot be combined")
+    if (args.months or args.quarters) and (args.from_date or args.to_date):
+        parser.error("--months and --quarters cannot be combined with --from-date or --to-date")
+
+    periods = None
+    if args.months:
+        periods = get_month_periods(args.months)
+    elif args.quarters:
+        periods = get_quarter_periods(args.quarters)
+
+    exit_code = distributor.run(
+        args.from_date,
+        args.to_date,
+        args.send_emails,
+        args.account_groups,
+        args.workers,
+        args.stream,
+        args.stats_json,
+        args.resume,
+        args.skip_unchanged,
+        periods,
+        args.pipeline_depth
+    )
+    sys.exit(exit_code)
@@ -0,0 +1,256 @@
+"""
+Statement output writers.
+
+Provides a small writer layer turning raw statement rows into files, one
+row at a time, alongside the CSV statements emailed to account groups:
+columnar writers (Parquet, Arrow IPC) keeping typed values (dates,
+timestamps, integer cents, GL codes as text) for archival and analytics.
+
+Columnar writers buffer at most batch_size rows, then write them out as one
+record batch, so memory use does not grow with the statement size. The
+columnar formats need pyarrow, which is optional and only imported when a
+columnar format is configured.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Only needed for columnar output
+    pyarrow = None
+
+
+# Columnar formats: name -> file suffix
+COLUMNAR_FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# Default rows per record batch written by columnar writers
+DEFAULT_BATCH_SIZE = 10000
+
+# Supported Column.type values
+COLUMN_TYPES = ('string', 'date', 'timestamp', 'cents', 'float')
+
+
+class Column(NamedTuple):
+    """A typed statement column for columnar output."""
+    name: str
+    type: str                     # One of COLUMN_TYPES
+    value: Callable[[Any], Any]   # Row -> typed value (None for null)
+
+
+def _arrow_types() -> Dict[str, Any]:
+    """Map column types to Arrow types."""
+    return {
+        'string': pyarrow.string(),
+        'date': pyarrow.date32(),
+        'timestamp': pyarrow.timestamp('ms', tz='UTC'),
+        'cents': pyarrow.int64(),
+        'float': pyarrow.float64(),
+    }
+
+
+def check_columnar_formats(formats: List[str]) -> None:
+    """
+    Check that columnar formats are supported and can be written.
+
+    Raises:
+        ValueError: If a format is not supported
+        RuntimeError: If pyarrow is not installed
+    """
+    for file_format in formats:
+        if file_format not in COLUMNAR_FORMATS:
+            raise ValueError(
+                f"Unsupported columnar format: {file_format} (expected one of {', '.join(COLUMNAR_FORMATS)})"
+            )
+    if formats and pyarrow is None:
+        raise RuntimeError("Columnar output requires pyarrow (pip install pyarrow)")
+
+
+def as_text(value: Any) -> Optional[str]:
+    """Convert a value to text (e.g., a numeric GL code), None if missing."""
+    if value is None:
+        return None
+    return str(value)
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    """Parse a YYYY-MM-DD (or longer ISO) date string, None if empty or invalid."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp (e.g., "2024-11-01T00:00:00.000Z"), None if empty or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def dollars_to_cents(amount: Optional[float]) -> Optional[int]:
+    """Convert a dollar amount to integer cents, None if missing."""
+    if amount is None:
+        return None
+    return int(round(amount * 100))
+
+
+class StatementWriter(ABC):
+    """
+    Base class of statement writers: rows in, one file out.
+
+    The file is created by the first write_row(), so statements without
+    rows leave no file behind. Subclasses implement write_row() and close(),
+    which abort() relies on for cleanup.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize without creating the file.
+
+        Args:
+            path: Path of the file to write
+        """
+        self.path = Path(path)
+        self.row_count = 0
+
+    @abstractmethod
+    def write_row(self, row: Any) -> None:
+        """Write one statement row (dictionary or sqlite3.Row)."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish the file."""
+
+    def abort(self) -> None:
+        """Close and remove a partially written file."""
+        try:
+            self.close()
+        finally:
+            self.path.unlink(missing_ok=True)
+
+
+class ColumnarStatementWriter(StatementWriter):
+    """
+    Parquet or Arrow IPC statement writer with typed columns.
+
+    Rows are converted with each Column's value callable and buffered per
+    column; every batch_size rows the buffer is written as one record batch.
+    """
+
+    def __init__(self, path: Path, columns: List[Column], file_format: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Initialize without creating the file.
+
+        Args:
+            path: Path of the file to write
+            columns: Typed statement columns
+            file_format: "parquet" or "arrow" (Arrow IPC file)
+            batch_size: Rows per record batch
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+            ValueError: If the format or a column type is not supported
+        """
+        if pyarrow is None:
+            raise RuntimeError(f"{file_format} output requires pyarrow (pip install pyarrow)")
+        if file_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {file_format}")
+        super().__init__(path)
+        arrow_types = _arrow_types()
+        for column in columns:
+            if column.type not in arrow_types:
+                raise ValueError(f"Unsupported column type for {column.name}: {column.type}")
+        self.columns = columns
+        self.file_format = file_format
+        self.batch_size = max(1, batch_size)
+        self.schema = pyarrow.schema([(column.name, arrow_types[column.type]) for column in columns])
+        self._buffers: List[List] = [[] for _ in columns]
+        self._writer = None
+
+    def _flush(self) -> None:
+        """Write the buffered rows as one record batch."""
+        if not self._buffers[0]:
+            return
+        batch = pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(values, type=field.type) for values, field in zip(self._buffers, self.schema)],
+            schema=self.schema
+        )
+        if self._writer is None:
+            if self.file_format == 'parquet':
+                self._writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+            else:
+                self._writer = pyarrow.ipc.new_file(str(self.path), self.schema)
+        self._writer.write_batch(batch)
+        self._buffers = [[] for _ in self.columns]
+
+    def write_row(self, row: Any) -> None:
+        for values, column in zip(self._buffers, self.columns):
+            values.append(column.value(row))
+        self.row_count += 1
+        if len(self._buffers[0]) >= self.batch_size:
+            self._flush()
+
+    def close(self) -> None:
+        try:
+            self._flush()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+def columnar_writers(
+    formats: List[str],
+    csv_path: Path,
+    columns: List[Column],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[StatementWriter]:
+    """
+    Create the columnar writers for a statement, next to its CSV file.
+
+    Args:
+        formats: Columnar formats to write (see COLUMNAR_FORMATS)
+        csv_path: Path of the statement's CSV file; each format replaces its suffix
+        columns: Typed statement columns
+        batch_size: Rows per record batch
+
+    Returns:
+        One writer per format
+    """
+    return [
+        ColumnarStatementWriter(Path(csv_path).with_suffix(COLUMNAR_FORMATS[file_format]), columns, file_format, batch_size)
+        for file_format in formats
+    ]
+
+
+def write_statement(rows: List[Any], writers: List[StatementWriter]) -> None:
+    """
+    Write statement rows to every writer, removing all files if any write fails.
+
+    Args:
+        rows: Statement rows (dictionaries or sqlite3.Rows)
+        writers: Writers to write every row to
+    """
+    try:
+        for row in rows:
+            for writer in writers:
+                writer.write_row(row)
+        for writer in writers:
+            writer.close()
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
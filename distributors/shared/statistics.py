@@ -5,27 +5,122 @@ Provides utilities to track processing statistics and generate
 summary reports for statement distribution runs.
 """
 
-from typing import Dict, List, Tuple, Optional
+import copy
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Tuple, Optional
+
+
+# Timed processing stages, in pipeline order
+STAGES = ('query', 'classify', 'csv', 'mime', 'smtp')
+
+# Rows fetched from a cursor per timed_batches() step
+FETCH_BATCH_SIZE = 1000
+
+# Number of slowest account groups listed in the summary report
+SLOWEST_ACCOUNT_GROUPS = 5
+
+# Stage timer signature: (stage) -> context manager timing the enclosed block
+StageTimer = Callable[[str], ContextManager]
+
+# Stage time measured on each thread (stage -> seconds), so that time_stage()
+# only excludes nested stages of its own thread, not of concurrent threads
+_thread_stage_seconds = threading.local()
+
+
+def _thread_stage_totals() -> Dict[str, float]:
+    """Get the time per stage measured on the calling thread so far, across all trackers."""
+    totals = getattr(_thread_stage_seconds, 'totals', None)
+    if totals is None:
+        totals = _thread_stage_seconds.totals = {}
+    return totals
+
+
+def _add_thread_stage_time(stage: str, seconds: float) -> None:
+    """Add time measured on the calling thread to its per-stage totals."""
+    totals = _thread_stage_totals()
+    totals[stage] = totals.get(stage, 0.0) + seconds
 
 
 class StatisticsTracker:
-    """Track statistics for statement distribution process."""
+    """
+    Track statistics for statement distribution process.
+
+    All record_* methods are thread-safe, so account groups may be processed
+    concurrently. get_stats() lists account groups in the order given to
+    set_account_group_order(), regardless of the order they completed in.
+
+    Stage timings use the monotonic time.perf_counter() clock and are kept
+    per run and per account group. With several workers the per-run stage
+    times are summed across threads, so they can exceed the elapsed time.
+
+    Multi-period runs record each period on a period_tracker(); everything
+    recorded there is also recorded on the run tracker under the account
+    group name qualified by the period label (e.g., "Infrastructure (2024-01)").
+    """
     
     def __init__(self):
         """Initialize statistics tracker with zero counts."""
+        self._lock = threading.Lock()
+        self._account_group_order: Dict[str, int] = {}
         self.stats = {
             'total_account_groups': 0,
             'successful': 0,
             'failed': 0,
             'skipped': 0,
             'no_activity': 0,
+            'unchanged': 0,
             'account_groups_processed': [],
             'account_groups_failed': [],  # Contains (name, reason) tuples
             'account_groups_skipped': [],
             'account_groups_no_activity': [],
+            'account_groups_unchanged': [],  # Already delivered with identical content
+            'account_group_totals': {},  # name -> {'rows': int, 'total': str}
+            'performance': {
+                'elapsed_seconds': None,
+                'stages': {stage: 0.0 for stage in STAGES},
+                'rows': 0,
+                'attachment_bytes': 0,
+                'bytes_sent': 0,  # Encoded (possibly compressed) attachment bytes emailed
+                # name -> {'stages': {stage: seconds}, 'rows': int, 'attachment_bytes': int, 'bytes_sent': int}
+                'account_groups': {}
+            },
             'from_date': None,
-            'to_date': None
+            'to_date': None,
+            'started_at': None,  # ISO 8601 UTC wall-clock times of start_run()/finish_run()
+            'finished_at': None
         }
+        self._run_started: Optional[float] = None
+        self._parent: Optional['StatisticsTracker'] = None
+        self._period_label: Optional[str] = None
+        self._periods: Dict[str, 'StatisticsTracker'] = {}
+
+    def period_tracker(self, label: str) -> 'StatisticsTracker':
+        """
+        Get a tracker for one period of a multi-period run.
+
+        Args:
+            label: Period label (e.g., "2024-01", "2024Q1")
+
+        Returns:
+            Tracker whose records are also recorded on this run tracker
+        """
+        tracker = StatisticsTracker()
+        tracker._parent = self
+        tracker._period_label = label
+        with self._lock:
+            self._periods[label] = tracker
+        return tracker
+
+    def qualified_name(self, account_group_name: str) -> str:
+        """Get an account group name qualified by this tracker's period label, if any."""
+        if self._period_label is None:
+            return account_group_name
+        return f"{account_group_name} ({self._period_label})"
     
     def set_date_range(self, from_date: str, to_date: str) -> None:
         """Set the date range for this run."""
@@ -35,30 +130,248 @@ class StatisticsTracker:
     def set_total_account_groups(self, count: int) -> None:
         """Set the total number of account groups to process."""
         self.stats['total_account_groups'] = count
+
+    def set_account_group_order(self, account_group_names: List[str]) -> None:
+        """Set the order in which account groups are listed by get_stats()."""
+        self._account_group_order = {name: i for i, name in enumerate(account_group_names)}
+        if self._parent is not None:
+            self._parent._extend_account_group_order(
+                [self.qualified_name(name) for name in account_group_names]
+            )
+
+    def _extend_account_group_order(self, account_group_names: List[str]) -> None:
+        """Append account groups (e.g., a period's qualified names) to the get_stats() order."""
+        with self._lock:
+            for name in account_group_names:
+                self._account_group_order.setdefault(name, len(self._account_group_order))
     
     def record_success(self, account_group_name: str) -> None:
         """Record a successful account group processing."""
-        self.stats['successful'] += 1
-        self.stats['account_groups_processed'].append(account_group_name)
+        with self._lock:
+            self.stats['successful'] += 1
+            self.stats['account_groups_processed'].append(account_group_name)
+        if self._parent is not None:
+            self._parent.record_success(self.qualified_name(account_group_name))
     
     def record_failure(self, account_group_name: str, reason: str) -> None:
         """Record a failed account group processing."""
-        self.stats['failed'] += 1
-        self.stats['account_groups_failed'].append((account_group_name, reason))
+        with self._lock:
+            self.stats['failed'] += 1
+            self.stats['account_groups_failed'].append((account_group_name, reason))
+        if self._parent is not None:
+            self._parent.record_failure(self.qualified_name(account_group_name), reason)
     
     def record_skipped(self, account_group_name: str) -> None:
         """Record a skipped account group (no data)."""
-        self.stats['skipped'] += 1
-        self.stats['account_groups_skipped'].append(account_group_name)
+        with self._lock:
+            self.stats['skipped'] += 1
+            self.stats['account_groups_skipped'].append(account_group_name)
+        if self._parent is not None:
+            self._parent.record_skipped(self.qualified_name(account_group_name))
 
     def record_sent_no_activity(self, account_group_name: str) -> None:
         """Record an account group that received no-activity email (no CSV attachment)."""
-        self.stats['no_activity'] += 1
-        self.stats['account_groups_no_activity'].append(account_group_name)
+        with self._lock:
+            self.stats['no_activity'] += 1
+            self.stats['account_groups_no_activity'].append(account_group_name)
+        if self._parent is not None:
+            self._parent.record_sent_no_activity(self.qualified_name(account_group_name))
+
+    def record_unchanged(self, account_group_name: str) -> None:
+        """Record an account group not re-sent because it already received an identical email."""
+        with self._lock:
+            self.stats['unchanged'] += 1
+            self.stats['account_groups_unchanged'].append(account_group_name)
+        if self._parent is not None:
+            self._parent.record_unchanged(self.qualified_name(account_group_name))
+    
+    def record_statement_totals(self, account_group_name: str, row_count: int, total: str) -> None:
+        """Record the row count and formatted amount total of an account group's statement."""
+        with self._lock:
+            self.stats['account_group_totals'][account_group_name] = {
+                'rows': row_count,
+                'total': total
+            }
+        if self._parent is not None:
+            self._parent.record_statement_totals(self.qualified_name(account_group_name), row_count, total)
+
+    def start_run(self) -> None:
+        """Start the run's elapsed-time clock."""
+        self.stats['started_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self._run_started = time.perf_counter()
+
+    def finish_run(self) -> None:
+        """Stop the run's elapsed-time clock."""
+        if self._run_started is not None:
+            with self._lock:
+                self.stats['performance']['elapsed_seconds'] = time.perf_counter() - self._run_started
+                self.stats['finished_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    def _account_group_performance(self, account_group_name: str) -> Dict:
+        """Get (creating if needed) an account group's performance entry; caller holds the lock."""
+        account_groups = self.stats['performance']['account_groups']
+        if account_group_name not in account_groups:
+            account_groups[account_group_name] = {
+                'stages': {stage: 0.0 for stage in STAGES},
+                'rows': 0,
+                'attachment_bytes': 0,
+                'bytes_sent': 0
+            }
+        return account_groups[account_group_name]
+
+    def record_stage_time(self, stage: str, seconds: float, account_group_name: Optional[str] = None) -> None:
+        """
+        Add time spent in a stage to the run and, if given, to an account group.
+
+        Args:
+            stage: One of STAGES
+            seconds: Elapsed time to add
+            account_group_name: Account group the time was spent for, or None for
+                shared work done once for the whole run (e.g., the single query)
+        """
+        with self._lock:
+            performance = self.stats['performance']
+            performance['stages'][stage] = performance['stages'].get(stage, 0.0) + seconds
+            if account_group_name is not None:
+                group_stages = self._account_group_performance(account_group_name)['stages']
+                group_stages[stage] = group_stages.get(stage, 0.0) + seconds
+        if self._parent is not None:
+            self._parent.record_stage_time(
+                stage,
+                seconds,
+                self.qualified_name(account_group_name) if account_group_name is not None else None
+            )
+
+    @contextmanager
+    def time_stage(
+        self,
+        stage: str,
+        account_group_name: Optional[str] = None,
+        excluding: Iterable[str] = ()
+    ) -> Iterator[None]:
+        """
+        Time the enclosed block as a stage.
+
+        Args:
+            stage: One of STAGES
+            account_group_name: Account group the time is spent for (None for the run)
+            excluding: Stages timed separately inside the block, whose time is
+                subtracted so it is not counted twice (only time measured on
+                this thread, so concurrent threads do not affect it)
+        """
+        excluding = tuple(excluding)
+        thread_totals = _thread_stage_totals()
+        excluded_before = sum(thread_totals.get(excluded, 0.0) for excluded in excluding)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            seconds -= sum(thread_totals.get(excluded, 0.0) for excluded in excluding) - excluded_before
+            seconds = max(seconds, 0.0)
+            _add_thread_stage_time(stage, seconds)
+            self.record_stage_time(stage, seconds, account_group_name)
+
+    def stage_timer(self, account_group_name: Optional[str] = None) -> StageTimer:
+        """Get a StageTimer recording stages for an account group (or the run)."""
+        return lambda stage: self.time_stage(stage, account_group_name)
+
+    def timed_batches(self, cursor, stage: str = 'query', batch_size: int = FETCH_BATCH_SIZE) -> Iterator[List]:
+        """
+        Fetch a cursor's rows in batches, timing only the fetches as a stage.
+
+        Time the caller spends on each batch is not included, so query time
+        (SQLite producing rows) and processing time can be told apart.
+
+        Args:
+            cursor: Executed sqlite3 cursor
+            stage: Stage to record fetch time under (default: "query")
+            batch_size: Rows per fetchmany() call
+
+        Yields:
+            Lists of rows, until the cursor is exhausted
+        """
+        while True:
+            start = time.perf_counter()
+            batch = cursor.fetchmany(batch_size)
+            seconds = time.perf_counter() - start
+            _add_thread_stage_time(stage, seconds)
+            self.record_stage_time(stage, seconds)
+            if not batch:
+                return
+            yield batch
+
+    def record_row_count(self, account_group_name: str, row_count: int) -> None:
+        """Record the number of statement rows for an account group."""
+        with self._lock:
+            self._account_group_performance(account_group_name)['rows'] = row_count
+            self.stats['performance']['rows'] = sum(
+                entry['rows'] for entry in self.stats['performance']['account_groups'].values()
+            )
+        if self._parent is not None:
+            self._parent.record_row_count(self.qualified_name(account_group_name), row_count)
+
+    def record_attachment_bytes(self, account_group_name: str, attachment_bytes: int) -> None:
+        """Record the size of an account group's statement attachment."""
+        with self._lock:
+            self._account_group_performance(account_group_name)['attachment_bytes'] = attachment_bytes
+            self.stats['performance']['attachment_bytes'] = sum(
+                entry['attachment_bytes'] for entry in self.stats['performance']['account_groups'].values()
+            )
+        if self._parent is not None:
+            self._parent.record_attachment_bytes(self.qualified_name(account_group_name), attachment_bytes)
+
+    def record_bytes_sent(self, account_group_name: str, bytes_sent: int) -> None:
+        """Record the encoded attachment bytes emailed to an account group."""
+        with self._lock:
+            self._account_group_performance(account_group_name)['bytes_sent'] = bytes_sent
+            self.stats['performance']['bytes_sent'] = sum(
+                entry.get('bytes_sent', 0) for entry in self.stats['performance']['account_groups'].values()
+            )
+        if self._parent is not None:
+            self._parent.record_bytes_sent(self.qualified_name(account_group_name), bytes_sent)
+
+    def _order_key(self, account_group_name: str) -> Tuple[int, str]:
+        """Sort key placing account groups in the configured order (unknown names last)."""
+        return (self._account_group_order.get(account_group_name, len(self._account_group_order)), account_group_name)
     
     def get_stats(self) -> Dict:
-        """Get the current statistics dictionary."""
-        return self.stats
+        """Get a snapshot of the statistics dictionary with account groups in deterministic order."""
+        with self._lock:
+            stats = copy.deepcopy(self.stats)
+            periods = dict(self._periods)
+        for key in (
+            'account_groups_processed',
+            'account_groups_skipped',
+            'account_groups_no_activity',
+            'account_groups_unchanged'
+        ):
+            stats[key].sort(key=self._order_key)
+        stats['account_groups_failed'].sort(key=lambda failure: self._order_key(failure[0]))
+        stats['account_group_totals'] = dict(
+            sorted(stats['account_group_totals'].items(), key=lambda item: self._order_key(item[0]))
+        )
+        stats['performance']['account_groups'] = dict(
+            sorted(stats['performance']['account_groups'].items(), key=lambda item: self._order_key(item[0]))
+        )
+        if periods:
+            stats['periods'] = {label: tracker.get_stats() for label, tracker in periods.items()}
+        return stats
+
+    def to_json(self, indent: int = 2) -> str:
+        """Get the statistics, including performance data, as a JSON document."""
+        return json.dumps(self.get_stats(), indent=indent)
+
+    def export_json(self, path: Path) -> None:
+        """
+        Write the statistics, including performance data, to a JSON file.
+
+        Args:
+            path: Path of the JSON file to write
+        """
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+            f.write("\n")
 
 
 def generate_summary_report(stats: Dict, title: str = "Statement Distributor") -> str:
@@ -77,6 +390,7 @@ def generate_summary_report(stats: Dict, title: str = "Statement Distributor") -
     failed = stats['failed']
     skipped = stats.get('skipped', 0)
     no_activity = stats.get('no_activity', 0)
+    unchanged = stats.get('unchanged', 0)
     from_date = stats['from_date']
     to_date = stats['to_date']
     
@@ -90,21 +404,47 @@ def generate_summary_report(stats: Dict, title: str = "Statement Distributor") -
     report.append(f"Sent (no activity): {no_activity}")
     if skipped > 0:
         report.append(f"Skipped (no transactions): {skipped}")
+    if unchanged > 0:
+        report.append(f"Unchanged (not re-sent): {unchanged}")
     report.append(f"Failed: {failed}")
     report.append("")
     
+    if stats.get('periods'):
+        report.append("Periods:")
+        for label, period in stats['periods'].items():
+            report.append(
+                f"  - {label} ({period['from_date']} to {period['to_date']}): "
+                f"{period['successful']} successful, "
+                f"{period.get('no_activity', 0)} no activity, "
+                f"{period['failed']} failed, "
+                f"{period['performance']['rows']} rows"
+            )
+        report.append("")
+    
     if stats['account_groups_processed']:
         report.append("Account Groups Processed Successfully:")
         for ag in stats['account_groups_processed']:
             report.append(f"  - {ag}")
         report.append("")
     
+    if stats.get('account_group_totals'):
+        report.append("Statement Totals:")
+        for ag, totals in stats['account_group_totals'].items():
+            report.append(f"  - {ag}: {totals['rows']} rows, {totals['total']}")
+        report.append("")
+    
     if stats.get('account_groups_no_activity'):
         report.append("Account Groups Sent (No Activity):")
         for ag in stats['account_groups_no_activity']:
             report.append(f"  - {ag}")
         report.append("")
     
+    if stats.get('account_groups_unchanged'):
+        report.append("Account Groups Unchanged (already delivered, not re-sent):")
+        for ag in stats['account_groups_unchanged']:
+            report.append(f"  - {ag}")
+        report.append("")
+    
     if stats.get('account_groups_skipped'):
         report.append("Account Groups Skipped (no transactions):")
         for ag in stats['account_groups_skipped']:
@@ -117,9 +457,55 @@ def generate_summary_report(stats: Dict, title: str = "Statement Distributor") -
             report.append(f"  - {ag}: {reason}")
         report.append("")
     
+    report.extend(_performance_section(stats.get('performance')))
+    
     if failed > 0:
         report.append("Status: COMPLETED WITH ERRORS")
     else:
         report.append("Status: COMPLETED SUCCESSFULLY")
     
     return "\n".join(report)
+
+
+def _performance_section(performance: Optional[Dict]) -> List[str]:
+    """
+    Format the Performance section of the summary report.
+
+    Lists the stages and the slowest account groups, each by time spent.
+
+    Args:
+        performance: The 'performance' entry of the statistics dictionary
+
+    Returns:
+        Report lines (empty if the run was not timed)
+    """
+    if not performance or performance.get('elapsed_seconds') is None:
+        return []
+
+    lines = ["Performance:"]
+    lines.append(f"  Elapsed: {performance['elapsed_seconds']:.3f}s")
+    lines.append(
+        f"  Rows: {performance['rows']}, Attachment bytes: {performance['attachment_bytes']:,}, "
+        f"Bytes sent: {performance.get('bytes_sent', 0):,}"
+    )
+    lines.append("  Stages (slowest first):")
+    for stage, seconds in sorted(performance['stages'].items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"    - {stage}: {seconds:.3f}s")
+
+    account_groups = sorted(
+        performance['account_groups'].items(),
+        key=lambda item: sum(item[1]['stages'].values()),
+        reverse=True
+    )[:SLOWEST_ACCOUNT_GROUPS]
+    if account_groups:
+        lines.append("  Slowest Account Groups:")
+        for ag, entry in account_groups:
+            stages = ", ".join(
+                f"{stage} {seconds:.3f}s" for stage, seconds in entry['stages'].items() if seconds
+            )
+            lines.append(
+                f"    - {ag}: {sum(entry['stages'].values()):.3f}s"
+                f"{f' ({stages})' if stages else ''}, {entry['rows']} rows, {entry['attachment_bytes']:,} bytes"
+            )
+    lines.append("")
+    return lines